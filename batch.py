@@ -0,0 +1,32 @@
+import argparse
+import sys
+import time
+
+from core.batch import Recipe, find_inputs, format_summary, run_batch
+from core.loader import DEFAULT_CHUNKSIZE
+
+# Headless entry point: must never import tkinter or the ui package
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply a cleaning recipe to many CSV/Excel files without the GUI")
+    parser.add_argument("recipe", help="JSON recipe file (see core.batch.Recipe)")
+    parser.add_argument("inputs", help="directory or glob pattern of input files, e.g. 'drops/*.csv'")
+    parser.add_argument("--out", default="cleaned", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows streamed per chunk")
+    args = parser.parse_args()
+
+    try:
+        recipe = Recipe.load(args.recipe)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Invalid recipe: {e}")
+    inputs = find_inputs(args.inputs)
+    if not inputs:
+        sys.exit(f"No CSV/Excel files found for {args.inputs}")
+
+    start = time.perf_counter()
+    summaries = run_batch(recipe, inputs, args.out, args.workers, args.chunksize,
+                          on_result=lambda s: print(("FAILED " if "error" in s else "done   ") + s["input"], flush=True))
+    print()
+    print(format_summary(summaries))
+    print(f"Wall time: {time.perf_counter() - start:.2f}s")
+    sys.exit(1 if any("error" in s for s in summaries) else 0)
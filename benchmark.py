@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import pandas as pd
+
+from core.loader import load_file
+from core.processor import (remove_duplicates, flag_near_duplicates, handle_missing_values, standardize_data,
+                            standardize_column, merge_datasets, _cached_num_to_words, _cached_words_to_num)
+from generate_test_data import generate
+from utils.exporter import export_data
+
+DEFAULT_ROWS = 100_000
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25  # flag a case this much slower (or hungrier) than its baseline
+NOISE_FLOOR = {"seconds": 0.005, "peak_bytes": 1024 ** 2}  # absolute changes below this are never flagged
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+
+STANDARDIZE_METHODS = [
+    ("Item_Name", "lowercase", {}), ("Item_Name", "uppercase", {}), ("Item_Name", "title", {}),
+    ("Item_Name", "strip", {}), ("Price", "round", {"decimals": 1}), ("Stock_Text", "to_numeric", {}),
+    ("Stock_Count", "num_to_words", {}), ("Stock_Words", "words_to_num", {}),
+]
+EXPORT_FORMATS = ["csv", "csv.gz", "jsonl", "parquet"]
+
+# Modules the GUI must not import before the window is shown
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "num2words", "word2number")
+STARTUP_IMPORTS = {"startup.import_ui": "ui.tkinter_ui", "startup.import_data_stack": "core.state, core.processor"}
+STARTUP_SCRIPT = """import sys, time
+start = time.perf_counter()
+import {modules}
+print(time.perf_counter() - start)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(func, repeat=DEFAULT_REPEAT):
+    """Best wall time over `repeat` runs, plus peak traced allocation of one extra run.
+
+    tracemalloc sees Python and numpy allocations but not Arrow buffers.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def measure_startup(modules, repeat=DEFAULT_REPEAT):
+    """Best import time of `modules` in fresh interpreters, and the heavy modules they loaded"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    script = STARTUP_SCRIPT.format(modules=modules, heavy=HEAVY_MODULES)
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+        seconds, loaded = out.stdout.splitlines()
+        times.append(float(seconds))
+    return min(times), [m for m in loaded.split(",") if m]
+
+
+def build_cases(paths, out_dir):
+    """name -> (func, rows processed) for every benchmarked operation"""
+    by_name = {os.path.basename(path).split(".")[0]: path for path in paths}
+    sales_path = by_name["2_Sales_Missing_Values"]
+    inventory = load_file(by_name["3_Inventory_Messy_Duplicates"])
+    sales = load_file(sales_path)
+    base = load_file(by_name["4_Merge_Users_Base"])
+    activity = load_file(by_name["5_Merge_Users_Activity"])
+    append = load_file(by_name["6_Merge_Users_Append"])
+
+    # Columns for the conversion methods, derived from the inventory data
+    text = inventory.assign(Price=sales["Price"].iloc[:len(inventory)].to_numpy(),
+                            Stock_Text=inventory["Stock_Count"].astype(str))
+    text["Stock_Words"] = standardize_column(text, "Stock_Count", "num_to_words")["Stock_Count"]
+
+    def conversion(column, method, kwargs):
+        def run():
+            _cached_num_to_words.cache_clear()
+            _cached_words_to_num.cache_clear()
+            standardize_column(text, column, method, **kwargs)
+        return run
+
+    cases = {
+        "load_file.csv": (lambda: load_file(by_name["3_Inventory_Messy_Duplicates"]), len(inventory)),
+        f"load_file.{sales_path.rsplit('.', 1)[-1]}": (lambda: load_file(sales_path), len(sales)),
+        "remove_duplicates": (lambda: remove_duplicates(inventory), len(inventory)),
+        "flag_near_duplicates.inventory": (lambda: flag_near_duplicates(inventory), len(inventory)),
+        "flag_near_duplicates.users": (lambda: flag_near_duplicates(base), len(base)),
+        "handle_missing_values.delete": (lambda: handle_missing_values(sales, "delete"), len(sales)),
+        "handle_missing_values.zero": (lambda: handle_missing_values(sales, "zero"), len(sales)),
+        "handle_missing_values.fill": (lambda: handle_missing_values(sales, "fill", "n/a"), len(sales)),
+        "handle_missing_values.strategies": (lambda: handle_missing_values(sales, strategies={
+            "Quantity": {"method": "median", "by": "Product"}, "Price": "mean"}), len(sales)),
+        "standardize_data": (lambda: standardize_data(inventory), len(inventory)),
+        "merge_datasets.join": (lambda: merge_datasets([base, activity]), len(base) + len(activity)),
+        "merge_datasets.union": (lambda: merge_datasets([base, append]), len(base) + len(append)),
+    }
+    for column, method, kwargs in STANDARDIZE_METHODS:
+        cases[f"standardize_column.{method}"] = (conversion(column, method, kwargs), len(text))
+    for fmt in EXPORT_FORMATS:
+        target = os.path.join(out_dir, f"export.{fmt}")
+        cases[f"export.{fmt}"] = (lambda target=target: export_data(sales, target), len(sales))
+    return cases
+
+
+def run_benchmarks(rows=DEFAULT_ROWS, repeat=DEFAULT_REPEAT, only=None, seed=0):
+    """Measure startup imports, then generate `rows`-row datasets and measure every case; returns a JSON-ready dict"""
+    results = {}
+    for name, modules in STARTUP_IMPORTS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        seconds, loaded = measure_startup(modules, repeat)
+        results[name] = {"rows": 0, "seconds": seconds, "rows_per_sec": None, "peak_bytes": None, "loaded": loaded}
+        print(f"{name:36s} {seconds * 1000:10.1f} ms   loaded: {', '.join(loaded) or 'nothing heavy'}", flush=True)
+    if only and all(prefix.startswith("startup") for prefix in only):
+        return _report(rows, repeat, results)  # no data needed
+
+    work_dir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        paths = generate(rows, os.path.join(work_dir, "data"), seed=seed)
+        cases = build_cases(paths, work_dir)
+        for name, (func, n) in cases.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            seconds, peak = measure(func, repeat)
+            results[name] = {"rows": n, "seconds": seconds, "rows_per_sec": n / seconds if seconds else None,
+                             "peak_bytes": peak}
+            print(f"{name:36s} {seconds * 1000:10.1f} ms {n / max(seconds, 1e-9):14,.0f} rows/s "
+                  f"{peak / 1024 ** 2:10.1f} MB peak", flush=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return _report(rows, repeat, results)
+
+
+def _report(rows, repeat, results):
+    return {
+        "meta": {"rows": rows, "repeat": repeat, "created": datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "pandas": pd.__version__, "machine": platform.machine(),
+                 "platform": platform.platform()},
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Regressions of `current` against `baseline` as a list of messages"""
+    if current["meta"]["rows"] != baseline["meta"]["rows"]:
+        return [f"baseline was recorded with {baseline['meta']['rows']:,} rows, "
+                f"this run used {current['meta']['rows']:,}; rerun with --rows to compare"]
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        if name in STARTUP_IMPORTS and set(result.get("loaded", [])) - set(before.get("loaded", [])):
+            regressions.append(f"{name}: now imports {', '.join(sorted(set(result['loaded']) - set(before['loaded'])))}")
+        for metric in ("seconds", "peak_bytes"):
+            if result[metric] is None or before[metric] is None:
+                continue
+            if (before[metric] and result[metric] > before[metric] * (1 + tolerance)
+                    and result[metric] - before[metric] > NOISE_FLOOR[metric]):
+                regressions.append(f"{name}: {metric} {before[metric]:.4g} -> {result[metric]:.4g} "
+                                   f"(+{result[metric] / before[metric] - 1:.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark core.processor operations on generated data")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="rows per generated dataset")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per case (best is kept)")
+    parser.add_argument("--only", nargs="*", help="run only cases whose name starts with one of these")
+    parser.add_argument("--save", metavar="PATH", nargs="?", const=DEFAULT_BASELINE, help="write results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE, help="flag regressions against a baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.rows, args.repeat, args.only)
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
@@ -0,0 +1,206 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from core.cache import read_frame, write_frame
+from core.loader import DEFAULT_CHUNKSIZE, load_file
+from core.pipeline import STEPS, chunk_local, clean_file, iter_pipeline
+from core.plan import fuse_steps
+from core.processor import merge_datasets
+from utils.exporter import export_data, iter_frame_chunks
+
+INPUT_EXTENSIONS = (".csv", ".xlsx", ".xls")
+OUTPUT_EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "json": ".json", "parquet": ".parquet", "excel": ".xlsx"}
+COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class Recipe:
+    """Declarative cleaning recipe: processor steps, output format and an optional merge.
+
+    JSON form::
+
+        {"steps": ["remove_duplicates",
+                   {"handle_missing_values": {"method": "zero"}},
+                   {"standardize_column": {"column": "Name", "method": "strip"}}],
+         "output": {"format": "parquet", "compression": null},
+         "merge": false}
+
+    Steps are names from core.pipeline.STEPS, alone or mapped to their keyword arguments.
+    """
+
+    def __init__(self, steps, file_format="csv", compression=None, merge=False):
+        self.steps = fuse_steps(self._normalize(steps))
+        if file_format not in OUTPUT_EXTENSIONS:
+            raise ValueError(f"Unsupported output format: {file_format}")
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.file_format = file_format
+        self.compression = compression
+        self.merge = merge
+
+    @staticmethod
+    def _normalize(steps):
+        normalized = []
+        for step in steps:
+            if isinstance(step, str):
+                name, kwargs = step, {}
+            elif isinstance(step, dict) and len(step) == 1:
+                (name, kwargs), = step.items()
+            else:
+                raise ValueError(f"Recipe steps must be a name or a single-key mapping, got {step!r}")
+            if name not in STEPS:
+                raise ValueError(f"Unsupported recipe step: {name}")
+            if name != "remove_duplicates" and not chunk_local(name, kwargs or {}):
+                raise ValueError(f"Recipe step {name} needs whole columns; only row-wise missing-value strategies stream")
+            normalized.append((name, dict(kwargs or {})))
+        return normalized
+
+    @classmethod
+    def from_dict(cls, data):
+        output = data.get("output", {})
+        return cls(data.get("steps", []), output.get("format", "csv"), output.get("compression"),
+                   bool(data.get("merge", False)))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    @property
+    def extension(self):
+        return OUTPUT_EXTENSIONS[self.file_format] + COMPRESSION_EXTENSIONS[self.compression]
+
+
+def find_inputs(pattern):
+    """CSV/Excel files in a directory, or matching a glob pattern, sorted by name"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*")
+    return sorted(path for path in glob.glob(pattern) if path.lower().endswith(INPUT_EXTENSIONS))
+
+
+def output_paths(inputs, out_dir, extension):
+    """One output path per input, keeping stems unique when only extensions differ"""
+    paths, used = [], set()
+    for path in inputs:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem
+        suffix = 2
+        while name in used:
+            name = f"{stem}_{suffix}"
+            suffix += 1
+        used.add(name)
+        paths.append(os.path.join(out_dir, name + extension))
+    return paths
+
+
+def _clean_one(input_path, output_path, steps, chunksize):
+    """Worker: stream one file through the steps into output_path, returning its summary"""
+    start = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        summary = clean_file(input_path, output_path, steps, chunksize)
+    except Exception as e:
+        summary = {"error": f"{type(e).__name__}: {e}"}
+        if os.path.exists(output_path):
+            os.remove(output_path)  # don't leave a partial output behind
+    summary.update(input=input_path, output=output_path,
+                   seconds=time.perf_counter() - start, cpu_seconds=time.process_time() - cpu)
+    return summary
+
+
+def _clean_to_frame(input_path, spool_path, steps, chunksize):
+    """Worker for merge recipes: clean one file and spool the result as a binary frame"""
+    start = time.perf_counter()
+    cpu = time.process_time()
+    summary = {"input": input_path}
+    try:
+        df = load_file(input_path)
+        summary["rows_in"] = len(df)
+        df = pd.concat(list(iter_pipeline(iter_frame_chunks(df, chunksize), steps)))
+        summary["rows_out"] = len(df)
+        summary["output"] = write_frame(df, spool_path)
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary.update(seconds=time.perf_counter() - start, cpu_seconds=time.process_time() - cpu)
+    return summary
+
+
+def run_batch(recipe, inputs, out_dir, workers=None, chunksize=DEFAULT_CHUNKSIZE, on_result=None):
+    """Apply a Recipe to many files on a process pool.
+
+    Without merge every file is streamed through the steps into its own output
+    in `out_dir`, so memory per worker stays bounded by the chunk size. With
+    merge the cleaned files are combined by merge_datasets into one `merged`
+    output. Returns per-file summaries (plus a final "merge" entry when
+    merging); `on_result(summary)` is called as each file finishes.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or min(len(inputs), os.cpu_count() or 1) or 1
+    summaries = []
+    spool_dir = tempfile.mkdtemp(prefix="batch_") if recipe.merge else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            if recipe.merge:
+                targets = output_paths(inputs, spool_dir, "")
+                futures = [pool.submit(_clean_to_frame, path, target, recipe.steps, chunksize)
+                           for path, target in zip(inputs, targets)]
+            else:
+                targets = output_paths(inputs, out_dir, recipe.extension)
+                futures = [pool.submit(_clean_one, path, target, recipe.steps, chunksize)
+                           for path, target in zip(inputs, targets)]
+            for future in as_completed(futures):
+                summary = future.result()
+                summaries.append(summary)
+                if on_result:
+                    on_result(summary)
+        if recipe.merge:
+            summaries.append(_merge_outputs(summaries, inputs, out_dir, recipe))
+            if on_result:
+                on_result(summaries[-1])
+    finally:
+        if spool_dir:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+    order = {path: i for i, path in enumerate(inputs)}
+    return sorted(summaries, key=lambda s: order.get(s["input"], len(order)))
+
+
+def _merge_outputs(summaries, inputs, out_dir, recipe):
+    start = time.perf_counter()
+    cpu = time.process_time()
+    cleaned = {s["input"]: s["output"] for s in summaries if "error" not in s}
+    output = os.path.join(out_dir, "merged" + recipe.extension)
+    summary = {"input": "merge", "output": output}
+    try:
+        dfs = [read_frame(cleaned[path]) for path in inputs if path in cleaned]
+        if not dfs:
+            raise ValueError("no input file was cleaned successfully")
+        summary["rows_in"] = sum(len(df) for df in dfs)
+        merged = merge_datasets(dfs)
+        summary["rows_out"] = export_data(merged, output, recipe.file_format, recipe.compression)
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary.update(seconds=time.perf_counter() - start, cpu_seconds=time.process_time() - cpu)
+    return summary
+
+
+def _count(value):
+    return "-" if value is None else f"{value:,}"
+
+
+def format_summary(summaries):
+    """Plain-text timing table for batch results"""
+    lines = [f"{'file':40s} {'rows in':>12s} {'rows out':>12s} {'seconds':>9s} {'rows/s':>12s}  status"]
+    for s in summaries:
+        rows_in, rows_out = s.get("rows_in"), s.get("rows_out")
+        rate = f"{rows_in / s['seconds']:,.0f}" if rows_in and s["seconds"] else "-"
+        status = "error: " + s["error"] if "error" in s else "ok"
+        lines.append(f"{os.path.basename(s['input'])[:40]:40s} {_count(rows_in):>12s} {_count(rows_out):>12s} "
+                     f"{s['seconds']:9.2f} {rate:>12s}  {status}")
+    total = sum(s["seconds"] for s in summaries)
+    failed = sum("error" in s for s in summaries)
+    lines.append(f"{len(summaries)} item(s), {failed} failed, {total:.2f}s of work")
+    return "\n".join(lines)
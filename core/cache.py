@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import pickle
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional, fall back to pickle files
+    pa = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "data_processing_app")
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+
+def write_frame(df, path):
+    """Write a DataFrame as an Arrow IPC (Feather) file, or a pickle without pyarrow.
+
+    Returns the path actually written, which carries the format's extension.
+    """
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            table = None  # e.g. mixed-type object columns Arrow can't represent
+        if table is not None:
+            target = path + ".arrow"
+            with pa.OSFile(target + ".tmp", "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(target + ".tmp", target)
+            return target
+    target = path + ".pkl"
+    with open(target + ".tmp", "wb") as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(target + ".tmp", target)
+    return target
+
+
+def read_frame(path, allow_pickle=True):
+    """Read a file written by write_frame, memory-mapping Arrow files.
+
+    Pass allow_pickle=False for files from outside the app's own directories:
+    unpickling runs arbitrary code, so those must be Arrow files.
+    """
+    if path.endswith(".arrow"):
+        with pa.memory_map(path, "r") as source:
+            # One block per column keeps numeric columns zero-copy views of the map,
+            # so their pages are read only when a column is touched
+            return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+    if not allow_pickle:
+        raise ValueError(f"{os.path.basename(path)} is not an Arrow file and won't be unpickled")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+class FileCache:
+    """On-disk cache of parsed source files in a binary columnar format.
+
+    Entries are keyed by absolute path, mtime, size and loader options, so an
+    edited file is never served stale. The directory is capped at `max_bytes`
+    by evicting least recently used entries.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, path, **options):
+        st = os.stat(path)
+        raw = json.dumps([os.path.abspath(path), st.st_mtime_ns, st.st_size, sorted(options.items())], default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _find(self, key):
+        for ext in (".arrow", ".pkl"):
+            entry = os.path.join(self.cache_dir, key + ext)
+            if os.path.exists(entry):
+                return entry
+        return None
+
+    def lookup(self, path, **options):
+        """Path of the cache file holding `path`'s parsed frame, or None on a miss"""
+        return self._find(self.key(path, **options))
+
+    def get(self, path, **options):
+        """Return the cached DataFrame for `path`, or None on a miss"""
+        entry = self.lookup(path, **options)
+        if entry is None:
+            return None
+        try:
+            df = read_frame(entry)
+        except Exception:
+            _remove(entry)  # unreadable or already evicted, re-parse
+            return None
+        try:
+            os.utime(entry)  # mark as recently used
+        except FileNotFoundError:
+            pass
+        return df
+
+    def put(self, path, df, **options):
+        """Store a parsed DataFrame for `path`, then evict down to the size cap.
+
+        Frames bigger than the whole cap are not cached, so they never evict everything else.
+        """
+        if df.memory_usage(index=True).sum() > self.max_bytes:
+            return
+        entry = write_frame(df, os.path.join(self.cache_dir, self.key(path, **options)))
+        if os.path.getsize(entry) > self.max_bytes:
+            os.remove(entry)
+            return
+        self.evict()
+
+    def entries(self):
+        """Cache files as (path, size, last_used), oldest first"""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((".arrow", ".pkl")):
+                try:
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:  # evicted by another worker meanwhile
+                    continue
+                found.append((os.path.join(self.cache_dir, name), st.st_size, st.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for entry, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(entry)
+            total -= size
+
+    def clear(self):
+        for entry, _, _ in self.entries():
+            _remove(entry)
+
+
+def _remove(entry):
+    """Delete a cache file that another worker process may have deleted first"""
+    try:
+        os.remove(entry)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,104 @@
+import re
+import numpy as np
+import pandas as pd
+
+CONFIDENCE_THRESHOLD = 0.95
+SAMPLE_ROUNDS = (200, 1000, 5000)  # sample sizes tried before giving up
+STRATA = 10
+
+# Precompiled rules, checked in this order; the first confident match wins
+PATTERNS = {
+    "boolean": re.compile(r"^(?:true|false|yes|no|y|n)$", re.IGNORECASE),
+    "integer": re.compile(r"^[+-]?\d+$"),
+    "float": re.compile(r"^[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?$"),
+    "date": re.compile(r"^(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})(?:[ T]\d{1,2}:\d{2}(?::\d{2})?)?$"),
+    "email": re.compile(r"^[\w.+-]+@[\w-]+(?:\.[\w-]+)+$"),
+    "phone": re.compile(r"^\+?(?:[\s().-]*\d){7,15}[\s().-]*$"),
+}
+
+
+def stratified_sample(col_data, size, strata=STRATA, seed=0):
+    """Non-null values drawn evenly from `strata` equal blocks of the column"""
+    n = len(col_data)
+    if n <= size:
+        return col_data.dropna()
+    rng = np.random.default_rng(seed)
+    bounds = np.linspace(0, n, strata + 1).astype(int)
+    per_block = max(size // strata, 1)
+    positions = np.concatenate([
+        lo + rng.choice(hi - lo, size=min(per_block, hi - lo), replace=False)
+        for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+    ])
+    return col_data.iloc[np.sort(positions)].dropna()
+
+
+def _match_ratio(sample, kind):
+    matches = sample.str.match(PATTERNS[kind])
+    if kind == "date":
+        # The pattern only pre-filters; the value must also parse as a date
+        candidates = sample[matches.fillna(False).astype(bool)]
+        parsed = pd.to_datetime(candidates, errors="coerce", format="mixed")
+        return parsed.notna().sum() / len(sample)
+    return matches.fillna(False).astype(bool).mean()
+
+
+def detect_column_type(col_data, threshold=CONFIDENCE_THRESHOLD, rounds=SAMPLE_ROUNDS):
+    """Suggest a semantic type for one column.
+
+    Typed columns are answered from their dtype. Text columns are probed with
+    vectorized regex matches on growing stratified samples, stopping as soon
+    as a type reaches `threshold` or no type can still reach it. Returns a dict
+    with `type`, `confidence` and `sampled`.
+    """
+    dtype = col_data.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return {"type": "boolean", "confidence": 1.0, "sampled": 0}
+    if pd.api.types.is_integer_dtype(dtype):
+        return {"type": "integer", "confidence": 1.0, "sampled": 0}
+    if pd.api.types.is_float_dtype(dtype):
+        return {"type": "float", "confidence": 1.0, "sampled": 0}
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return {"type": "date", "confidence": 1.0, "sampled": 0}
+
+    candidates = list(PATTERNS)
+    best = ("text", 0.0)
+    sampled = 0
+    for size in rounds:
+        sample = stratified_sample(col_data, size).astype(str).str.strip()
+        sampled = len(sample)
+        if sampled == 0:
+            return {"type": "empty", "confidence": 1.0, "sampled": 0}
+        ratios = {kind: _match_ratio(sample, kind) for kind in candidates}
+        for kind in candidates:
+            if ratios[kind] >= threshold:
+                return {"type": kind, "confidence": float(ratios[kind]), "sampled": sampled}
+        # Drop types that are clearly out of reach before sampling more
+        candidates = [kind for kind in candidates if ratios[kind] >= threshold / 2]
+        if candidates:
+            kind = max(candidates, key=ratios.get)
+            best = (kind, ratios[kind])
+        if not candidates or sampled < size:
+            break
+    return {"type": "text", "confidence": float(1 - best[1]), "sampled": sampled}
+
+
+def detect_types(df, **kwargs):
+    """Suggest a type for every column of a DataFrame"""
+    return {col: detect_column_type(df[col], **kwargs) for col in df.columns}
+
+
+def suggest_column_type(ds, column):
+    """Cached type suggestion for one column of a Dataset's current version"""
+    if ds.is_lazy:
+        # Judge an unexecuted plan by its first rows instead of running it
+        return ds.cached(("type", column, "head"), lambda: detect_column_type(ds.head(max(SAMPLE_ROUNDS))[column]))
+    return ds.cached(("type", column), lambda: _detect_with_stats(ds, column))
+
+
+def _detect_with_stats(ds, column):
+    # An all-missing text column is known from the cached statistics, without sampling
+    stats = ds.column_stats(column)
+    dtype = stats["dtype"]
+    if stats["count"] == 0 and (dtype == object or pd.api.types.is_string_dtype(dtype)):
+        return {"type": "empty", "confidence": 1.0, "sampled": 0}
+    return detect_column_type(ds.df[column])
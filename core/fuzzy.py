@@ -0,0 +1,241 @@
+import re
+import numpy as np
+import pandas as pd
+
+DEFAULT_THRESHOLD = 0.8  # minimum 1 - edit distance / longer length for two keys to match
+DEFAULT_WINDOW = 5  # neighbours compared after sorting, per pass
+PAIR_BATCH = 32768  # candidate pairs scored at a time, bounding the comparison matrices
+PAIR_CELLS = 1 << 21  # characters per side of a batch, so long strings are scored in fewer pairs at a time
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _is_text(col_data):
+    dtype = col_data.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    return dtype == object or pd.api.types.is_string_dtype(dtype)
+
+
+def normalize_text(values):
+    """Case-folded text with outer whitespace trimmed and inner runs collapsed to one space"""
+    # split/join per value beats a vectorized regex replace here, and callers pass distinct values only
+    return pd.Series([" ".join(str(value).casefold().split()) for value in values], dtype=object)
+
+
+def normalized_codes(col_data):
+    """Integer code per row shared by values equal after normalization (-1 for missing).
+
+    Text is normalized once per distinct value with normalize_text; other
+    dtypes compare exactly. Returns (codes, normalized distinct values).
+    """
+    codes, uniques = pd.factorize(col_data)
+    if not _is_text(col_data):
+        return codes, pd.Index(uniques)
+    norm_codes, norm_uniques = pd.factorize(normalize_text(np.asarray(uniques, dtype=object)))
+    return np.where(codes >= 0, norm_codes[codes], -1), pd.Index(norm_uniques)
+
+
+def edit_similarity(left, right):
+    """1 - Levenshtein distance / longer length for each pair of strings (1.0 for two empty strings).
+
+    Vectorized with the bit-parallel algorithm of Myers/Hyyrö, using as many
+    64-bit words per string as its length needs.
+    """
+    values = pd.concat([pd.Series(left, dtype=object), pd.Series(right, dtype=object)], ignore_index=True)
+    n = len(values) // 2
+    return pair_similarity(values.to_numpy(), np.arange(n), np.arange(n, 2 * n))
+
+
+def code_points(values):
+    """(code points of all strings end to end, plus one 0, and each string's offset and length)"""
+    strings = pd.Series(values, dtype=object)
+    lengths = strings.str.len().to_numpy(dtype=np.int64)
+    flat = np.frombuffer(("".join(strings.tolist()) + "\0").encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    return flat, np.cumsum(lengths) - lengths, lengths
+
+
+def _char_rows(flat, offsets, lengths, width):
+    """Code points of the strings at offsets, padded with zeros to `width` columns"""
+    cols = np.arange(width)
+    inside = cols < lengths[:, None]
+    return np.where(inside, flat[np.where(inside, offsets[:, None] + cols, len(flat) - 1)], 0)
+
+
+def pair_similarity(values, left, right):
+    """edit_similarity of strings values[left] and values[right].
+
+    Only the strings in some pair are converted to code points, kept end to
+    end rather than padded to the longest one. Pairs are scored in order of
+    their longer string, so a long outlier widens just its own batch; batches
+    hold up to PAIR_BATCH pairs and PAIR_CELLS characters per side.
+    """
+    result = np.empty(len(left), dtype=float)
+    used, inverse = np.unique(np.concatenate([left, right]), return_inverse=True)
+    flat, offsets, lengths = code_points(values[used])
+    left, right = inverse.ravel()[:len(left)], inverse.ravel()[len(left):]
+    longest = np.maximum(lengths[left], lengths[right])
+    order = np.argsort(longest, kind="stable")
+    start = 0
+    while start < len(order):
+        size = PAIR_BATCH
+        while True:
+            width = max(1, int(longest[order[min(start + size, len(order)) - 1]]))
+            if size == 1 or size * width <= PAIR_CELLS:
+                break
+            size = max(1, PAIR_CELLS // width)
+        batch = order[start:start + size]
+        i, j = left[batch], right[batch]
+        result[batch] = _similarity_batch(_char_rows(flat, offsets[i], lengths[i], width), lengths[i],
+                                          _char_rows(flat, offsets[j], lengths[j], width), lengths[j])
+        start += size
+    return result
+
+
+def _similarity_batch(a, len_a, b, len_b):
+    n = len(a)
+    words = (a.shape[1] + 63) // 64
+    one = np.uint64(1)
+    last = np.maximum(len_a - 1, 0)
+    last_word = last // 64  # the word holding the last character of `a`, whose bit tracks the score
+    top = np.left_shift(one, (last % 64).astype(np.uint64))
+    vp = np.full((words, n), ~np.uint64(0))
+    vn = np.zeros((words, n), dtype=np.uint64)
+    score = len_a.copy()
+    counted = len_a > 0
+    packed = np.zeros((n, 8 * words), dtype=np.uint8)
+    for j in range(b.shape[1]):
+        # Bit i of word w of eq is set where a[64 w + i] == b[j]; padding in `a` only sets bits
+        # below the last character, which never reach the bits read above them
+        packed[:, :(a.shape[1] + 7) // 8] = np.packbits(a == b[:, j:j + 1], axis=1, bitorder="little")
+        eq = packed.view("<u8")
+        active = j < len_b
+        carry_p, carry_n = np.ones(n, dtype=np.uint64), np.zeros(n, dtype=np.uint64)  # row 0 grows by one per column
+        for w in range(words):
+            # One block of Hyyrö's multi-word algorithm; the carries pass the horizontal delta down
+            eq_w = eq[:, w]
+            xv = eq_w | vn[w]
+            eq_w = eq_w | carry_n
+            xh = (((eq_w & vp[w]) + vp[w]) ^ vp[w]) | eq_w
+            hp = vn[w] | ~(xh | vp[w])
+            hn = vp[w] & xh
+            step = ((hp & top) != 0).astype(np.int64) - ((hn & top) != 0)
+            score += np.where(active & counted & (last_word == w), step, 0)
+            out_p, out_n = hp >> np.uint64(63), hn >> np.uint64(63)
+            hp = (hp << one) | carry_p
+            hn = (hn << one) | carry_n
+            vp[w] = np.where(active, hn | ~(xv | hp), vp[w])
+            vn[w] = np.where(active, hp & xv, vn[w])
+            carry_p, carry_n = out_p, out_n
+    distance = np.where(len_a == 0, len_b, score)
+    longest = np.maximum(len_a, len_b)
+    return np.where(longest == 0, 1.0, 1 - distance / np.maximum(longest, 1))
+
+
+def _candidate_pairs(keys, blocks, window):
+    """Pairs (i < j) of keys within `window` of each other when sorted by (block, key) and by (block, reversed key)"""
+    n = len(keys)
+    encoded = []
+    for sort_key in (keys, keys.str[::-1]):
+        order = pd.DataFrame({"block": blocks, "key": sort_key}).sort_values(["block", "key"]).index.to_numpy()
+        for offset in range(1, window):
+            a, b = order[:-offset], order[offset:]
+            same_block = blocks[a] == blocks[b]
+            encoded.append(np.minimum(a, b)[same_block] * n + np.maximum(a, b)[same_block])
+    encoded = np.unique(np.concatenate(encoded)) if encoded else np.empty(0, dtype=np.int64)
+    return encoded // n, encoded % n
+
+
+def _components(n, a, b):
+    """Connected component label (smallest member) for n nodes joined by edges a[k]-b[k]"""
+    labels = np.arange(n)
+    if len(a) == 0:
+        return labels
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        before = labels.copy()
+        np.minimum.at(labels, a, low)
+        np.minimum.at(labels, b, low)
+        labels = labels[labels]  # pointer jumping
+        if np.array_equal(labels, before):
+            return labels
+
+
+def _group_ids(code_arrays, n):
+    """Dense id per position shared by positions with equal codes in every array"""
+    if not code_arrays:
+        return np.zeros(n, dtype=np.int64)
+    frame = pd.DataFrame(dict(enumerate(code_arrays)))
+    return frame.groupby(list(frame.columns), sort=False).ngroup().to_numpy()
+
+
+def _similar_values(codes, uniques, left, right, threshold):
+    """Which pairs of positions have values of one text column at or above threshold (missing counts as "")"""
+    missing = len(uniques)
+    a, b = np.where(codes[left] >= 0, codes[left], missing), np.where(codes[right] >= 0, codes[right], missing)
+    values = np.append(np.asarray(uniques, dtype=object), "")
+    lengths = pd.Series(values, dtype=object).str.len().to_numpy(dtype=np.int64)
+    # Lengths alone bound the similarity, so hopeless pairs are never scored
+    keep = (a == b) | (np.minimum(lengths[a], lengths[b]) >= threshold * np.maximum(lengths[a], lengths[b]))
+    todo = np.flatnonzero(keep & (a != b))
+    # Each distinct pair of values is scored once
+    pairs, inverse = np.unique(np.minimum(a[todo], b[todo]) * (missing + 1) + np.maximum(a[todo], b[todo]),
+                               return_inverse=True)
+    similar = pair_similarity(values, pairs // (missing + 1), pairs % (missing + 1)) >= threshold
+    keep[todo] = similar[inverse.ravel()]
+    return keep
+
+
+def _similar_pairs(members, blocks, text, threshold, window, match_digits):
+    """Positions (into members) of key pairs whose every text column is at or above threshold, within a block only"""
+    parts = [np.where(codes >= 0, np.asarray(uniques, dtype=object)[np.maximum(codes, 0)], "") for codes, uniques in text]
+    keys = pd.Series([" | ".join(values) for values in zip(*parts)] if len(parts) > 1 else parts[0], dtype=object)
+    if match_digits:
+        # Numbers in text (house numbers, ids) are rarely typos; differing ones must not chain clusters together
+        digits = pd.factorize(pd.Series([_NON_DIGITS.sub("", key) for key in keys], dtype=object))[0]
+        blocks = _group_ids([blocks, digits], len(keys))
+    # Neighbours are found on all text columns joined, but each column is compared on its own,
+    # so one close column can't make up for another that differs
+    left, right = _candidate_pairs(keys, blocks, window)
+    for codes, uniques in text:
+        keep = _similar_values(codes, uniques, left, right, threshold)
+        left, right = left[keep], right[keep]
+    return left, right
+
+
+def near_duplicate_clusters(df, columns=None, threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW, match_digits=True):
+    """Cluster id per row, shared by rows that are duplicates after normalization or within `threshold`.
+
+    Text columns are normalized (normalize_text) and compared fuzzily, each
+    on its own: every one must be within `threshold`. Other columns must
+    match exactly and act as blocking keys. Rows are first collapsed to
+    distinct normalized keys (the text columns joined), which are then
+    compared only with their `window` nearest neighbours in two sorted
+    orders (the key and the key reversed, so typos at either end are
+    caught), keeping the work close to linear in the number of distinct
+    keys. With `match_digits` keys must also contain the same digits. Ids
+    number clusters in order of their first row.
+    """
+    columns = list(df.columns if columns is None else columns)
+    if len(df) == 0 or not columns:
+        return pd.Series(np.zeros(len(df), dtype=np.int64), index=df.index, name="duplicate_cluster")
+    text, exact = [], []
+    for col in columns:
+        codes, uniques = normalized_codes(df[col])
+        (text if _is_text(df[col]) else exact).append((codes, uniques))
+
+    groups = _group_ids([codes for codes, _ in exact + text], len(df))
+    first = pd.Series(np.arange(len(df))).groupby(groups).first().to_numpy()  # a row of each group
+    labels = np.arange(len(first))
+
+    if text and threshold < 1:
+        blocks = _group_ids([codes[first] for codes, _ in exact], len(first))
+        # Only keys sharing their exact block with another key can have a near duplicate
+        members = np.flatnonzero(np.bincount(blocks)[blocks] > 1)
+        if len(members):
+            left, right = _similar_pairs(members, blocks[members], [(codes[first[members]], uniques) for codes, uniques in text],
+                                         threshold, window, match_digits)
+            labels = _components(len(first), members[left], members[right])
+
+    clusters = pd.factorize(labels[groups])[0]
+    return pd.Series(clusters, index=df.index, name="duplicate_cluster")
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+
+def hash_rows(df):
+    """Return one uint64 hash per row, ignoring the index"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class RowHashIndex:
+    """Set of 64-bit row hashes kept as sorted numpy runs.
+
+    New hashes are appended as a small sorted run and runs of similar size are
+    merged, so inserts stay amortized O(log n) per hash and memory stays at
+    roughly 8 bytes per distinct row. With `positions=True` each hash also
+    records the position of its row in the indexed frame (8 more bytes), so
+    hash matches can be verified against the rows themselves. Sorting is
+    deferred until the index is first queried.
+    """
+
+    def __init__(self, positions=False):
+        self.runs = []
+        self.positions = [] if positions else None  # row positions, parallel to runs
+        self._pending = []  # (hashes, positions) added since the last query
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs) + sum(len(hashes) for hashes, _ in self._pending)
+
+    @property
+    def nbytes(self):
+        size = sum(run.nbytes for run in self.runs) + sum(hashes.nbytes for hashes, _ in self._pending)
+        if self.positions is not None:
+            size += sum(pos.nbytes for pos in self.positions) + sum(pos.nbytes for _, pos in self._pending)
+        return size
+
+    def copy(self):
+        """Index that can be extended without changing this one (runs are never modified in place)"""
+        index = RowHashIndex(positions=self.positions is not None)
+        index.runs = list(self.runs)
+        index.positions = None if self.positions is None else list(self.positions)
+        index._pending = list(self._pending)
+        return index
+
+    def contains(self, hashes):
+        """Boolean mask of which hashes are already in the index"""
+        self._flush()
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            pos = np.searchsorted(run, hashes)
+            pos[pos == len(run)] = 0
+            found |= run[pos] == hashes
+        return found
+
+    def lookup(self, hashes):
+        """Position of an indexed row for each hash, -1 where the hash is not indexed"""
+        self._flush()
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.full(len(hashes), -1, dtype=np.int64)
+        for run, positions in zip(self.runs, self.positions):
+            pos = np.searchsorted(run, hashes)
+            pos[pos == len(run)] = 0
+            hit = (run[pos] == hashes) & (found < 0)
+            found[hit] = positions[pos[hit]]
+        return found
+
+    def candidates(self, value):
+        """Positions of every indexed row with hash `value` (more than one only after a collision)"""
+        self._flush()
+        value = np.uint64(value)
+        return np.concatenate([positions[np.searchsorted(run, value, "left"):np.searchsorted(run, value, "right")]
+                               for run, positions in zip(self.runs, self.positions)] or [np.empty(0, np.int64)])
+
+    def add(self, hashes, positions=None):
+        """Insert hashes (with their row positions when the index tracks them)"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if (positions is None) != (self.positions is None):
+            raise ValueError("positions must be given exactly when the index tracks them")
+        if len(hashes):
+            self._pending.append((hashes, None if positions is None else np.asarray(positions, dtype=np.int64)))
+
+    def _flush(self):
+        while self._pending:
+            hashes, positions = self._pending.pop(0)
+            if positions is None:
+                self.runs.append(np.unique(hashes))
+            else:
+                order = np.argsort(hashes, kind="stable")
+                self.runs.append(hashes[order])
+                self.positions.append(positions[order])
+            while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+                newer, older = self.runs.pop(), self.runs.pop()
+                if self.positions is None:
+                    self.runs.append(np.union1d(older, newer))
+                    continue
+                newer_pos, older_pos = self.positions.pop(), self.positions.pop()
+                merged = np.concatenate([older, newer])
+                order = np.argsort(merged, kind="stable")
+                self.runs.append(merged[order])
+                self.positions.append(np.concatenate([older_pos, newer_pos])[order])
+
+    def first_seen(self, hashes):
+        """Mask of hashes seen for the first time (not indexed, not repeated earlier), then index them"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if self.runs or self._pending:
+            keep &= ~self.contains(hashes)
+        self.add(hashes[keep])
+        return keep
+
+    def save(self, path):
+        """Write the index to `path` (.npz); returns the path written"""
+        self._flush()
+        arrays = {f"run_{i}": run for i, run in enumerate(self.runs)}
+        if self.positions is not None:
+            arrays.update({f"positions_{i}": pos for i, pos in enumerate(self.positions)})
+        target = path if path.endswith(".npz") else path + ".npz"
+        np.savez(target, positions=self.positions is not None, **arrays)
+        return target
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            index = cls(positions=bool(data["positions"]))
+            count = sum(1 for name in data.files if name.startswith("run_"))
+            index.runs = [data[f"run_{i}"] for i in range(count)]
+            if index.positions is not None:
+                index.positions = [data[f"positions_{i}"] for i in range(count)]
+        return index
+
+
+def _same_rows(left, right):
+    """Row-wise equality of two frames with the same columns, missing values matching each other"""
+    equal = np.ones(len(left), dtype=bool)
+    for j in range(left.shape[1]):
+        a = left.iloc[:, j].reset_index(drop=True)
+        b = right.iloc[:, j].reset_index(drop=True)
+        same = (a == b).fillna(False).to_numpy(dtype=bool)
+        equal &= same | (a.isna() & b.isna()).to_numpy()
+    return equal
+
+
+def _take(frames, positions):
+    """Rows at `positions` of the concatenation of `frames`, without concatenating them"""
+    bounds = np.cumsum([0] + [len(f) for f in frames])
+    part = np.searchsorted(bounds, positions, side="right") - 1
+    pieces, order = [], []
+    for i in np.unique(part):
+        selected = np.flatnonzero(part == i)
+        pieces.append(frames[i].iloc[positions[selected] - bounds[i]])
+        order.append(selected)
+    if not pieces:
+        return frames[0].iloc[:0]
+    taken = pd.concat(pieces, ignore_index=True)
+    return taken.iloc[np.argsort(np.concatenate(order), kind="stable")]
+
+
+def first_rows(df, hashes=None):
+    """Mask of the first occurrence of every distinct row; only rows sharing a hash are compared exactly"""
+    hashes = hash_rows(df) if hashes is None else hashes
+    shared = pd.Series(hashes).duplicated(keep=False).to_numpy()
+    keep = np.ones(len(df), dtype=bool)
+    if shared.any():
+        keep[shared] = ~df[shared].duplicated().to_numpy()
+    return keep
+
+
+def unseen_rows(index, frames, new, hashes=None):
+    """Mask of rows of `new` found neither in `frames` nor earlier in `new`.
+
+    `index` holds the rows of `frames` (a frame or list of frames read as
+    their concatenation) with positions; only `new` is hashed, and hash
+    matches are verified against the indexed rows. The unseen rows are added
+    to the index at the positions they take when appended after `frames`.
+    """
+    frames = [frames] if isinstance(frames, pd.DataFrame) else frames
+    hashes = hash_rows(new) if hashes is None else hashes
+    keep = first_rows(new, hashes)
+    matched = index.lookup(hashes)
+    candidates = np.flatnonzero(keep & (matched >= 0))
+    if len(candidates):
+        same = _same_rows(new.iloc[candidates], _take(frames, matched[candidates]))
+        for i in candidates[~same]:
+            # 64-bit collision with a different row: compare against every row under this hash
+            rows = _take(frames, index.candidates(hashes[i]))
+            same[candidates == i] = _same_rows(new.iloc[[i] * len(rows)], rows).any()
+        keep[candidates[same]] = False
+    total = int(sum(len(f) for f in frames))
+    index.add(hashes[keep], total + np.arange(int(keep.sum())))
+    return keep
+
+
+def index_rows(df):
+    """RowHashIndex (with positions) of every row of a frame known to have no duplicate rows"""
+    index = RowHashIndex(positions=True)
+    index.add(hash_rows(df), np.arange(len(df)))
+    return index
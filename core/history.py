@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+
+class Delta:
+    """Changes turning one dataset state into the next.
+
+    `rows` selects rows of the previous state (boolean mask or integer
+    positions, None when rows are unchanged), `columns` is the new column
+    order and `changed` holds copies of only the columns whose values differ.
+    """
+
+    def __init__(self, rows, columns, changed, index=None):
+        self.rows = rows
+        self.columns = columns
+        self.changed = changed
+        self.index = index  # only set when the new index can't be derived from `rows`
+
+    @property
+    def nbytes(self):
+        size = 0 if self.rows is None else self.rows.nbytes
+        if self.index is not None:
+            size += self.index.memory_usage()
+        return size + sum(col.memory_usage(deep=True) for col in self.changed.values())
+
+
+def _row_positions(prev, new):
+    """Positions of `new` rows within `prev`, or None if they can't be matched"""
+    if not (prev.index.is_unique and new.index.is_unique):
+        return None
+    positions = prev.index.get_indexer(new.index)
+    if (positions < 0).any():
+        return None
+    return positions
+
+
+def make_delta(prev, new):
+    """Record how `new` differs from `prev`, copying only changed columns"""
+    index = None
+    if new.index.equals(prev.index):
+        rows = None
+    else:
+        rows = _row_positions(prev, new)
+        if rows is None:
+            index = new.index.copy()
+        elif len(rows) and (np.diff(rows) > 0).all():
+            # Dropped rows in original order: store as a compact mask
+            mask = np.zeros(len(prev), dtype=bool)
+            mask[rows] = True
+            rows = mask
+
+    changed = {}
+    columns_unique = prev.columns.is_unique and new.columns.is_unique
+    for col in new.columns:
+        if columns_unique and index is None and col in prev.columns:
+            old = prev[col] if rows is None else prev[col].iloc[rows]
+            if old.dtype == new[col].dtype and old.equals(new[col]):
+                continue
+        changed[col] = new[col].copy()
+    if not columns_unique:
+        # Duplicate labels can't be addressed per column, keep the whole frame
+        return Delta(None, new.columns.copy(), {None: new.copy()})
+    return Delta(rows, new.columns.copy(), changed, index)
+
+
+def apply_delta(prev, delta):
+    """Rebuild the next state from `prev` and a delta"""
+    if None in delta.changed:
+        return delta.changed[None]
+    if delta.index is not None:
+        df = pd.DataFrame(index=delta.index)
+    else:
+        df = prev if delta.rows is None else prev.iloc[delta.rows]
+        df = df[[col for col in delta.columns if col not in delta.changed]]
+    df = df.copy(deep=False)
+    for col, values in delta.changed.items():
+        df[col] = values.array
+    return df[list(delta.columns)]
+
+
+def _as_positions(rows, length):
+    if rows is None:
+        return np.arange(length)
+    if rows.dtype == bool:
+        return np.flatnonzero(rows)
+    return rows
+
+
+def compose_deltas(prev, first, second):
+    """Merge two consecutive deltas into one going straight from `prev`"""
+    if first.index is not None or second.index is not None or None in first.changed or None in second.changed:
+        middle = apply_delta(prev, first)
+        return make_delta(prev, apply_delta(middle, second))
+    first_pos = _as_positions(first.rows, len(prev))
+    second_pos = _as_positions(second.rows, len(first_pos))
+    rows = None if first.rows is None and second.rows is None else first_pos[second_pos]
+    changed = {}
+    for col in second.columns:
+        if col in second.changed:
+            changed[col] = second.changed[col]
+        elif col in first.changed:
+            values = first.changed[col]
+            changed[col] = values if second.rows is None else values.iloc[second.rows]
+    return Delta(rows, second.columns, changed)
+
+
+class DeltaHistory:
+    """Undo history that stores the original frame plus column-level deltas.
+
+    Frames handed to the history are treated as immutable snapshots and kept by
+    reference; only changed columns and row selections are copied. A full
+    checkpoint reference is kept every `checkpoint_interval` steps to bound
+    replay cost. When `memory_budget` (bytes) is exceeded, checkpoints are
+    dropped first and then the oldest undo steps are merged together, so the
+    original state always remains reachable and recent steps are merged last.
+    """
+
+    def __init__(self, base, checkpoint_interval=10, memory_budget=None):
+        self.base = base
+        self.checkpoint_interval = checkpoint_interval
+        self.memory_budget = memory_budget
+        self.deltas = []
+        self.checkpoints = {}  # step -> frame, excluding the base
+        self.tip = base
+
+    def __len__(self):
+        return len(self.deltas) + 1
+
+    @property
+    def nbytes(self):
+        size = sum(delta.nbytes for delta in self.deltas)
+        return size + sum(df.memory_usage(deep=True).sum() for df in self.checkpoints.values())
+
+    def push(self, df):
+        """Record `df` as the newest state"""
+        self.deltas.append(make_delta(self.tip, df))
+        self.tip = df
+        if self.checkpoint_interval and len(self.deltas) % self.checkpoint_interval == 0:
+            self.checkpoints[len(self.deltas)] = df
+        self._enforce_budget()
+
+    def state(self, step):
+        """Rebuild the state after `step` deltas"""
+        start = max((s for s in self.checkpoints if s <= step), default=0)
+        df = self.checkpoints.get(start, self.base)
+        for delta in self.deltas[start:step]:
+            df = apply_delta(df, delta)
+        return df
+
+    def pop(self):
+        """Drop the newest state and return the one before it"""
+        if not self.deltas:
+            return self.tip
+        self.deltas.pop()
+        self.checkpoints.pop(len(self.deltas) + 1, None)
+        self.tip = self.state(len(self.deltas))
+        return self.tip
+
+    def reset(self):
+        """Forget every step and return the original state"""
+        self.deltas = []
+        self.checkpoints = {}
+        self.tip = self.base
+        return self.base
+
+    def _enforce_budget(self):
+        if self.memory_budget is None:
+            return
+        while self.nbytes > self.memory_budget:
+            if self.checkpoints:
+                del self.checkpoints[min(self.checkpoints)]
+            elif len(self.deltas) > 1:
+                self.deltas[0:2] = [compose_deltas(self.base, self.deltas[0], self.deltas[1])]
+            else:
+                break
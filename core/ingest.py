@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from core.cache import FileCache, read_frame, write_frame
+from core.loader import load_file_in_chunks
+
+
+class IngestResult:
+    """Outcome of loading one file: `df` on success, `error` on failure"""
+
+    def __init__(self, path, df=None, error=None, seconds=0.0):
+        self.path = path
+        self.df = df
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _load_worker(path, spool_dir, cache_dir):
+    """Runs in a worker process: parse one file and return the path of a binary copy.
+
+    Returns (frame_path, owned, seconds). With a cache the cache entry itself is
+    handed back (owned=False); otherwise the frame is spooled to a file the
+    parent deletes after reading.
+    """
+    start = time.perf_counter()
+    if cache_dir is not None:
+        cache = FileCache(cache_dir)
+        entry = cache.lookup(path, compact=False)
+        if entry is None:
+            load_file_in_chunks(path, cache=cache)
+            entry = cache.lookup(path, compact=False)
+        if entry is not None:  # None if the entry alone exceeds the cache cap
+            return entry, False, time.perf_counter() - start
+    df = load_file_in_chunks(path)
+    spooled = write_frame(df, os.path.join(spool_dir, uuid.uuid4().hex))
+    return spooled, True, time.perf_counter() - start
+
+
+def ingest_files(paths, max_workers=None, cache=None):
+    """Load many CSV/Excel files on a process pool, yielding an IngestResult as each finishes.
+
+    Workers write each parsed frame to an Arrow IPC file (pickle without
+    pyarrow) which is memory-mapped back here, so frames never travel through
+    the pool's pickled result pipe. A failing file yields a result with
+    `error` set and does not affect the others. Closing the generator early
+    cancels files that have not started.
+    """
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return
+    workers = max_workers or min(len(paths), os.cpu_count() or 1)
+    spool_dir = tempfile.mkdtemp(prefix="ingest_")
+    cache_dir = cache.cache_dir if cache is not None else None
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {pool.submit(_load_worker, path, spool_dir, cache_dir): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                frame_path, owned, seconds = future.result()
+                df = read_frame(frame_path)
+                if owned:
+                    try:
+                        os.remove(frame_path)
+                    except OSError:
+                        pass  # still mapped on some platforms; removed with spool_dir
+            except BrokenProcessPool as e:
+                yield IngestResult(path, error=RuntimeError(f"worker process died: {e}"))
+            except Exception as e:
+                yield IngestResult(path, error=e)
+            else:
+                yield IngestResult(path, df=df, seconds=seconds)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(spool_dir, ignore_errors=True)
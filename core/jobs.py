@@ -0,0 +1,144 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+_PUBLISHED = object()  # marks queue entries carrying Job.publish items
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once cancellation has been requested"""
+
+
+class Job:
+    """A unit of background work with progress reporting and cooperative cancellation"""
+
+    def __init__(self, func, args, kwargs, keys, description, on_done, on_error, on_cancel, on_partial=None):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.keys = frozenset(keys)
+        self.description = description
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.on_partial = on_partial
+        self._outbox = None  # executor queue that carries publish()ed items
+        self.done = 0
+        self.total = None
+        self.message = ""
+        self.started = False
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Request cancellation; the job stops at its next progress report"""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.description)
+
+    def report(self, done, total=None, message=None):
+        """Progress callback handed to core functions (e.g. per loaded chunk)"""
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.check_cancelled()
+
+    def publish(self, item):
+        """Hand an intermediate result to on_partial(item) on the polling thread"""
+        if self._outbox is not None:
+            self._outbox.put((self, item, _PUBLISHED))
+
+    @property
+    def fraction(self):
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+
+class JobExecutor:
+    """Run jobs on a thread pool while the UI thread polls for results.
+
+    Jobs sharing a key (usually a dataset name) run one at a time in submission
+    order. Completion callbacks are only ever invoked from `poll()`, so UI code
+    can call it from `root.after` and touch widgets safely.
+    """
+
+    def __init__(self, max_workers=2):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._finished = queue.Queue()
+        self.running = []
+        self.waiting = []
+
+    def submit(self, func, *args, keys=(), description="", on_done=None, on_error=None,
+               on_cancel=None, on_partial=None, **kwargs):
+        """Queue `func(job, *args, **kwargs)` and return its Job"""
+        job = Job(func, args, kwargs, keys, description, on_done, on_error, on_cancel, on_partial)
+        job._outbox = self._finished
+        self.waiting.append(job)
+        self._schedule()
+        return job
+
+    def _schedule(self):
+        busy = set()
+        for job in self.running:
+            busy |= job.keys
+        for job in list(self.waiting):
+            if job.keys & busy:
+                # Later jobs on the same keys must wait behind this one
+                busy |= job.keys
+                continue
+            self.waiting.remove(job)
+            self.running.append(job)
+            busy |= job.keys
+            job.started = True
+            self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            job.check_cancelled()
+            result = job.func(job, *job.args, **job.kwargs)
+            self._finished.put((job, result, None))
+        except BaseException as e:
+            self._finished.put((job, None, e))
+
+    def poll(self):
+        """Dispatch callbacks for published items and finished jobs; call from the UI thread"""
+        while True:
+            try:
+                job, result, error = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            if error is _PUBLISHED:
+                if job.on_partial:
+                    job.on_partial(result)
+                continue
+            self.running.remove(job)
+            self._schedule()
+            if isinstance(error, JobCancelled) or (error is None and job.cancelled):
+                if job.on_cancel:
+                    job.on_cancel()
+            elif error is not None:
+                if job.on_error:
+                    job.on_error(error)
+            elif job.on_done:
+                job.on_done(result)
+
+    @property
+    def busy(self):
+        return bool(self.running or self.waiting)
+
+    def cancel_all(self):
+        for job in self.running + self.waiting:
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,302 @@
+import weakref
+import numpy as np
+import pandas as pd
+from core.hashindex import RowHashIndex, hash_rows, unseen_rows
+
+
+def dtype_family(dtype):
+    """Coarse dtype group used to decide whether two key columns can be joined"""
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "number"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "text"
+
+
+def encode_keys(left, right, keys):
+    """Encode the key columns of both frames as shared integer codes.
+
+    Returns (left_codes, right_codes, key_table) where key_table holds the key
+    values for each code.
+    """
+    both = pd.concat([left[keys], right[keys]], ignore_index=True)
+    codes = both.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    first = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+    key_table = both.iloc[first].reset_index(drop=True)
+    return codes[:len(left)], codes[len(left):], key_table
+
+
+def profile_join(left, right, keys):
+    """Exact outer-join size and key uniqueness for joining two frames on `keys`"""
+    left_codes, right_codes, key_table = encode_keys(left, right, keys)
+    left_counts = np.bincount(left_codes, minlength=len(key_table))
+    right_counts = np.bincount(right_codes, minlength=len(key_table))
+    inner = int((left_counts * right_counts).sum())
+    return {
+        "keys": keys,
+        "inner_rows": inner,
+        "left_only_rows": int(left_counts[right_counts == 0].sum()),
+        "right_only_rows": int(right_counts[left_counts == 0].sum()),
+        "left_unique": bool((left_counts <= 1).all()),
+        "right_unique": bool((right_counts <= 1).all()),
+        "distinct_keys": len(key_table),
+    }
+
+
+class JoinStep:
+    """Join the accumulated result with frame `index` on `keys` (empty keys means append)"""
+
+    def __init__(self, index, keys, estimated_rows, warnings):
+        self.index = index
+        self.keys = keys
+        self.estimated_rows = estimated_rows
+        self.warnings = warnings
+
+
+class MergePlan:
+    """How merge_datasets will combine a list of frames, with its estimated output size"""
+
+    def __init__(self, kind, start, steps, estimated_rows, warnings):
+        self.kind = kind  # "union" or "join"
+        self.start = start
+        self.steps = steps
+        self.estimated_rows = estimated_rows
+        self.warnings = warnings
+        self._union = None  # (weakrefs to the planned frames, keep masks, index) of a union
+
+    def union_masks(self, dfs):
+        """(masks, index) found while planning a union of exactly these frames, or None; handed out once"""
+        prepared, self._union = self._union, None
+        if prepared is None:
+            return None
+        refs, masks, index = prepared
+        if len(refs) != len(dfs) or any(ref() is not df for ref, df in zip(refs, dfs)):
+            return None
+        return masks, index
+
+    @property
+    def order(self):
+        return [self.start] + [step.index for step in self.steps]
+
+    def describe(self, names=None):
+        """Human readable summary for confirmation dialogs"""
+        label = (lambda i: names[i]) if names else (lambda i: f"#{i + 1}")
+        if self.kind == "union":
+            lines = [f"Append {len(self.order)} datasets with identical columns and drop duplicate rows."]
+        else:
+            lines = [f"Start with {label(self.start)}."]
+            for step in self.steps:
+                if step.keys:
+                    lines.append(f"Outer join {label(step.index)} on {', '.join(map(str, step.keys))} "
+                                 f"(~{step.estimated_rows:,} rows)")
+                else:
+                    lines.append(f"Append {label(step.index)} (no joinable shared columns, ~{step.estimated_rows:,} rows)")
+        lines.append(f"Estimated output: {self.estimated_rows:,} rows")
+        lines.extend(f"Warning: {w}" for w in self.warnings)
+        return "\n".join(lines)
+
+
+def _common_dtypes(dfs):
+    return pd.concat([df.head(0) for df in dfs]).dtypes
+
+
+def _align_for_union(dfs):
+    columns = list(dfs[0].columns)
+    dtypes = _common_dtypes(dfs)
+    aligned = []
+    for df in dfs:
+        df = df[columns]
+        casts = {col: dtypes[col] for col in columns if df[col].dtype != dtypes[col]}
+        aligned.append(df.astype(casts) if casts else df)
+    return aligned
+
+
+def _union_keep_masks(dfs, hashes=None):
+    """Per-frame masks of rows to keep so the concatenation has no duplicate rows.
+
+    Rows whose 64-bit hash is unique are kept without further checks; only rows
+    sharing a hash are compared exactly.
+    """
+    hashes = [hash_rows(df) for df in dfs] if hashes is None else hashes
+    shared = pd.Series(np.concatenate(hashes)).duplicated(keep=False).to_numpy()
+    bounds = np.cumsum([0] + [len(h) for h in hashes])
+    candidates = pd.concat([df[shared[bounds[i]:bounds[i + 1]]] for i, df in enumerate(dfs)], ignore_index=True)
+    candidate_keep = ~candidates.duplicated().to_numpy()
+    keep = np.ones(bounds[-1], dtype=bool)
+    keep[shared] = candidate_keep
+    return [keep[bounds[i]:bounds[i + 1]] for i in range(len(dfs))]
+
+
+def _base_index(dfs, aligned, index):
+    """`index` (of the first frame) if that frame was not cast for the union, else None"""
+    if index is not None and aligned[0].dtypes.equals(dfs[0].dtypes):
+        return index
+    return None
+
+
+def _union_masks(dfs, aligned, index=None):
+    """Per-frame masks of the rows a union keeps, and the RowHashIndex of its result"""
+    index = _base_index(dfs, aligned, index)
+    if index is None:
+        hashes = [hash_rows(df) for df in aligned]
+        masks = _union_keep_masks(aligned, hashes)
+        index = RowHashIndex(positions=True)
+        kept = np.concatenate([h[mask] for h, mask in zip(hashes, masks)])
+        index.add(kept, np.arange(len(kept)))
+        return masks, index
+    index, parts = index.copy(), [aligned[0]]
+    masks = [np.ones(len(aligned[0]), dtype=bool)]
+    for df in aligned[1:]:
+        masks.append(unseen_rows(index, parts, df))
+        parts.append(df[masks[-1]])
+    return masks, index
+
+
+def union_frames(dfs, aligned, index=None, masks=None):
+    """Concatenate aligned frames without duplicate rows; returns (merged, RowHashIndex of merged).
+
+    `index` is a RowHashIndex of the first frame, given only when that frame
+    has no duplicate rows (e.g. Dataset.row_index). Only the other frames are
+    then hashed and probed against it, so appending to a large de-duplicated
+    frame costs time proportional to the new rows. `index` is not changed.
+    `masks` is a (masks, index) pair already computed by plan_merge.
+    """
+    masks, index = _union_masks(dfs, aligned, index) if masks is None else masks
+    parts = [df if mask.all() else df[mask] for df, mask in zip(aligned, masks)]
+    return pd.concat(parts, ignore_index=True), index
+
+
+def _join_keys(columns, df, dtypes_left):
+    keys, warnings = [], []
+    for col in df.columns:
+        if col not in columns:
+            continue
+        if dtype_family(dtypes_left[col]) == dtype_family(df[col].dtype):
+            keys.append(col)
+        else:
+            warnings.append(f"column '{col}' has incompatible types "
+                            f"({dtypes_left[col]} vs {df[col].dtype}) and is not used as a key")
+    return keys, warnings
+
+
+def plan_merge(dfs, index=None):
+    """Profile shared key columns and choose a join order that keeps intermediates small.
+
+    Frames with identical column sets are unioned. Otherwise the pair with the
+    smallest outer join starts the plan and the frame giving the smallest next
+    intermediate is added greedily. Sizes after the first join are estimated by
+    scaling the exact pairwise profile against the frame that owns the key.
+    `index` is the first frame's RowHashIndex as for union_frames. A union's
+    row count is exact, and execute_merge_plan reuses the duplicate masks found
+    for it when run once on the same frames.
+    """
+    first_cols = set(dfs[0].columns)
+    if all(set(df.columns) == first_cols for df in dfs[1:]):
+        masks, union_index = _union_masks(dfs, _align_for_union(dfs), index)
+        estimated = int(sum(mask.sum() for mask in masks))
+        plan = MergePlan("union", 0, [JoinStep(i, [], estimated, []) for i in range(1, len(dfs))], estimated, [])
+        # The exact count already found every duplicate, so execute_merge_plan reuses that work
+        plan._union = ([weakref.ref(df) for df in dfs], masks, union_index)
+        return plan
+
+    profiles = {}
+
+    def profile(i, j, keys):
+        if (i, j, tuple(keys)) not in profiles:
+            profiles[(i, j, tuple(keys))] = profile_join(dfs[i], dfs[j], keys)
+        return profiles[(i, j, tuple(keys))]
+
+    # Pick the cheapest starting pair
+    best = None
+    for i in range(len(dfs)):
+        for j in range(i + 1, len(dfs)):
+            keys, _ = _join_keys(set(dfs[i].columns), dfs[j], dfs[i].dtypes)
+            if not keys:
+                continue
+            p = profile(i, j, keys)
+            size = p["inner_rows"] + p["left_only_rows"] + p["right_only_rows"]
+            if best is None or size < best[0]:
+                best = (size, i)
+    start = best[1] if best else 0
+
+    steps, warnings = [], []
+    columns = list(dfs[start].columns)
+    dtypes = dfs[start].dtypes.copy()
+    owners = {col: start for col in columns}  # which frame a column came from
+    rows = len(dfs[start])
+    remaining = [i for i in range(len(dfs)) if i != start]
+    while remaining:
+        candidates = []
+        for j in remaining:
+            keys, key_warnings = _join_keys(set(columns), dfs[j], dtypes)
+            if not keys:
+                candidates.append((rows + len(dfs[j]), 1, j, keys, key_warnings, None))
+                continue
+            owner = max(set(owners[k] for k in keys), key=lambda o: sum(owners[k] == o for k in keys))
+            owned = [k for k in keys if owners[k] == owner]
+            p = profile(owner, j, owned)
+            fanout = (p["inner_rows"] + p["left_only_rows"]) / max(len(dfs[owner]), 1)
+            estimate = int(round(rows * fanout)) + p["right_only_rows"]
+            candidates.append((estimate, 0, j, keys, key_warnings, p))
+        estimate, _, j, keys, key_warnings, p = min(candidates, key=lambda c: (c[1], c[0]))
+        step_warnings = list(key_warnings)
+        if p is not None and not p["left_unique"] and not p["right_unique"]:
+            step_warnings.append(f"many-to-many join on {', '.join(map(str, keys))}: "
+                                 f"keys repeat on both sides, output may grow to ~{estimate:,} rows")
+        steps.append(JoinStep(j, keys, estimate, step_warnings))
+        warnings.extend(step_warnings)
+        for col in dfs[j].columns:
+            if col not in owners:
+                owners[col] = j
+                columns.append(col)
+                dtypes[col] = dfs[j][col].dtype
+        rows = estimate
+        remaining.remove(j)
+    return MergePlan("join", start, steps, rows, warnings)
+
+
+def join_on_codes(left, right, keys):
+    """Outer join two frames on shared integer key codes instead of raw key columns"""
+    left_codes, right_codes, key_table = encode_keys(left, right, keys)
+    left_part = left.drop(columns=keys).assign(__key__=left_codes)
+    right_part = right.drop(columns=keys).assign(__key__=right_codes)
+    merged = pd.merge(left_part, right_part, on="__key__", how="outer")
+    key_values = key_table.iloc[merged["__key__"].to_numpy()].reset_index(drop=True)
+    merged = merged.drop(columns="__key__").reset_index(drop=True)
+    for col in keys:
+        merged[col] = key_values[col].to_numpy()
+    order = list(left.columns) + [c for c in merged.columns if c not in left.columns]
+    return merged[order]
+
+
+def execute_merge_plan(dfs, plan, progress=None, index=None, on_unique=None):
+    """Run a MergePlan, calling progress(done, total) after each step.
+
+    A union uses `index` as union_frames does and passes the result's
+    RowHashIndex to on_unique(index), as the result has no duplicate rows.
+    """
+    if plan.kind == "union":
+        merged, merged_index = union_frames(dfs, _align_for_union(dfs), index, plan.union_masks(dfs))
+        if on_unique:
+            on_unique(merged_index)
+        if progress:
+            progress(1, 1)
+        return merged
+
+    merged = dfs[plan.start]
+    for done, step in enumerate(plan.steps, start=1):
+        if step.keys:
+            merged = join_on_codes(merged, dfs[step.index], step.keys)
+        else:
+            # No shared keys, just append (will create NaNs)
+            merged = pd.concat([merged, dfs[step.index]], ignore_index=True)
+        if progress:
+            progress(done, len(plan.steps))
+
+    # Keep columns in the order the inputs list them, whatever the join order was
+    input_order = list(dict.fromkeys(col for df in dfs for col in df.columns))
+    if set(input_order) == set(merged.columns):
+        merged = merged[input_order]
+    return merged
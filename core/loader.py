@@ -1,10 +1,236 @@
+import os
+import numpy as np
 import pandas as pd
+from core.memory import compact_dataframe
 
-def load_file(path):
-    """Load CSV or Excel file as a DataFrame"""
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_SAMPLE_ROWS = 10_000
+
+
+def load_file(path, cache=None, compact=False):
+    """Load CSV or Excel file as a DataFrame, reusing a parsed copy from `cache` (a FileCache) if given.
+
+    With `compact=True` the frame is shrunk losslessly (see core.memory.compact_dataframe).
+    """
+    if cache is not None:
+        df = cache.get(path, compact=compact)
+        if df is None:
+            df = load_file(path, compact=compact)
+            cache.put(path, df, compact=compact)
+        return df
     if path.endswith(".csv"):
-        return pd.read_csv(path)
+        df = pd.read_csv(path)
     elif path.endswith(".xlsx") or path.endswith(".xls"):
-        return pd.read_excel(path)
+        df = pd.read_excel(path)
     else:
         raise ValueError("Unsupported file format")
+    return compact_dataframe(df)[0] if compact else df
+
+
+def load_file_in_chunks(path, chunksize=DEFAULT_CHUNKSIZE, progress=None, cache=None):
+    """Load a whole file through iter_file_chunks, calling progress(rows_loaded, rows_estimate) per chunk.
+
+    The result matches load_file, and shares its cache entries.
+    """
+    if cache is not None:
+        df = cache.get(path, compact=False)
+        if df is None:
+            df = load_file_in_chunks(path, chunksize=chunksize, progress=progress)
+            cache.put(path, df, compact=False)
+        elif progress:
+            progress(len(df), len(df))
+        return df
+    total = estimate_row_count(path)
+    chunks = _read_chunks(path, chunksize, progress, total)
+    if not chunks:
+        return load_file(path)
+    final = chunks[-1].dtypes
+    if any((chunk.dtypes != final)[final != object].any() for chunk in chunks):
+        # A later chunk widened a column; read again with the final dtypes so early rows parse the same way
+        chunks = _read_chunks(path, chunksize, progress, total, dtypes=final.to_dict())
+    df = pd.concat(chunks)
+    # Nullable dtypes were only needed to keep chunks consistent; convert them the way read_csv types such columns
+    for col, dtype in df.dtypes.items():
+        if dtype == "Int64":
+            df[col] = df[col].astype("float64" if df[col].hasnans else dtype.numpy_dtype)
+        elif dtype == "boolean":
+            df[col] = df[col].to_numpy(dtype=object, na_value=np.nan) if df[col].hasnans else df[col].astype(bool)
+    return df
+
+
+def _read_chunks(path, chunksize, progress, total, dtypes=None):
+    chunks = []
+    rows = 0
+    for chunk in iter_file_chunks(path, chunksize=chunksize, dtypes=dtypes):
+        chunks.append(chunk)
+        rows += len(chunk)
+        if progress:
+            progress(rows, max(total, rows) if total else None)
+    return chunks
+
+
+def estimate_row_count(path, probe_bytes=1 << 16):
+    """Cheap estimate of the number of data rows, or None if unknown"""
+    if path.endswith(".csv"):
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(probe_bytes)
+        lines = head.count(b"\n")
+        if lines == 0:
+            return 0
+        if len(head) < probe_bytes:
+            return max(lines - 1 + (not head.endswith(b"\n")), 0)
+        return max(int(size / (len(head) / lines)) - 1, 0)
+    if path.endswith(".xlsx"):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        try:
+            max_row = wb.active.max_row
+        finally:
+            wb.close()
+        return max(max_row - 1, 0) if max_row else None
+    return None
+
+
+# -------- Streaming loader --------
+def infer_dtypes(sample):
+    """Infer a dtype per column from a leading sample, safe to enforce on later chunks"""
+    dtypes = {}
+    for col, dtype in sample.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            dtypes[col] = "boolean"
+        elif pd.api.types.is_integer_dtype(dtype):
+            # Later chunks may contain blanks the sample never saw
+            dtypes[col] = "Int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = "float64"
+        elif dtype != object:
+            # Mixed object columns are parsed per chunk: enforcing object would keep every value as raw text
+            dtypes[col] = dtype
+    return dtypes
+
+
+def widen_dtypes(chunk, dtypes):
+    """Dtypes that also fit `chunk` (parsed without enforcement): numbers widen to float64, anything else to the chunk's own dtype"""
+    widened = dict(dtypes)
+    for col, dtype in dtypes.items():
+        if col not in chunk.columns:
+            continue
+        try:
+            chunk[col].astype(dtype)
+        except (ValueError, TypeError):
+            actual = chunk[col].dtype
+            if pd.api.types.is_numeric_dtype(actual) and not pd.api.types.is_bool_dtype(actual):
+                widened[col] = "float64" if pd.api.types.is_numeric_dtype(dtype) else object
+            else:
+                widened[col] = object if pd.api.types.is_bool_dtype(actual) else actual
+    return widened
+
+
+def enforce_dtypes(chunk, dtypes):
+    """Cast a chunk to `dtypes`, widening those it doesn't fit (see widen_dtypes); returns (chunk, dtypes)"""
+    dtypes = {col: dtype for col, dtype in dtypes.items() if col in chunk.columns}
+    try:
+        return chunk.astype(dtypes), dtypes
+    except (ValueError, TypeError):
+        dtypes = widen_dtypes(chunk.infer_objects(), dtypes)
+        return chunk.astype(dtypes), dtypes
+
+
+def iter_file_chunks(path, chunksize=DEFAULT_CHUNKSIZE, usecols=None, nrows=None,
+                     sample_rows=DEFAULT_SAMPLE_ROWS, dtypes=None):
+    """Yield a CSV or Excel file as DataFrame chunks of at most `chunksize` rows.
+
+    Column dtypes are inferred from the first `sample_rows` rows (or given as
+    `dtypes`) and enforced on every chunk, so chunks share one schema. A
+    chunk that doesn't fit widens its columns (integers to floats, anything
+    else to text) for it and every later chunk. `usecols` restricts the
+    columns read and `nrows` caps the total number of rows yielded.
+    """
+    if chunksize <= 0:
+        raise ValueError("chunksize must be positive")
+    if path.endswith(".csv"):
+        chunks = _iter_csv_chunks(path, chunksize, usecols, nrows, sample_rows, dtypes)
+    elif path.endswith(".xlsx"):
+        chunks = _iter_xlsx_chunks(path, chunksize, usecols, nrows, sample_rows, dtypes)
+    elif path.endswith(".xls"):
+        # xlrd has no streaming reader, so slice a full read
+        df = pd.read_excel(path, usecols=usecols, nrows=nrows)
+        chunks = (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+    else:
+        raise ValueError("Unsupported file format")
+    yield from chunks
+
+
+def _iter_csv_chunks(path, chunksize, usecols, nrows, sample_rows, dtypes=None):
+    if dtypes is None:
+        sample_size = sample_rows if nrows is None else min(sample_rows, nrows)
+        dtypes = infer_dtypes(pd.read_csv(path, usecols=usecols, nrows=max(sample_size, 1)))
+    done = 0
+    while True:
+        remaining = None if nrows is None else nrows - done
+        skip = range(1, done + 1)  # rows already yielded, keeping the header
+        try:
+            with pd.read_csv(path, usecols=usecols, nrows=remaining, chunksize=chunksize, dtype=dtypes,
+                             skiprows=skip) as reader:
+                for chunk in reader:
+                    chunk.index = pd.RangeIndex(done, done + len(chunk))
+                    done += len(chunk)
+                    yield chunk
+            return
+        except (ValueError, TypeError):
+            # Re-parse from the first row not yielded without enforcement until a chunk doesn't fit,
+            # then carry on from there with its columns widened
+            widened = dtypes
+            with pd.read_csv(path, usecols=usecols, nrows=remaining, chunksize=chunksize, skiprows=skip) as reader:
+                for raw in reader:
+                    widened = widen_dtypes(raw, dtypes)
+                    if widened != dtypes:
+                        break
+            if widened == dtypes:
+                raise
+            dtypes = widened
+
+
+def _iter_xlsx_chunks(path, chunksize, usecols, nrows, sample_rows, dtypes=None):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+        keep = list(range(len(header))) if usecols is None else [i for i, h in enumerate(header) if h in usecols]
+        columns = [header[i] for i in keep]
+
+        offset = 0
+        buffer = []
+        remaining = nrows
+        batch_size = max(chunksize, sample_rows)  # the first batch doubles as the sample
+        for row in rows:
+            if remaining is not None and remaining <= 0:
+                break
+            buffer.append([row[i] if i < len(row) else None for i in keep])
+            if remaining is not None:
+                remaining -= 1
+            if len(buffer) >= batch_size:
+                dtypes, chunks = _emit_xlsx_batch(buffer, columns, dtypes, chunksize, offset)
+                yield from chunks
+                offset += len(buffer)
+                buffer = []
+                batch_size = chunksize
+        if buffer:
+            dtypes, chunks = _emit_xlsx_batch(buffer, columns, dtypes, chunksize, offset)
+            yield from chunks
+    finally:
+        wb.close()
+
+
+def _emit_xlsx_batch(buffer, columns, dtypes, chunksize, offset):
+    df = pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(offset, offset + len(buffer)))
+    if dtypes is None:
+        dtypes = infer_dtypes(df.infer_objects())
+    df, dtypes = enforce_dtypes(df, dtypes)
+    return dtypes, [df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize)]
@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+from core.profiling import frame_stats
+
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+
+def _digest(values):
+    return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+
+
+def column_fingerprint(col_data):
+    """128-bit digest of a column's values (not its index or name)"""
+    return _digest(pd.util.hash_pandas_object(col_data, index=False).to_numpy())
+
+
+def frame_fingerprint(df):
+    """Content fingerprint of a DataFrame: the index digest plus (name, dtype, digest) per column"""
+    index = _digest(pd.util.hash_pandas_object(df.index).to_numpy())
+    columns = tuple((str(name), str(df[name].dtype), column_fingerprint(df[name])) for name in df.columns)
+    return index, columns
+
+
+def freeze(value):
+    """Hashable form of operation parameters (dicts, lists and tuples nested in any way)"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def same_content(result, df):
+    """True if `result` holds exactly the same data as `df`"""
+    if result is df:
+        return True
+    if not isinstance(result, pd.DataFrame) or result.shape != df.shape:
+        return False
+    if not result.columns.equals(df.columns) or not result.dtypes.equals(df.dtypes):
+        return False
+    return frame_fingerprint(result) == frame_fingerprint(df)
+
+
+class ResultCache:
+    """Operation results keyed by (input fingerprints, op, params), evicted LRU beyond `max_bytes`.
+
+    Results that are still registered as datasets cost no extra memory, but
+    the cache keeps them alive until evicted.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (result, nbytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _size(result):
+        frames = result if isinstance(result, (list, tuple)) else [result]
+        return sum(frame_stats(f)[2] or 0 for f in frames if isinstance(f, pd.DataFrame))
+
+    def get(self, key):
+        """Cached result for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        size = self._size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.nbytes += size
+            self._trim(self.max_bytes)
+
+    def trim(self, max_bytes):
+        """Evict least recently used results until at most max_bytes are held; returns bytes freed"""
+        with self._lock:
+            return self._trim(max_bytes)
+
+    def _trim(self, max_bytes):
+        freed = 0
+        while self._entries and self.nbytes > max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+            freed += evicted
+        return freed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
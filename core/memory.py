@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRINGS = True
+except ImportError:
+    ARROW_STRINGS = False
+
+CATEGORY_MAX_RATIO = 0.5  # convert text columns with at most this share of distinct values
+
+
+def column_memory(df):
+    """Bytes used by each column, including Python string objects"""
+    return df.memory_usage(deep=True, index=False)
+
+
+def _is_text(dtype):
+    return dtype == object or pd.api.types.is_string_dtype(dtype)
+
+
+def _downcast_float(col_data):
+    """float64 -> float32 only when every value survives the round trip"""
+    if col_data.dtype != np.float64:
+        return col_data
+    narrowed = col_data.astype(np.float32)
+    if np.array_equal(narrowed.to_numpy(dtype=np.float64), col_data.to_numpy(), equal_nan=True):
+        return narrowed
+    return col_data
+
+
+def compact_column(col_data, category_max_ratio=CATEGORY_MAX_RATIO):
+    """Return a lossless, smaller representation of one column"""
+    dtype = col_data.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return col_data
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(col_data, downcast="integer")
+    if pd.api.types.is_float_dtype(dtype):
+        return _downcast_float(col_data)
+    if _is_text(dtype):
+        if len(col_data) and col_data.nunique(dropna=True) <= category_max_ratio * len(col_data):
+            return col_data.astype("category")
+        if ARROW_STRINGS and dtype == object and pd.api.types.infer_dtype(col_data, skipna=True) == "string":
+            return col_data.astype(pd.StringDtype("pyarrow"))
+    return col_data
+
+
+def compact_dataframe(df, category_max_ratio=CATEGORY_MAX_RATIO):
+    """Shrink a DataFrame losslessly and report memory per column.
+
+    Low-cardinality text becomes `category`, integers and floats are downcast
+    when no value changes, and remaining text uses Arrow-backed strings when
+    pyarrow is installed. Returns (compacted_df, report) where report is a
+    DataFrame of before/after bytes and dtypes per column.
+    """
+    before = column_memory(df)
+    compacted = df.copy(deep=False)
+    for col in df.columns:
+        new_col = compact_column(df[col], category_max_ratio)
+        if new_col is not df[col]:
+            compacted[col] = new_col
+    after = column_memory(compacted)
+    report = pd.DataFrame({
+        "dtype_before": df.dtypes.astype(str),
+        "dtype_after": compacted.dtypes.astype(str),
+        "bytes_before": before,
+        "bytes_after": after,
+    })
+    report.index.name = "column"
+    return compacted, report
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
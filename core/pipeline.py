@@ -0,0 +1,86 @@
+import os
+import tempfile
+from core.cache import read_frame, write_frame
+from core.hashindex import RowHashIndex, unseen_rows
+from core.loader import iter_file_chunks, DEFAULT_CHUNKSIZE
+from utils.exporter import export_chunks
+from core.processor import (remove_duplicates, handle_missing_values, standardize_data, standardize_column,
+                            apply_column_transforms, missing_strategy, ROW_STRATEGIES)
+
+# Steps that only look at the rows of the current chunk
+CHUNK_STEPS = {
+    "handle_missing_values": handle_missing_values,
+    "standardize_data": standardize_data,
+    "standardize_column": standardize_column,
+    "apply_column_transforms": apply_column_transforms,
+}
+
+# Every step a pipeline or lazy plan can run, as whole-frame functions
+STEPS = dict(CHUNK_STEPS, remove_duplicates=remove_duplicates)
+
+
+def chunk_local(name, kwargs):
+    """True if a step can run on each chunk alone (missing-value statistics and fills need whole columns)"""
+    if name == "handle_missing_values" and kwargs.get("strategies"):
+        return all(missing_strategy(spec)[0] in ROW_STRATEGIES for spec in kwargs["strategies"].values())
+    return name in CHUNK_STEPS
+
+
+def _normalize_steps(steps):
+    normalized = []
+    for step in steps:
+        name, kwargs = (step, {}) if isinstance(step, str) else step
+        if name not in STEPS:
+            raise ValueError(f"Unsupported pipeline step: {name}")
+        if name != "remove_duplicates" and not chunk_local(name, kwargs):
+            raise ValueError(f"{name} with {kwargs} needs whole columns and can't run chunk by chunk")
+        normalized.append((name, dict(kwargs)))
+    return normalized
+
+
+def iter_pipeline(chunks, steps, spool_dir=None):
+    """Push DataFrame chunks through processor steps, yielding each processed chunk.
+
+    `steps` is a list of step names or (name, kwargs) pairs, applied in order.
+    `remove_duplicates` keeps a hashed row-key index across chunks, so a row is
+    dropped whenever an identical row was already emitted by an earlier chunk.
+    Hash matches are checked against the emitted rows themselves, as in
+    core.hashindex.unseen_rows; those rows are kept in memory, or with
+    `spool_dir` written there and memory-mapped back.
+    """
+    steps = _normalize_steps(steps)
+    seen = [(RowHashIndex(positions=True), []) if name == "remove_duplicates" else None for name, _ in steps]
+    for number, chunk in enumerate(chunks):
+        for position, ((name, kwargs), dedup) in enumerate(zip(steps, seen)):
+            if dedup is None:
+                chunk = CHUNK_STEPS[name](chunk, **kwargs)
+                continue
+            index, emitted = dedup
+            chunk = chunk[unseen_rows(index, emitted, chunk)]
+            if spool_dir is None:
+                emitted.append(chunk)
+            else:
+                emitted.append(read_frame(write_frame(chunk, os.path.join(spool_dir, f"seen_{position}_{number}"))))
+        yield chunk
+
+
+def clean_file(input_path, output_path, steps, chunksize=DEFAULT_CHUNKSIZE):
+    """Clean a CSV/Excel file chunk by chunk, streaming the result to `output_path`.
+
+    Peak memory is bounded by the chunk size plus the de-duplication index;
+    the rows de-duplication compares against are spooled to a temporary
+    directory and memory-mapped. Returns a summary of rows read and written.
+    """
+    summary = {"chunks": 0, "rows_in": 0, "rows_out": 0}
+
+    def counted(chunks):
+        for chunk in chunks:
+            summary["chunks"] += 1
+            summary["rows_in"] += len(chunk)
+            yield chunk
+
+    with tempfile.TemporaryDirectory(prefix="dedup_") as spool_dir:
+        chunks = iter_pipeline(counted(iter_file_chunks(input_path, chunksize=chunksize)), steps, spool_dir)
+        summary["rows_out"] = export_chunks(chunks, output_path)
+    return summary
+
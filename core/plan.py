@@ -0,0 +1,77 @@
+import pandas as pd
+from core.loader import DEFAULT_CHUNKSIZE
+from core.pipeline import chunk_local, iter_pipeline, STEPS
+from utils.exporter import iter_frame_chunks
+
+# Steps that rewrite single columns and can share one apply_column_transforms pass
+COLUMN_STEPS = ("standardize_column", "apply_column_transforms")
+
+
+def _column_plan(name, kwargs):
+    if name == "apply_column_transforms":
+        return list(kwargs["plan"])
+    kwargs = dict(kwargs)
+    return [(kwargs.pop("column"), kwargs.pop("method"), kwargs)]
+
+
+def fuse_steps(steps):
+    """Merge consecutive column transforms into a single apply_column_transforms step"""
+    fused = []
+    for name, kwargs in steps:
+        if name in COLUMN_STEPS:
+            plan = _column_plan(name, kwargs)
+            if fused and fused[-1][0] == "apply_column_transforms":
+                plan = fused.pop()[1]["plan"] + plan
+            fused.append(("apply_column_transforms", {"plan": plan}))
+        else:
+            fused.append((name, kwargs))
+    return fused
+
+
+class LazyPlan:
+    """Processor steps recorded against a source frame, executed only when a result is needed.
+
+    Steps are (name, kwargs) pairs naming functions in core.pipeline.STEPS.
+    Plans are immutable: `then` returns a new plan sharing the same source.
+    """
+
+    def __init__(self, source, steps=()):
+        self.source = source
+        self.steps = list(steps)
+
+    def then(self, name, **kwargs):
+        if name not in STEPS:
+            raise ValueError(f"Unsupported plan step: {name}")
+        return LazyPlan(self.source, self.steps + [(name, kwargs)])
+
+    @property
+    def columns(self):
+        # Every supported step keeps the source's columns
+        return self.source.columns
+
+    def collect(self):
+        """Run the fused plan over the whole source frame"""
+        df = self.source
+        for name, kwargs in fuse_steps(self.steps):
+            df = STEPS[name](df, **kwargs)
+        return df
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNKSIZE):
+        """Stream the result chunk by chunk, materializing it only if a step needs whole columns"""
+        steps = fuse_steps(self.steps)
+        if not all(name == "remove_duplicates" or chunk_local(name, kwargs) for name, kwargs in steps):
+            return iter_frame_chunks(self.collect(), chunksize)
+        return iter_pipeline(iter_frame_chunks(self.source, chunksize), steps)
+
+    def head(self, n):
+        """Compute only as many source chunks as needed for the first `n` result rows"""
+        parts = []
+        rows = 0
+        for chunk in self.iter_chunks(chunksize=max(n, 1000)):
+            parts.append(chunk)
+            rows += len(chunk)
+            if rows >= n:
+                break
+        if not parts:
+            return self.collect().head(n)
+        return pd.concat(parts).head(n)
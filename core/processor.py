@@ -1,90 +1,333 @@
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from num2words import num2words
 from word2number import w2n
+from core.fuzzy import DEFAULT_THRESHOLD, near_duplicate_clusters
+from core.joins import plan_merge, execute_merge_plan
+
+CONVERSION_CACHE_SIZE = 65536  # distinct values remembered across calls
+_PARSE_FAILED = object()
 
 # -------- Per-file operations --------
-def remove_duplicates(df):
-    return df.drop_duplicates()
-
-def handle_missing_values(df, method="delete", fill_value=None):
-    if method == "delete":
-        return df.dropna()
-    elif method == "zero":
-        return df.fillna(0)
-    elif method == "fill" and fill_value is not None:
-        return df.fillna(fill_value)
+def remove_duplicates(df, index=None):
+    """Drop repeated rows, keeping the first.
+
+    `index` is df's RowHashIndex (e.g. Dataset.row_index), given only when df
+    is known to have no duplicate rows; df is then returned as is.
+    """
+    if index is not None:
+        return df
+    result = df.drop_duplicates()
+    return df if len(result) == len(df) else result
+
+def flag_near_duplicates(df, columns=None, threshold=DEFAULT_THRESHOLD, column="duplicate_cluster"):
+    """Add a cluster id column instead of dropping rows; rows sharing an id differ only in
+    case/whitespace or by small typos (see core.fuzzy.near_duplicate_clusters)"""
+    if columns is None:
+        columns = [col for col in df.columns if col != column]
+    result = df.copy(deep=False)
+    result[column] = near_duplicate_clusters(df, columns, threshold).to_numpy()
+    return result
+
+def handle_missing_values(df, method="delete", fill_value=None, strategies=None, missing=None):
+    """Drop rows with missing values or fill them; only columns that contain any are touched.
+
+    Without `strategies`, `method` applies to the whole frame: "delete" drops
+    rows with any missing value, "zero" and "fill" put a constant into every
+    column it fits once converted to the column's dtype, so text never turns a
+    numeric column into objects. `strategies` instead maps columns to a
+    strategy (see missing_strategy); columns not in it are left as is.
+    `missing` lists the columns known to have missing values (e.g. from
+    Dataset.missing_columns()) so the others aren't scanned; by default
+    every column is checked.
+    """
+    if missing is not None:
+        missing = list(np.flatnonzero(df.columns.isin(missing)))
+    if method == "delete" and strategies is None:
+        if missing is None:
+            return df.dropna()  # skips clean columns itself
+        return df.dropna(subset=df.columns[missing]) if missing else df
+    if missing is None:
+        missing = [j for j in range(df.shape[1]) if df.iloc[:, j].hasnans]  # cheaper than filling a column without gaps
+    if not missing:
+        return df
+    if strategies is not None:
+        return _apply_strategies(df, strategies, missing)
+    value = 0 if method == "zero" else fill_value
+    if method not in ("zero", "fill") or value is None:
+        return df
+    fills = {}
+    for j in missing:
+        try:
+            fills[j] = _fit_constant(df.iloc[:, j], value)
+        except ValueError:
+            pass  # the column keeps its dtype and its gaps
+    return _fill(df, fills)
+
+MISSING_STRATEGIES = ("leave", "constant", "mean", "median", "mode", "ffill", "bfill", "drop")
+ROW_STRATEGIES = ("leave", "constant", "drop")  # need only the row itself, so they also run chunk by chunk
+_GROUP_STRATEGIES = ("mean", "median", "mode", "ffill", "bfill")
+_BOOLEAN_WORDS = {"true": True, "yes": True, "y": True, "1": True, "false": False, "no": False, "n": False, "0": False}
+
+def missing_strategy(spec):
+    """(method, value, by) of a strategy given as a name or a dict with "method", "value" and "by" keys.
+
+    "constant" fills "value" converted to the column's dtype; "mean", "median"
+    and "mode" fill a statistic of the column and "ffill"/"bfill" the previous
+    or next value, each within groups of the "by" column if given; "drop"
+    drops rows missing this column and "leave" keeps the gaps.
+    """
+    spec = {"method": spec} if isinstance(spec, str) else dict(spec)
+    method, value, by = spec.get("method"), spec.get("value"), spec.get("by")
+    if method not in MISSING_STRATEGIES:
+        raise ValueError(f"Unknown missing-value strategy: {method!r}")
+    if method == "constant" and value is None:
+        raise ValueError("The constant strategy needs a value")
+    if by is not None and method not in _GROUP_STRATEGIES:
+        raise ValueError(f"The {method} strategy can't be applied per group")
+    return method, value, by
+
+def _apply_strategies(df, strategies, missing):
+    missing = set(missing)
+    plan = {}
+    for column, spec in strategies.items():
+        j, strategy = df.columns.get_loc(column), missing_strategy(spec)
+        if j in missing and strategy[0] != "leave":
+            plan[j] = strategy
+    drop = [j for j, (method, _, _) in plan.items() if method == "drop"]
+    if drop:
+        df = df.dropna(subset=df.columns[drop])
+    frame = df.set_axis(pd.RangeIndex(len(df)))  # fills below line up by position
+    fills, reductions, grouped = {}, {}, {}
+    for j, (method, value, by) in plan.items():
+        if method in ("mean", "median"):
+            _require_numeric(frame.iloc[:, j], method)
+        if method == "constant":
+            fills[j] = _fit_constant(frame.iloc[:, j], value)
+        elif method in ("mean", "median") and by is None:
+            reductions[j] = method
+        elif method != "drop":
+            grouped.setdefault((method, by), []).append(j)
+    if reductions:
+        # Every mean and median comes from one aggregation
+        positions = list(reductions)
+        values = _columns(frame, positions).agg({k: reductions[j] for k, j in enumerate(positions)})
+        fills.update((j, values.iloc[k]) for k, j in enumerate(positions))
+    for (method, by), positions in grouped.items():
+        fills.update(zip(positions, _strategy_fills(frame, method, by, positions)))
+    return _fill(df, fills)
+
+def _columns(frame, positions):
+    """Columns at `positions` relabelled 0..n-1, so duplicate or clashing labels don't matter"""
+    return frame.iloc[:, positions].set_axis(range(len(positions)), axis=1)
+
+def _strategy_fills(frame, method, by, positions):
+    """Fill value (a scalar, or a Series by position) for each column at `positions`"""
+    sub = _columns(frame, positions)
+    if method == "mode":
+        if by is None:
+            modes = sub.mode()  # every column in one call; ties go to the smallest value
+            return [modes.iloc[0, k] if len(modes) else None for k in range(len(positions))]
+        return [_group_mode(frame[by], sub[k]) for k in range(len(positions))]
+    if by is None:
+        return [col for _, col in getattr(sub, method)().items()]
+    groups = sub.groupby(frame[by], sort=False)
+    filled = groups.transform(method) if method in ("mean", "median") else getattr(groups, method)()
+    return [col for _, col in filled.items()]
+
+def _group_mode(keys, col_data):
+    """Most frequent value of `col_data` within each group of `keys`, per row (ties go to the smallest value)"""
+    counts = pd.DataFrame({"key": keys, "value": col_data}).groupby(["key", "value"], observed=True).size()
+    counts = counts.sort_values(ascending=False, kind="stable")
+    counts = counts[~counts.index.get_level_values(0).duplicated()]
+    modes = pd.Series(counts.index.get_level_values(1), index=counts.index.get_level_values(0))
+    return keys.map(modes)
+
+def missing_strategies_for(dtype):
+    """Strategies that apply to a column of `dtype` (mean and median need numbers or dates)"""
+    numeric = pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype)
+    if numeric and not pd.api.types.is_bool_dtype(dtype):
+        return MISSING_STRATEGIES
+    return tuple(method for method in MISSING_STRATEGIES if method not in ("mean", "median"))
+
+def _require_numeric(col_data, method):
+    if method not in missing_strategies_for(col_data.dtype):
+        raise ValueError(f"The {method} strategy needs a numeric column; {col_data.name!r} is {col_data.dtype}")
+
+def _fit_constant(col_data, value):
+    """`value` converted to the column's dtype; ValueError if it doesn't fit (e.g. text for a numeric column)"""
+    dtype = col_data.dtype
+    if dtype == object:
+        return value
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _fit_constant(pd.Series([], dtype=dtype.categories.dtype, name=col_data.name), value)
+    try:
+        if pd.api.types.is_bool_dtype(dtype):
+            return value if isinstance(value, (bool, np.bool_)) else _BOOLEAN_WORDS[str(value).strip().lower()]
+        if pd.api.types.is_numeric_dtype(dtype):
+            number = pd.to_numeric(value.strip()) if isinstance(value, str) else value
+            if pd.api.types.is_integer_dtype(dtype) and not float(number).is_integer():
+                raise ValueError
+            return pd.Series([number]).astype(dtype).iloc[0]
+        if pd.api.types.is_datetime64_any_dtype(dtype) and not isinstance(value, (str, pd.Timestamp)):
+            raise ValueError  # a number would silently become an epoch offset
+        return pd.Series([value], dtype=object).astype(dtype).iloc[0]
+    except (ValueError, TypeError, KeyError, OverflowError):
+        raise ValueError(f"Fill value {value!r} does not fit column {col_data.name!r} ({dtype})") from None
+
+def _fit_values(col_data, values):
+    """Fill values (a Series) in the column's dtype, integer columns taking rounded statistics"""
+    dtype = col_data.dtype
+    if dtype == object or isinstance(dtype, pd.CategoricalDtype):
+        return values
+    if pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_float_dtype(values.dtype):
+        values = values.round()
+    return values.astype(dtype)
+
+def _fill(df, fills):
+    """Fill the gaps of the columns at the positions in `fills`, each from a scalar or a Series by
+    position, in one pass; compacted (category) columns gain the new values and other columns stay shared"""
+    fills = {j: value for j, value in fills.items() if isinstance(value, pd.Series) or not pd.isna(value)}
+    if not fills:
+        return df
+    df = df.copy(deep=False)
+    for j, value in fills.items():
+        col_data = df.iloc[:, j]
+        index = col_data.index
+        col_data = col_data.reset_index(drop=True)
+        values = _fit_values(col_data, value if isinstance(value, pd.Series) else pd.Series([value]))
+        if isinstance(col_data.dtype, pd.CategoricalDtype):
+            new = pd.Index(values.dropna().unique()).difference(col_data.cat.categories)
+            if len(new):
+                col_data = col_data.cat.add_categories(new)
+        filled = col_data.fillna(values if isinstance(value, pd.Series) else values.iloc[0])
+        df.isetitem(j, filled.set_axis(index))
     return df
 
+def is_text_column(col_data):
+    """True for object, string and text-valued category columns"""
+    return is_text_dtype(col_data.dtype)
+
+def is_text_dtype(dtype):
+    """is_text_column for a dtype alone (e.g. from column statistics)"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    return dtype == object or pd.api.types.is_string_dtype(dtype)
+
 def standardize_data(df):
     """Standardize entire dataframe based on column types"""
-    df_copy = df.copy()
-    for col in df_copy.columns:
-        if df_copy[col].dtype == object:
+    plan = []
+    for col in df.columns:
+        if is_text_column(df[col]):
             # Apply strip and lowercase (equivalent to previous logic)
-            df_copy = standardize_column(df_copy, col, 'strip')
-            df_copy = standardize_column(df_copy, col, 'lowercase')
+            plan.append((col, 'strip'))
+            plan.append((col, 'lowercase'))
         else:
-            df_copy = standardize_column(df_copy, col, 'to_numeric')
-    return df_copy
+            plan.append((col, 'to_numeric'))
+    return apply_column_transforms(df, plan)
 
 def standardize_column(df, column, method, **kwargs):
     """Apply specific standardization to a single column"""
-    df_copy = df.copy()
-    col_data = df_copy[column]
+    return apply_column_transforms(df, [(column, method, kwargs)])
+
+def apply_column_transforms(df, plan, progress=None):
+    """Apply a plan of (column, method[, kwargs]) steps in a single pass.
+
+    Steps on the same column are chained on that column's Series, and only the
+    touched columns are written into a shallow copy of the frame, so the cost
+    is linear in the size of the transformed columns. `progress(done, total)`
+    is called after each step.
+    """
+    results = {}
+    for i, step in enumerate(plan):
+        column, method = step[0], step[1]
+        kwargs = step[2] if len(step) > 2 else {}
+        col_data = results.get(column, df[column])
+        results[column] = transform_series(col_data, method, **kwargs)
+        if progress:
+            progress(i + 1, len(plan))
 
+    df_copy = df.copy(deep=False)
+    for column, col_data in results.items():
+        if col_data is not df[column]:
+            df_copy[column] = col_data
+    return df_copy
+
+def transform_series(col_data, method, **kwargs):
+    """Return a standardized copy of one column; unknown methods return it unchanged"""
     if method == 'lowercase':
-        df_copy[column] = col_data.str.lower()
+        return col_data.str.lower()
     elif method == 'uppercase':
-        df_copy[column] = col_data.str.upper()
+        return col_data.str.upper()
     elif method == 'title':
-        df_copy[column] = col_data.str.title()
+        return col_data.str.title()
     elif method == 'strip':
-        df_copy[column] = col_data.str.strip()
+        return col_data.str.strip()
     elif method == 'round':
         decimals = kwargs.get('decimals', 0)
-        df_copy[column] = col_data.round(decimals)
+        return col_data.round(decimals)
     elif method == 'to_numeric':
+        if pd.api.types.is_numeric_dtype(col_data.dtype):
+            return col_data
         try:
-            df_copy[column] = pd.to_numeric(col_data)
+            return pd.to_numeric(col_data)
         except (ValueError, TypeError):
-            pass
+            return col_data
     elif method == 'num_to_words':
-        df_copy[column] = df_copy[column].apply(lambda x: num2words(x) if pd.notnull(x) else x)
+        return convert_unique_values(col_data, _cached_num_to_words)
     elif method == 'words_to_num':
-        def safe_w2n(x):
-            try:
-                if pd.isnull(x): return x
-                return w2n.word_to_num(str(x))
-            except:
-                return x
-        df_copy[column] = df_copy[column].apply(safe_w2n)
+        return convert_unique_values(col_data, _cached_words_to_num)
     # Add more methods as needed
-    return df_copy
+    return col_data
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE, typed=True)
+def _cached_num_to_words(value):
+    try:
+        return num2words(value)
+    except Exception:
+        return _PARSE_FAILED
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE, typed=True)
+def _cached_words_to_num(value):
+    try:
+        return w2n.word_to_num(str(value))
+    except Exception:
+        return _PARSE_FAILED
+
+def convert_unique_values(col_data, convert):
+    """Apply a scalar conversion once per distinct value and map results back to rows.
+
+    Nulls, and rows whose value `convert` reports as `_PARSE_FAILED`, keep
+    their original value.
+    """
+    codes, uniques = pd.factorize(col_data)
+    converted = np.empty(len(uniques), dtype=object)
+    failed = np.zeros(len(uniques), dtype=bool)
+    for i, value in enumerate(uniques):
+        result = convert(value)
+        if result is _PARSE_FAILED:
+            failed[i] = True
+        else:
+            converted[i] = result
+
+    keep = codes >= 0
+    keep[keep] = ~failed[codes[keep]]
+    values = col_data.to_numpy(dtype=object, copy=True)
+    values[keep] = converted.take(codes[keep])
+    return pd.Series(values, index=col_data.index, name=col_data.name).infer_objects()
 
 # -------- Cross-file operation (example merge) --------
-def merge_datasets(dfs):
+def merge_datasets(dfs, progress=None, plan=None, index=None, on_unique=None):
+    """Union frames with identical columns, otherwise outer join them on shared columns.
+
+    The join order and keys come from `plan_merge` unless a plan is given.
+    `index` is the first frame's RowHashIndex if it has no duplicate rows, so
+    a union hashes only the other frames; on_unique(index) receives the
+    union's RowHashIndex (see core.joins.execute_merge_plan).
+    """
     if not dfs:
         return pd.DataFrame()
-
-    # 1. Check if all datasets have identical columns (Case: Append/Union)
-    first_cols = set(dfs[0].columns)
-    all_same_cols = all(set(df.columns) == first_cols for df in dfs[1:])
-
-    if all_same_cols:
-        # Vertical stack + remove duplicates
-        return pd.concat(dfs, ignore_index=True).drop_duplicates()
-    
-    # 2. Otherwise try to merge on common columns (Case: Join)
-    merged_df = dfs[0]
-    for df_next in dfs[1:]:
-        # Find intersection of columns
-        common_cols = list(set(merged_df.columns) & set(df_next.columns))
-        
-        if common_cols:
-            # Relational merge (outer join to keep all data)
-            merged_df = pd.merge(merged_df, df_next, on=common_cols, how='outer')
-        else:
-            # No shared keys, just append (will create NaNs)
-            merged_df = pd.concat([merged_df, df_next], ignore_index=True)
-            
-    return merged_df
+    if plan is None:
+        plan = plan_merge(dfs, index)
+    return execute_merge_plan(dfs, plan, progress=progress, index=index, on_unique=on_unique)
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+import pandas as pd
+
+RSS_SAMPLE_INTERVAL = 0.01  # seconds between RSS samples while an operation runs
+MAX_RECORDS = 10_000  # session-wide records kept for export
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where it can't be read cheaply"""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def frame_stats(obj):
+    """(rows, columns, bytes) of a DataFrame or a list of DataFrames.
+
+    Bytes are the columns' shallow buffer sizes, which keeps this O(columns);
+    Python string objects in object columns are not followed.
+    """
+    if isinstance(obj, pd.DataFrame):
+        frames = [obj]
+    elif isinstance(obj, (list, tuple)):
+        frames = [f for f in obj if isinstance(f, pd.DataFrame)]
+    else:
+        frames = []
+    if not frames:
+        return None, None, None
+    return (sum(len(f) for f in frames), sum(len(f.columns) for f in frames),
+            int(sum(col.nbytes for f in frames for _, col in f.items())))
+
+
+class OpRecord:
+    """Cost of one core operation: times, memory and the shape of its input and output"""
+
+    FIELDS = ("name", "params", "start", "wall", "cpu", "peak_bytes", "memory_source",
+              "rows_in", "cols_in", "bytes_in", "rows_out", "cols_out", "bytes_out", "thread")
+
+    def __init__(self, name, params=None, start=None, wall=None, cpu=None, peak_bytes=None, memory_source=None,
+                 inputs=None, output=None, thread=None):
+        self.name = name
+        self.params = params or {}
+        self.start = time.time() if start is None else start
+        self.wall = wall
+        self.cpu = cpu
+        self.peak_bytes = peak_bytes  # growth over the starting allocation/RSS
+        self.memory_source = memory_source  # "tracemalloc", "rss" or None
+        self.rows_in, self.cols_in, self.bytes_in = frame_stats(inputs)
+        self.rows_out, self.cols_out, self.bytes_out = frame_stats(output)
+        self.thread = threading.get_ident() if thread is None else thread
+
+    def to_dict(self):
+        record = {field: getattr(self, field) for field in self.FIELDS}
+        record["params"] = {key: repr(value) if not isinstance(value, (str, int, float, bool, type(None))) else value
+                            for key, value in self.params.items()}
+        return record
+
+    @classmethod
+    def from_dict(cls, record):
+        """An OpRecord from to_dict output (parameters that weren't plain values stay as their repr)"""
+        op = cls(record["name"], record["params"], start=record["start"], thread=record["thread"])
+        for field in cls.FIELDS:
+            setattr(op, field, record[field])
+        return op
+
+
+class _RssSampler:
+    """Background thread tracking peak RSS while at least one operation is active"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}  # token -> [baseline, peak]
+        self._thread = None
+
+    def begin(self):
+        rss = current_rss()
+        if rss is None:
+            return None
+        token = object()
+        with self._lock:
+            self._active[token] = [rss, rss]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return token
+
+    def end(self, token):
+        if token is None:
+            return None
+        rss = current_rss() or 0
+        with self._lock:
+            baseline, peak = self._active.pop(token)
+        return max(peak, rss) - baseline
+
+    def _run(self):
+        while True:
+            time.sleep(RSS_SAMPLE_INTERVAL)
+            rss = current_rss() or 0
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                for bounds in self._active.values():
+                    bounds[1] = max(bounds[1], rss)
+
+
+class Profiler:
+    """Records an OpRecord for every operation run through `call`.
+
+    Peak memory comes from RSS sampling by default, which costs one small
+    read every 10 ms while an operation runs, but is process-wide so
+    concurrent jobs inflate each other's numbers. `trace_memory=True` uses
+    tracemalloc for exact Python/numpy allocation peaks at a noticeable
+    slowdown.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, max_records=MAX_RECORDS):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.records = deque(maxlen=max_records)
+        self._sampler = _RssSampler()
+        self._lock = threading.Lock()
+
+    def call(self, name, func, *args, params=None, **kwargs):
+        """Run func(*args, **kwargs), returning (result, OpRecord or None when disabled).
+
+        The first positional argument is taken as the input frame (or list of frames).
+        """
+        if not self.enabled:
+            return func(*args, **kwargs), None
+        inputs = args[0] if args else None
+        params = dict(kwargs if params is None else params)
+        params.pop("progress", None)
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        token = None if tracing else self._sampler.begin()
+        start, wall, cpu = time.time(), time.perf_counter(), time.thread_time()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            if tracing:
+                peak, source = tracemalloc.get_traced_memory()[1], "tracemalloc"
+                tracemalloc.stop()
+            else:
+                peak = self._sampler.end(token)
+                source = "rss" if token is not None else None
+        record = OpRecord(name, params, start, wall, cpu, peak, source, inputs,
+                          result if isinstance(result, pd.DataFrame) else None)
+        self.add(record)
+        return result, record
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def to_json(self, path, records=None):
+        """Write records (default: all of this session) as a JSON list"""
+        records = self.records if records is None else records
+        with open(path, "w") as f:
+            json.dump([r.to_dict() for r in records], f, indent=2)
+
+    def to_chrome_trace(self, path, records=None):
+        """Write records in Chrome trace event format (chrome://tracing, Perfetto)"""
+        records = self.records if records is None else records
+        events = []
+        for r in records:
+            args = {k: v for k, v in r.to_dict().items() if k not in ("name", "start", "wall", "thread")}
+            events.append({"name": r.name, "cat": "operation", "ph": "X", "ts": r.start * 1e6,
+                           "dur": (r.wall or 0) * 1e6, "pid": os.getpid(), "tid": r.thread, "args": args})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+from core.profiling import OpRecord
+from core.spill import Spill, decode_index, encode_index
+
+MANIFEST_FILE = "session.json"
+SESSION_FORMAT = 2
+DATASET_PREFIX = "dataset_"
+
+
+def _dataset_dir(spill, root):
+    """Directory name of a session spill under `root`, or None if it lives elsewhere"""
+    if spill is None or spill.owned:
+        return None
+    parent, name = os.path.split(os.path.abspath(spill.path))
+    return name if parent == root else None
+
+
+def _encode_report(report):
+    if report is None:
+        return None
+    return {"index": encode_index(report.index), "columns": {col: report[col].tolist() for col in report.columns}}
+
+
+def _decode_report(data):
+    return None if data is None else pd.DataFrame(data["columns"], index=decode_index(data["index"]))
+
+
+def _read_manifest(root):
+    with open(os.path.join(root, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SESSION_FORMAT:
+        raise ValueError(f"Unsupported session format: {manifest.get('format')!r}")
+    return manifest
+
+
+def session_datasets(path):
+    """Names of the datasets saved in the session under `path`; empty if there is none"""
+    if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return []
+    return [entry["name"] for entry in _read_manifest(os.path.abspath(path))["datasets"]]
+
+
+def save_session(manager, path):
+    """Write every dataset of `manager` and the active selection under `path`; returns the dataset names.
+
+    Each dataset gets a directory of Arrow files (see core.spill.Spill)
+    holding its frame and undo history with checkpoints, described by JSON
+    metadata. Raises ValueError for a dataset that can't be stored as Arrow. Datasets unchanged
+    since the session was last saved or opened keep their directory, so
+    saving again only writes what changed. The session replaces whatever was
+    saved under `path` before: directories of datasets it no longer holds
+    (see session_datasets) are removed. Lazy datasets are computed and saved
+    as frames.
+    """
+    root = os.path.abspath(path)
+    os.makedirs(root, exist_ok=True)
+    entries = []
+    for name, ds in list(manager.datasets.items()):
+        directory = _dataset_dir(ds.current_spill, root)
+        if directory is None:
+            directory = os.path.basename(tempfile.mkdtemp(prefix=DATASET_PREFIX, dir=root))
+            spill = ds.persist(os.path.join(root, directory))
+        else:
+            spill = ds.current_spill
+        spill.save()
+        entries.append({"name": name, "dir": directory, "temporary": ds.is_temporary,
+                        "memory_report": _encode_report(ds.memory_report),
+                        "operations": [record.to_dict() for record in ds.operations]})
+    manifest = {"format": SESSION_FORMAT, "active": manager.active_dataset_name, "datasets": entries}
+    target = os.path.join(root, MANIFEST_FILE)
+    with open(target + ".tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(target + ".tmp", target)
+
+    used = {entry["dir"] for entry in entries}
+    for directory in os.listdir(root):
+        if directory.startswith(DATASET_PREFIX) and directory not in used:
+            shutil.rmtree(os.path.join(root, directory), ignore_errors=True)
+    return [entry["name"] for entry in entries]
+
+
+def open_session(manager, path):
+    """Add the datasets of a session saved under `path` to `manager`; returns their names.
+
+    Nothing is read beyond the JSON manifest and per-dataset metadata: each
+    dataset is backed by its session files and memory-maps them on first
+    use. Session folders may come from anyone, so nothing is ever unpickled.
+    Datasets with the same name are replaced. The saved active dataset
+    becomes active again.
+    """
+    root = os.path.abspath(path)
+    manifest = _read_manifest(root)
+    for entry in manifest["datasets"]:
+        if entry["name"] in manager.datasets:
+            manager.remove_dataset(entry["name"])
+        spill = Spill.load(os.path.join(root, entry["dir"]))
+        manager.add_spilled_dataset(entry["name"], spill, temporary=entry["temporary"],
+                                    memory_report=_decode_report(entry["memory_report"]),
+                                    operations=[OpRecord.from_dict(record) for record in entry["operations"]])
+    if manifest["active"] in manager.datasets:
+        manager.active_dataset_name = manifest["active"]
+    return [entry["name"] for entry in manifest["datasets"]]
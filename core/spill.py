@@ -0,0 +1,295 @@
+import copy
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from core.cache import read_frame, write_frame
+from core.hashindex import RowHashIndex
+from core.history import Delta, DeltaHistory
+from core.profiling import frame_stats
+
+MEMORY_FRACTION = 0.5  # share of physical memory the UI lets datasets occupy before spilling
+METADATA_FILE = "spill.json"
+SPILL_FORMAT = 1
+
+
+def default_memory_budget(fraction=MEMORY_FRACTION):
+    """`fraction` of physical memory in bytes, or None where it can't be read"""
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") * fraction)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _delta_bytes(delta):
+    size = 0 if delta.rows is None else delta.rows.nbytes
+    for values in delta.changed.values():
+        if isinstance(values, pd.DataFrame):
+            size += frame_stats(values)[2] or 0
+        else:
+            size += values.nbytes
+    return size
+
+
+def resident_bytes(df, history, index=None, pinned=()):
+    """Shallow bytes of a frame, its row index, its undo history and other frames it keeps alive (`pinned`),
+    counting frames shared between them once"""
+    frames = {id(frame): frame for frame in pinned}
+    if df is not None:
+        frames[id(df)] = df
+    size = 0 if index is None else index.nbytes
+    if history is not None:
+        for frame in (history.base, history.tip, *history.checkpoints.values()):
+            frames[id(frame)] = frame
+        size += sum(_delta_bytes(delta) for delta in history.deltas)
+    return size + (frame_stats(list(frames.values()))[2] or 0)
+
+
+def _encode_label(label):
+    if isinstance(label, np.generic):
+        label = label.item()
+    if label is None or isinstance(label, (str, bool, int, float)):
+        return label
+    if isinstance(label, tuple):
+        return {"tuple": [_encode_label(part) for part in label]}
+    if isinstance(label, pd.Timestamp):
+        return {"timestamp": label.isoformat()}
+    raise ValueError(f"label {label!r} can't be saved in a session")
+
+
+def _decode_label(data):
+    if isinstance(data, dict):
+        return tuple(_decode_label(part) for part in data["tuple"]) if "tuple" in data else pd.Timestamp(data["timestamp"])
+    return data
+
+
+def encode_index(index):
+    """JSON-safe form of an Index of labels (text, numbers, bools, None, tuples or timestamps)"""
+    if isinstance(index, pd.RangeIndex):
+        return {"range": [index.start, index.stop, index.step], "name": _encode_label(index.name)}
+    return {"labels": [_encode_label(label) for label in index.tolist()], "dtype": str(index.dtype),
+            "name": _encode_label(index.name)}
+
+
+def decode_index(data):
+    """The Index saved by encode_index"""
+    name = _decode_label(data["name"])
+    if "range" in data:
+        return pd.RangeIndex(*data["range"], name=name)
+    labels = [_decode_label(label) for label in data["labels"]]
+    try:
+        return pd.Index(labels, dtype=data["dtype"], name=name)
+    except (TypeError, ValueError):
+        return pd.Index(labels, name=name)
+
+
+def _encode_entry(entry):
+    name, columns = entry
+    return {"file": name, "columns": encode_index(columns)}
+
+
+def _decode_entry(data):
+    return data["file"], decode_index(data["columns"])
+
+
+class Spill:
+    """A dataset's frame and undo history written under `path` as binary columnar files.
+
+    Columns are stored under positional names so any labels survive the round
+    trip. Of the undo history only frames and changed-column values go to disk;
+    row selections and column lists stay in memory, as they are small, until
+    `save` writes them for a session. A row index of a duplicate-free frame
+    (core.hashindex) is saved next to it. Files are read back with read_frame,
+    which memory-maps Arrow files, and are named relative to `path` so a saved
+    spill can be moved. Spills that are not `owned` (a saved session's) are
+    never deleted by `remove`; spills read back with `load` only read Arrow files.
+    """
+
+    def __init__(self, path, df, history=None, version=None, owned=True, unique=False, index=None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.owned = owned
+        self.trusted = True  # written by this process, so pickle fallbacks may be read
+        self.version = version  # Dataset.version the files hold
+        self.columns = df.columns
+        self.shape = df.shape
+        self._written = {}  # id(frame) -> file, so frames shared by the history are written once
+        self.frame = self._write(df, "frame")
+        self.history = None if history is None else self._write_history(history, df)
+        del self._written
+        self.unique = unique  # the frame has no duplicate rows
+        self.index = None
+        self.save_index(index)
+
+    @property
+    def history_length(self):
+        return 1 if self.history is None else len(self.history["deltas"]) + 1
+
+    def _write(self, df, name, shared=True):
+        if shared and id(df) in self._written:
+            return self._written[id(df)]
+        positional = df.set_axis([str(i) for i in range(len(df.columns))], axis=1)
+        entry = (os.path.basename(write_frame(positional, os.path.join(self.path, name))), df.columns)
+        if shared:
+            self._written[id(df)] = entry
+        return entry
+
+    def _read(self, entry):
+        name, columns = entry
+        return read_frame(os.path.join(self.path, name), allow_pickle=self.trusted).set_axis(columns, axis=1)
+
+    def _write_history(self, history, df):
+        deltas = []
+        for i, delta in enumerate(history.deltas):
+            shell = Delta(delta.rows, delta.columns, {}, delta.index)
+            if None in delta.changed:
+                deltas.append((shell, None, self._write(delta.changed[None], f"delta_{i}")))
+            elif delta.changed:
+                labels = list(delta.changed)
+                changed = pd.DataFrame({j: delta.changed[label].array for j, label in enumerate(labels)})
+                deltas.append((shell, labels, self._write(changed, f"delta_{i}", shared=False)))
+            else:
+                deltas.append((shell, [], None))
+        return {
+            "base": self._write(history.base, "base"),
+            "checkpoints": {step: self._write(frame, f"checkpoint_{step}") for step, frame in history.checkpoints.items()},
+            "deltas": deltas,
+            "tip_is_frame": history.tip is df,
+            "checkpoint_interval": history.checkpoint_interval,
+            "memory_budget": history.memory_budget,
+        }
+
+    def save_index(self, index):
+        """Write the frame's RowHashIndex if given and not on disk yet"""
+        if index is not None and self.index is None:
+            self.index = os.path.basename(index.save(os.path.join(self.path, "row_index")))
+
+    def restore_frame(self):
+        return self._read(self.frame)
+
+    def restore_index(self):
+        """The saved RowHashIndex, or None"""
+        return None if self.index is None else RowHashIndex.load(os.path.join(self.path, self.index))
+
+    def restore_history(self, df):
+        """Rebuild the DeltaHistory; `df` is the restored frame, reused as its tip"""
+        if self.history is None:
+            return None
+        spilled = self.history
+        history = DeltaHistory(df if spilled["base"][0] == self.frame[0] else self._read(spilled["base"]),
+                               spilled["checkpoint_interval"], spilled["memory_budget"])
+        for shell, labels, entry in spilled["deltas"]:
+            if labels is None:
+                changed = {None: self._read(entry)}
+            elif labels:
+                values = self._read(entry)
+                changed = {label: values.iloc[:, j].rename(label) for j, label in enumerate(labels)}
+            else:
+                changed = {}
+            history.deltas.append(Delta(shell.rows, shell.columns, changed, shell.index))
+        history.checkpoints = {step: df if entry[0] == self.frame[0] else self._read(entry)
+                               for step, entry in spilled["checkpoints"].items()}
+        history.tip = df if spilled["tip_is_frame"] else history.state(len(history.deltas))
+        return history
+
+    def copy_to(self, path, owned=True):
+        """The same spill with its files copied to `path`"""
+        shutil.copytree(self.path, path, dirs_exist_ok=True)
+        spill = copy.copy(self)
+        spill.path = path
+        spill.owned = owned
+        return spill
+
+    def _entries(self):
+        entries = [self.frame]
+        if self.history is not None:
+            entries += [self.history["base"], *self.history["checkpoints"].values()]
+            entries += [entry for _, _, entry in self.history["deltas"] if entry is not None]
+        return entries
+
+    def _save_array(self, name, frame):
+        """Write a row selection or row index as an Arrow file once; returns its file name"""
+        for existing in (name + ".arrow", name + ".pkl"):
+            if os.path.exists(os.path.join(self.path, existing)):
+                return existing
+        return os.path.basename(write_frame(frame, os.path.join(self.path, name)))
+
+    def _load_array(self, name):
+        return read_frame(os.path.join(self.path, name), allow_pickle=self.trusted)
+
+    def save(self):
+        """Write what restoring needs besides the data files (labels, delta shells) next to them as JSON.
+
+        Raises ValueError if a frame had to be pickled instead of written as
+        Arrow, since `load` never unpickles.
+        """
+        pickled = [name for name, _ in self._entries() if not name.endswith(".arrow")]
+        history = None
+        if self.history is not None:
+            deltas = []
+            for i, (shell, labels, entry) in enumerate(self.history["deltas"]):
+                rows = None if shell.rows is None else self._save_array(f"rows_{i}", pd.DataFrame({"rows": shell.rows}))
+                index = None if shell.index is None else self._save_array(f"index_{i}", pd.DataFrame(index=shell.index))
+                pickled += [name for name in (rows, index) if name is not None and not name.endswith(".arrow")]
+                deltas.append({"rows": rows, "index": index, "columns": encode_index(pd.Index(shell.columns)),
+                               "labels": None if labels is None else [_encode_label(label) for label in labels],
+                               "values": None if entry is None else _encode_entry(entry)})
+            history = {
+                "base": _encode_entry(self.history["base"]),
+                "checkpoints": [[step, _encode_entry(entry)] for step, entry in self.history["checkpoints"].items()],
+                "deltas": deltas,
+                "tip_is_frame": self.history["tip_is_frame"],
+                "checkpoint_interval": self.history["checkpoint_interval"],
+                "memory_budget": self.history["memory_budget"],
+            }
+        if pickled:
+            raise ValueError(f"{', '.join(pickled)} could not be written as Arrow files (e.g. mixed-type columns)")
+        metadata = {"format": SPILL_FORMAT, "version": self.version, "columns": encode_index(self.columns),
+                    "shape": list(self.shape), "frame": _encode_entry(self.frame), "history": history,
+                    "unique": self.unique, "index": self.index}
+        target = os.path.join(self.path, METADATA_FILE)
+        with open(target + ".tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(target + ".tmp", target)
+
+    @classmethod
+    def load(cls, path, owned=False):
+        """A spill saved under `path`, wherever it was written; only its Arrow files are ever read"""
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        if metadata.get("format") != SPILL_FORMAT:
+            raise ValueError(f"Unsupported spill format: {metadata.get('format')!r}")
+        spill = cls.__new__(cls)
+        spill.path = path
+        spill.owned = owned
+        spill.trusted = False
+        spill.version = metadata["version"]
+        spill.columns = decode_index(metadata["columns"])
+        spill.shape = tuple(metadata["shape"])
+        spill.frame = _decode_entry(metadata["frame"])
+        spill.unique = metadata["unique"]
+        spill.index = metadata["index"]
+        spill.history = None
+        history = metadata["history"]
+        if history is not None:
+            deltas = []
+            for delta in history["deltas"]:
+                rows = None if delta["rows"] is None else spill._load_array(delta["rows"])["rows"].to_numpy()
+                index = None if delta["index"] is None else spill._load_array(delta["index"]).index
+                labels = None if delta["labels"] is None else [_decode_label(label) for label in delta["labels"]]
+                entry = None if delta["values"] is None else _decode_entry(delta["values"])
+                deltas.append((Delta(rows, decode_index(delta["columns"]), {}, index), labels, entry))
+            spill.history = {
+                "base": _decode_entry(history["base"]),
+                "checkpoints": {step: _decode_entry(entry) for step, entry in history["checkpoints"]},
+                "deltas": deltas,
+                "tip_is_frame": history["tip_is_frame"],
+                "checkpoint_interval": history["checkpoint_interval"],
+                "memory_budget": history["memory_budget"],
+            }
+        return spill
+
+    def remove(self):
+        if self.owned:
+            shutil.rmtree(self.path, ignore_errors=True)
@@ -1,40 +1,419 @@
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import pandas as pd
+from core.hashindex import index_rows
+from core.history import DeltaHistory
+from core.memory import compact_dataframe
+from core.plan import LazyPlan
+from core.profiling import OpRecord, Profiler
+from core.memo import ResultCache, frame_fingerprint, freeze, same_content
+from core.spill import Spill, resident_bytes
+from core.stats import frame_column_stats, known_column_stats, shared_column_stats, stream_column_stats
+from utils.exporter import iter_frame_chunks
+
+_clock = itertools.count()  # orders dataset accesses for LRU spilling
+
 class Dataset:
-    def __init__(self, name, dataframe, temporary=False):
+    def __init__(self, name, dataframe=None, temporary=False, history_budget=None, memory_report=None, plan=None,
+                 operations=None, profiler=None):
         self.name = name
-        self.df = dataframe
+        self.version = 0  # bumped on every change to df
         self.is_temporary = temporary
-        self.history = [dataframe.copy()]  # Store history for undo/reset
+        self.memory_report = memory_report  # per-column bytes before/after compaction
+        self.plan = plan  # LazyPlan that produces df on first access
+        self.history_budget = history_budget
+        self.operations = list(operations or [])  # OpRecords of the operations that produced this dataset
+        self.profiler = profiler  # records running the lazy plan, if given
+        self.on_load = None  # called with the dataset after its frame is loaded (plan run or spill restored)
+        self.last_used = next(_clock)
+        self._df = None
+        self._history = None
+        self._spilled = None  # Spill holding this dataset on disk
+        self._derived = {}
+        self._unique = False  # the current version is known to have no duplicate rows
+        self._row_index = None  # its RowHashIndex, once built or restored
+        self._lock = threading.RLock()  # held while the frame is loaded, replaced or spilled
+        if dataframe is not None:
+            self.df = dataframe
+            # Deltas against the original frame for undo/reset; frames are treated as immutable
+            self._history = DeltaHistory(dataframe, memory_budget=history_budget)
+
+    @property
+    def df(self):
+        self.last_used = next(_clock)
+        if self._df is None and (self.plan is not None or self._spilled is not None):
+            with self._lock:
+                if self._df is None:
+                    if self._spilled is not None:
+                        self._df = self._spilled.restore_frame()  # history is restored when next needed
+                    else:
+                        df = self.run_plan()
+                        self._history = DeltaHistory(df, memory_budget=self.history_budget)
+                        self._df = df
+                        self.plan = None  # release the source frame, so spilling this dataset frees everything
+                    loaded = True
+                else:
+                    loaded = False
+            if loaded and self.on_load is not None:
+                self.on_load(self)
+        return self._df
+
+    def run_plan(self):
+        if self.profiler is None:
+            return self.plan.collect()
+        df, record = self.profiler.call("run_plan", lambda source: self.plan.collect(), self.plan.source,
+                                        params={"steps": [name for name, _ in self.plan.steps]})
+        self.log(record)
+        return df
+
+    def log(self, record):
+        """Attach an operation record to this dataset"""
+        if record is not None:
+            self.operations.append(record)
+
+    @df.setter
+    def df(self, dataframe):
+        # A spill running on another thread must not finish after this and drop the new frame
+        with self._lock:
+            if self._history is None and self._spilled is not None:
+                self.history  # restore a spilled history before it falls behind the frame
+            known = self._derived.get("column_stats")
+            previous, self._df = self._df, dataframe
+            self.last_used = next(_clock)
+            self.version += 1
+            self._derived = {}
+            self._unique = False
+            self._row_index = None
+            if known and previous is not None and dataframe is not None:
+                # Columns the new version shares with the previous one keep their statistics
+                self._derived["column_stats"] = shared_column_stats(previous, known, dataframe)
+
+    @property
+    def history(self):
+        if self._history is None:
+            df = self.df  # materialize the lazy plan or restore a spilled frame
+            if self._history is None and self._spilled is not None:
+                with self._lock:
+                    if self._history is None:
+                        self._history = self._spilled.restore_history(df)
+        return self._history
+
+    @property
+    def is_lazy(self):
+        """True while the dataset is an unexecuted plan"""
+        return self._df is None and self._spilled is None and self.plan is not None
+
+    @property
+    def is_spilled(self):
+        """True while the frame lives only on disk"""
+        return self._df is None and self._spilled is not None
+
+    @property
+    def nbytes(self):
+        """Bytes held in memory by the frame, its undo history and a lazy plan's source (shallow column buffers)"""
+        plan = self.plan
+        return resident_bytes(self._df, self._history, self._row_index, pinned=() if plan is None else [plan.source])
+
+    @property
+    def can_undo(self):
+        if self._history is None and self._spilled is not None:
+            return self._spilled.history_length > 1
+        return self._history is not None and len(self._history) > 1
+
+    @property
+    def columns(self):
+        if self.is_spilled:
+            return self._spilled.columns
+        return self.plan.columns if self.is_lazy else self._df.columns
+
+    def head(self, n):
+        """First n rows, computing only what a lazy plan needs for them"""
+        return self.plan.head(n) if self.is_lazy else self.df.head(n)
+
+    def iter_chunks(self, chunksize=100_000):
+        """Stream the dataset in chunks; lazy plans are executed chunk by chunk"""
+        if self.is_lazy:
+            return self.plan.iter_chunks(chunksize)
+        return iter_frame_chunks(self.df, chunksize)
+
+    def spill(self, path):
+        """Move the frame and undo history to disk under `path`, freeing their memory.
+
+        Files from an earlier spill are reused while the dataset is unchanged.
+        Returns False if there is nothing in memory or the dataset is busy.
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if self._df is None:
+                return False
+            if self._spilled is not None and self._spilled.version == self.version:
+                self._spilled.save_index(self._row_index)
+            else:
+                history = self._history
+                if history is None and self._spilled is not None:
+                    history = self._spilled.restore_history(self._df)
+                spilled = Spill(path, self._df, history, self.version, unique=self._unique, index=self._row_index)
+                self.drop_spill()
+                self._spilled = spilled
+            self._df = None
+            self._history = None
+            self._row_index = None  # restored from the spill when next needed
+            return True
+        finally:
+            self._lock.release()
+
+    @property
+    def current_spill(self):
+        """Spill holding the current version, or None"""
+        spilled = self._spilled
+        return spilled if spilled is not None and spilled.version == self.version else None
+
+    def attach_spill(self, spill):
+        """Back the dataset by saved files (e.g. a session's); the frame and history load when first used"""
+        self._df = None
+        self._history = None
+        self._spilled = spill
+        self.version = spill.version
+        self._derived = {}
+        self._unique = spill.unique
+        self._row_index = None
+
+    def persist(self, path):
+        """Write the current version under `path` as files that outlive the app (see core.session); returns the Spill.
+
+        An up-to-date spill is copied rather than rewritten. The new files
+        replace any spill the dataset had, so spilling it later or saving the
+        same session again writes nothing. Lazy datasets are computed first.
+        """
+        df = self.df if self.current_spill is None else None
+        with self._lock:
+            current = self.current_spill
+            if current is not None:
+                current.save_index(self._row_index)
+                spill = current.copy_to(path, owned=False)
+            else:
+                spill = Spill(path, df, self._history, self.version, owned=False, unique=self._unique,
+                              index=self._row_index)
+            self.drop_spill()
+            self._spilled = spill
+            return spill
+
+    def drop_spill(self):
+        """Delete spilled files (the frame must be in memory or no longer needed)"""
+        if self._spilled is not None:
+            self._spilled.remove()
+            self._spilled = None
+
+    @property
+    def is_unique(self):
+        """True if the current version is known to have no duplicate rows"""
+        return self._unique
+
+    def mark_unique(self, index=None):
+        """Record that the current version has no duplicate rows, with its RowHashIndex if already built"""
+        self._unique = True
+        self._row_index = index
+
+    @property
+    def row_index(self):
+        """RowHashIndex of the frame if it is known to have no duplicate rows (see core.hashindex), else None.
+
+        Built by hashing every row on first use, or restored from a spill.
+        """
+        if not self._unique:
+            return None
+        if self._row_index is None:
+            df = self.df
+            with self._lock:
+                if self._row_index is None:
+                    spilled = self.current_spill
+                    index = None if spilled is None else spilled.restore_index()
+                    self._row_index = index_rows(df) if index is None else index
+        return self._row_index
+
+    @property
+    def fingerprint(self):
+        """Content fingerprint of the current version (see core.memo.frame_fingerprint)"""
+        return self.cached("fingerprint", lambda: frame_fingerprint(self.df))
+
+    def stats(self):
+        """Per-column statistics of the current version (see core.stats), one row per column.
+
+        Columns unchanged since the previous version keep their statistics;
+        lazy plans are streamed in chunks instead of materialized.
+        """
+        if self.is_lazy:
+            return self.cached(("stats", "chunks"), lambda: stream_column_stats(self.iter_chunks()))
+        return self.cached("stats", lambda: frame_column_stats(self.df, self.cached("column_stats", dict)))
+
+    def column_stats(self, column):
+        """Statistics of one column of the current version as a dict (see core.stats.column_stats)"""
+        if self.is_lazy:
+            return self.stats().loc[column].to_dict()
+        df = self.df
+        return known_column_stats(df, df.columns.get_loc(column), self.cached("column_stats", dict))
+
+    def missing_columns(self):
+        """Labels of the columns with missing values, from the cached statistics"""
+        stats = self.stats()
+        return list(stats.index[stats["nulls"] > 0])
+
+    def cached(self, key, compute):
+        """Return compute() memoized for the current version of df"""
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
 
     def save_state(self):
         """Save current state to history"""
-        self.history.append(self.df.copy())
+        self.history.push(self.df)
 
     def undo(self):
         """Undo last operation"""
         if len(self.history) > 1:
-            self.df = self.history[-2].copy()
-            self.history = self.history[:-1]
+            self.df = self.history.pop()
             return True
         return False
 
     def reset(self):
         """Reset to original state"""
         if len(self.history) > 1:
-            self.df = self.history[0].copy()
-            self.history = [self.history[0].copy()]  # Reset history to just original
+            self.df = self.history.reset()
             return True
         return False
 
+def op_label(op_func, op_name=None):
+    """Name an operation is recorded under: `op_name`, else the callable's name.
+
+    Only an explicit `op_name` is memoized, since closures, partials and
+    callable objects with one name can do different things.
+    """
+    if op_name is not None:
+        return op_name
+    func = getattr(op_func, "func", op_func)  # functools.partial
+    return getattr(func, "__name__", None) or type(func).__name__
+
 class DatasetManager:
-    def __init__(self):
+    def __init__(self, history_budget=None, compact=False, result_cache_bytes=None, memory_budget=None, spill_dir=None):
         self.datasets = {}  # name -> Dataset
         self.active_dataset_name = None
+        self.history_budget = history_budget  # bytes of undo deltas kept per dataset
+        self.compact = compact  # shrink new datasets with compact_dataframe by default
+        self.profiler = Profiler()
+        self.results = ResultCache() if result_cache_bytes is None else ResultCache(result_cache_bytes)
+        self.memory_budget = memory_budget  # bytes of datasets kept in memory before LRU ones spill to disk
+        self.spill_dir = spill_dir  # parent directory for spill files, a temporary one by default
+        self.budget_runner = None  # called with `keep` to enforce the budget elsewhere (e.g. a UI job), else inline
+        self._spill_root = None
+        self._spill_ids = itertools.count()
+        self._spill_lock = threading.Lock()
 
-    def add_dataset(self, name, df, temporary=False):
-        """Add a new dataset"""
-        self.datasets[name] = Dataset(name, df, temporary)
+    def _register(self, name, ds):
+        self.datasets[name] = ds
+        ds.on_load = lambda ds: self.request_budget(keep=ds)
         if self.active_dataset_name is None:
             self.active_dataset_name = name
+        self.request_budget(keep=ds)
+        return ds
+
+    def remove_dataset(self, name):
+        """Forget a dataset and delete its spill files"""
+        ds = self.datasets.pop(name)
+        ds.drop_spill()
+        if self.active_dataset_name == name:
+            self.active_dataset_name = None
+
+    def memory_usage(self):
+        """name -> bytes each dataset holds in memory"""
+        return {name: ds.nbytes for name, ds in self.datasets.items()}
+
+    def request_budget(self, keep=None):
+        """Enforce the memory budget now, or hand it to `budget_runner` so spilling doesn't block the caller"""
+        if self.memory_budget is None:
+            return
+        if self.budget_runner is None:
+            self.enforce_budget(keep=keep)
+        else:
+            self.budget_runner(keep)
+
+    def enforce_budget(self, keep=None):
+        """Spill least recently used datasets until the rest fit memory_budget; returns their names.
+
+        Cached results count towards the budget and are evicted first, since
+        a spilled frame still held by the cache frees nothing. The active
+        dataset and `keep` stay in memory.
+        """
+        if self.memory_budget is None:
+            return []
+        spilled = []
+        with self._spill_lock:
+            usage = {name: ds.nbytes for name, ds in self.datasets.items()}
+            total = sum(usage.values())
+            self.results.trim(max(self.memory_budget - total, 0))
+            for name, ds in sorted(self.datasets.items(), key=lambda item: item[1].last_used):
+                if total <= self.memory_budget:
+                    break
+                if ds is keep or name == self.active_dataset_name or not usage[name]:
+                    continue
+                if ds.spill(self._spill_path()):
+                    total -= usage[name]
+                    spilled.append(name)
+        return spilled
+
+    def _spill_path(self):
+        if self._spill_root is None:
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            self._spill_root = tempfile.mkdtemp(prefix="spill_", dir=self.spill_dir)
+        return os.path.join(self._spill_root, str(next(self._spill_ids)))
+
+    def close(self):
+        """Delete every spill file; spilled datasets are lost"""
+        if self._spill_root is not None:
+            shutil.rmtree(self._spill_root, ignore_errors=True)
+            self._spill_root = None
+
+    def prepare_frame(self, df, compact=None, operations=None):
+        """Compact a frame for add_dataset ahead of time, e.g. inside a load job; returns (df, memory_report, operations)"""
+        report = None
+        operations = list(operations or [])
+        if self.compact if compact is None else compact:
+            (df, report), record = self.profiler.call("compact_dataframe", compact_dataframe, df)
+            operations.append(record)
+        return df, report, operations
+
+    def add_dataset(self, name, df, temporary=False, compact=None, operations=None, memory_report=None):
+        """Add a new dataset; `operations` are OpRecords of how it was produced.
+
+        Pass compact=False with the `memory_report` of a frame already shrunk by prepare_frame.
+        """
+        df, report, operations = self.prepare_frame(df, compact, operations)
+        self._register(name, Dataset(name, df, temporary, history_budget=self.history_budget,
+                                     memory_report=memory_report if report is None else report,
+                                     operations=[r for r in operations if r is not None]))
+
+    def add_spilled_dataset(self, name, spill, temporary=False, memory_report=None, operations=None):
+        """Add a dataset held in `spill` (e.g. from a saved session); nothing is read until it is used"""
+        ds = Dataset(name, temporary=temporary, history_budget=self.history_budget, memory_report=memory_report,
+                     operations=operations)
+        ds.attach_spill(spill)
+        return self._register(name, ds)
+
+    def add_lazy_dataset(self, name, source_name, step, temporary=True, **kwargs):
+        """Record `step` applied to another dataset as a plan; nothing runs until the result is needed.
+
+        Chaining onto a dataset that is still lazy extends its plan, so a
+        sequence of operations runs as one fused pass without intermediate frames.
+        """
+        source = self.datasets[source_name]
+        plan = source.plan if source.is_lazy else LazyPlan(source.df)
+        return self._register(name, Dataset(name, temporary=temporary, history_budget=self.history_budget,
+                                            plan=plan.then(step, **kwargs), operations=source.operations,
+                                            profiler=self.profiler))
 
     def get_active_dataset(self):
         """Return the currently active dataset"""
@@ -42,18 +421,64 @@ class DatasetManager:
             return self.datasets[self.active_dataset_name]
         return None
 
-    def apply_basic_op(self, op_func):
-        """Apply a per-file operation to the active dataset"""
+    def compute(self, op_name, func, datasets, params=None, memoize=True, **kwargs):
+        """Run func on a dataset's frame (or a list of datasets' frames), reusing identical earlier runs.
+
+        Results are cached under (input fingerprints, op_name, params); `params`
+        defaults to kwargs without `progress`. A single-dataset operation that
+        changes nothing returns the input frame itself. Returns (result, OpRecord).
+        """
+        single = isinstance(datasets, Dataset)
+        datasets = [datasets] if single else list(datasets)
+        if params is None:
+            params = {k: v for k, v in kwargs.items() if k != "progress"}
+        if memoize:
+            key = (tuple(ds.fingerprint for ds in datasets), op_name, freeze(params))
+            result = self.results.get(key)
+            if result is not None:
+                record = OpRecord(f"{op_name} (cached)", params, wall=0.0, inputs=[ds.df for ds in datasets],
+                                  output=result if isinstance(result, pd.DataFrame) else None)
+                self.profiler.add(record)
+                return result, record
+        frames = [ds.df for ds in datasets]
+        result, record = self.profiler.call(op_name, func, frames[0] if single else frames, params=params, **kwargs)
+        if single and same_content(result, frames[0]):
+            result = frames[0]
+        if memoize:
+            self.results.put(key, result)
+        return result, record
+
+    def find_dataset(self, df):
+        """Name of a dataset whose current frame is `df` itself, or None"""
+        for name, ds in self.datasets.items():
+            if ds._df is df:
+                return name
+        return None
+
+    def apply_basic_op(self, op_func, op_name=None, **kwargs):
+        """Apply a per-file operation to the active dataset; returns False if nothing changed.
+
+        Results are memoized only under an explicit `op_name` whose kwargs fully describe the operation.
+        """
         ds = self.get_active_dataset()
         if ds:
-            ds.df = op_func(ds.df)
+            result, record = self.compute(op_label(op_func, op_name), op_func, ds, memoize=op_name is not None, **kwargs)
+            ds.log(record)
+            if result is ds.df:
+                return False
+            ds.df = result
+            ds.save_state()
+            self.request_budget(keep=ds)
+            return True
+        return False
 
-    def apply_cross_file_op(self, selected_names, op_func, result_name):
-        """Apply a cross-file operation on selected datasets"""
-        dfs = [self.datasets[name].df for name in selected_names if name in self.datasets]
-        if not dfs:
+    def apply_cross_file_op(self, selected_names, op_func, result_name, op_name=None, **kwargs):
+        """Apply a cross-file operation on selected datasets, recording its cost on the result"""
+        datasets = [self.datasets[name] for name in selected_names if name in self.datasets]
+        if not datasets:
             return None
-        result_df = op_func(dfs)
-        self.add_dataset(result_name, result_df, temporary=True)
+        result_df, record = self.compute(op_label(op_func, op_name), op_func, datasets, memoize=op_name is not None,
+                                         **kwargs)
+        self.add_dataset(result_name, result_df, temporary=True, operations=[record])
         self.active_dataset_name = result_name
         return result_df
@@ -0,0 +1,123 @@
+import sys
+import numpy as np
+import pandas as pd
+
+FIELDS = ("dtype", "count", "nulls", "distinct", "min", "max", "bytes")
+
+
+def _summary(col_data):
+    """(null count, distinct values, bytes) of a column from one factorization"""
+    codes, uniques = pd.factorize(col_data)
+    counts = np.bincount(codes + 1, minlength=len(uniques) + 1)  # counts[0] is the missing values
+    size = int(col_data.memory_usage(index=False, deep=col_data.dtype != object))
+    if col_data.dtype == object:
+        # Python objects behind the pointers, weighted by how often each distinct value occurs
+        size += int(np.dot(counts[1:], [sys.getsizeof(value) for value in uniques]))
+        size += sum(map(sys.getsizeof, col_data.to_numpy()[codes < 0]))  # None / NaN objects
+    return int(counts[0]), uniques, size
+
+
+def _extremes(uniques):
+    values = pd.Series(uniques)
+    if isinstance(values.dtype, pd.CategoricalDtype) and not values.dtype.ordered:
+        values = values.astype(values.dtype.categories.dtype)
+    if len(values) == 0:
+        return None, None
+    try:
+        return values.min(), values.max()
+    except TypeError:  # values that don't compare, e.g. mixed types in an object column
+        return None, None
+
+
+def _finish(dtype, rows, nulls, uniques, size):
+    low, high = _extremes(uniques)
+    return {"dtype": dtype, "count": rows - nulls, "nulls": nulls, "distinct": len(uniques),
+            "min": low, "max": high, "bytes": size}
+
+
+def column_stats(col_data):
+    """Statistics of one column: dtype, non-null count, nulls, distinct values, min, max and bytes.
+
+    Everything comes from a single factorization of the column; min and max
+    are taken over the distinct values only and are None where values don't
+    compare. Bytes include the Python objects of object columns.
+    """
+    nulls, uniques, size = _summary(col_data)
+    return _finish(col_data.dtype, len(col_data), nulls, uniques, size)
+
+
+def _array_key(values):
+    return values.__array_interface__["data"][0], values.shape, values.strides, values.dtype.str
+
+
+def buffer_key(col_data):
+    """Addresses of a column's data, equal for live columns sharing their buffers; None if unknown without a copy"""
+    dtype = col_data.dtype
+    values = col_data.array
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _array_key(values.codes) + (dtype,)
+    if isinstance(dtype, np.dtype):
+        return _array_key(col_data.to_numpy(copy=False)) + (dtype.str,)  # a view of the frame's block
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return _array_key(values.asi8) + (str(dtype),)
+    if isinstance(values, pd.arrays.ArrowExtensionArray):
+        chunks = values.__arrow_array__().chunks  # zero-copy
+        return tuple((chunk.offset, len(chunk), tuple(0 if buffer is None else buffer.address for buffer in chunk.buffers()))
+                     for chunk in chunks) + (str(dtype),)
+    return None
+
+
+def shared_column_stats(old, known, new):
+    """Statistics from `known` (position in `old` -> column_stats) for the columns of `new` sharing their buffers.
+
+    Both frames must be alive: two live columns with the same buffer
+    addresses hold the same memory, so (frames being treated as immutable)
+    the same values. Returns position in `new` -> column_stats.
+    """
+    by_key = {}
+    for j, stats in known.items():
+        key = buffer_key(old.iloc[:, j])
+        if key is not None:
+            by_key[key] = stats
+    shared = {}
+    if by_key:
+        for j in range(new.shape[1]):
+            stats = by_key.get(buffer_key(new.iloc[:, j]))
+            if stats is not None:
+                shared[j] = stats
+    return shared
+
+
+def known_column_stats(df, position, known):
+    """column_stats of the column at `position`, taken from or added to `known` (position -> statistics)"""
+    if position not in known:
+        known[position] = column_stats(df.iloc[:, position])
+    return known[position]
+
+
+def frame_column_stats(df, known=None):
+    """column_stats of every column as a DataFrame with one row per column.
+
+    `known` maps positions to statistics already computed for this frame;
+    only the other columns are scanned, and their statistics are added to it.
+    """
+    known = {} if known is None else known
+    return pd.DataFrame([known_column_stats(df, j, known) for j in range(df.shape[1])], index=df.columns, columns=list(FIELDS))
+
+
+def stream_column_stats(chunks):
+    """frame_column_stats of the concatenation of `chunks`, holding one chunk and the distinct values at a time"""
+    columns, partial = None, []
+    for chunk in chunks:
+        if columns is None:
+            columns = chunk.columns
+            partial = [[chunk.iloc[:, j].dtype, 0, 0, None, 0] for j in range(chunk.shape[1])]
+        for j, state in enumerate(partial):
+            col_data = chunk.iloc[:, j]
+            nulls, uniques, size = _summary(col_data)
+            if state[3] is not None:
+                uniques = pd.unique(pd.concat([pd.Series(state[3]), pd.Series(uniques)], ignore_index=True))
+            state[1:] = [state[1] + len(col_data), state[2] + nulls, uniques, state[4] + size]
+    if columns is None:
+        return pd.DataFrame(columns=list(FIELDS))
+    return pd.DataFrame([_finish(*state) for state in partial], index=columns, columns=list(FIELDS))
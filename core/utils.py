@@ -1,4 +1,14 @@
+_issued_names = set()
+
 def generate_temp_name(base="temp"):
     """Generate unique temporary dataset names"""
     import time
-    return f"{base}_{int(time.time())}"
+    name = f"{base}_{int(time.time())}"
+    # Background jobs can finish within the same second
+    suffix = 2
+    unique = name
+    while unique in _issued_names:
+        unique = f"{name}_{suffix}"
+        suffix += 1
+    _issued_names.add(unique)
+    return unique
@@ -1,78 +1,135 @@
+import argparse
+import os
 import pandas as pd
 import numpy as np
-import os
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
+from utils.exporter import export_chunks
+
+XLSX_MAX_ROWS = 100_000  # larger sales files are written as CSV; openpyxl gets very slow beyond this
 
-os.makedirs("test_data", exist_ok=True)
+# Row counts of the small sample files shipped in test_data/
+SAMPLE_ROWS = 50
+
+GENERATE_CHUNK_ROWS = 1_000_000  # rows built and written at a time, bounding memory for huge files
 
 # Helper to generate dates
-def random_dates(start, end, n):
-    start_u = start.value//10**9
-    end_u = end.value//10**9
-    return [datetime.fromtimestamp(random.randint(start_u, end_u)).strftime("%Y-%m-%d") for _ in range(n)]
-
-# 1. Employees (Clean Baseline) - 50 Rows
-data1 = {
-    "EmployeeID": range(1001, 1051),
-    "FullName": [f"Employee_{i}" for i in range(1, 51)],
-    "Department": [random.choice(["HR", "Engineering", "Sales", "Marketing"]) for _ in range(50)],
-    "Salary": [random.randint(40000, 120000) for _ in range(50)],
-    "Status": ["Active"] * 50
-}
-pd.DataFrame(data1).to_csv("test_data/1_Employees.csv", index=False)
+def random_dates(rng, start, end, n):
+    start_u = pd.Timestamp(start).value // 10**9
+    end_u = pd.Timestamp(end).value // 10**9
+    seconds = rng.integers(start_u, end_u, size=n, endpoint=True)
+    return pd.to_datetime(seconds, unit="s").strftime("%Y-%m-%d")
+
+def labels(template, numbers):
+    return pd.Index(numbers).astype(str).map(template.format)
 
-# 2. Sales Data (Excel, Missing Values) - 50 Rows
+# Each builder receives the row numbers (0-based) of one block of a dataset with `total` rows
+
+# 1. Employees (Clean Baseline)
+def make_employees(rows, rng, total):
+    n = len(rows)
+    return pd.DataFrame({
+        "EmployeeID": rows + 1001,
+        "FullName": labels("Employee_{}", rows + 1),
+        "Department": rng.choice(["HR", "Engineering", "Sales", "Marketing"], size=n),
+        "Salary": rng.integers(40000, 120000, size=n, endpoint=True),
+        "Status": "Active",
+    })
+
+# 2. Sales Data (Missing Values)
 # Intentionally removing some values to test "Handle Missing"
-products = ["Widget A", "Widget B", "Gadget X", "Gadget Y", "Tool Z"]
-rows = []
-for i in range(50):
-    rows.append({
-        "TransactionID": f"TXN_{i+1}",
-        "Product": random.choice(products),
-        "Quantity": random.choice([1, 2, 5, 10, np.nan]) if i % 10 != 0 else np.nan, # 10% missing
-        "Price": random.uniform(10.0, 500.0) if i % 15 != 0 else np.nan, # ~7% missing
-        "Date": (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
+def make_sales(rows, rng, total):
+    n = len(rows)
+    products = ["Widget A", "Widget B", "Gadget X", "Gadget Y", "Tool Z"]
+    quantity = rng.choice([1, 2, 5, 10, np.nan], size=n)
+    quantity[rows % 10 == 0] = np.nan  # 10% missing
+    price = rng.uniform(10.0, 500.0, size=n)
+    price[rows % 15 == 0] = np.nan  # ~7% missing
+    today = pd.Timestamp(datetime.now().date())
+    return pd.DataFrame({
+        "TransactionID": labels("TXN_{}", rows + 1),
+        "Product": rng.choice(products, size=n),
+        "Quantity": quantity,
+        "Price": price,
+        "Date": (today - pd.to_timedelta(rows % 3650, unit="D")).strftime("%Y-%m-%d"),
+    })
+
+# 3. Inventory (Duplicates & Messy Text)
+# Tests "Remove Duplicates" and "Standardize Data"; one row in six repeats an earlier row
+def make_inventory(rows, rng, total):
+    n = len(rows)
+    items = np.array(["  Laptop ", "laptop", "LAPTOP  ", " Mouse", "MOUSE", "KeyBoard", "monitor "])
+    unique = n - n // 6
+    df = pd.DataFrame({
+        "Item_Name": rng.choice(items, size=unique),
+        "Stock_Count": rng.integers(1, 100, size=unique, endpoint=True),
+        "Location": "Warehouse A",
     })
-pd.DataFrame(rows).to_excel("test_data/2_Sales_Missing_Values.xlsx", index=False)
-
-# 3. Inventory (Duplicates & Messy Text) - 60 Rows (to allow for removal)
-# Tests "Remove Duplicates" and "Standardize Data"
-items = ["  Laptop ", "laptop", "LAPTOP  ", " Mouse", "MOUSE", "KeyBoard", "monitor "]
-raw_data = []
-for i in range(50):
-    raw_data.append([random.choice(items), random.randint(1, 100), "Warehouse A"])
-# Add 10 duplicates
-for _ in range(10):
-    raw_data.append(raw_data[random.randint(0, 49)])
-
-pd.DataFrame(raw_data, columns=["Item_Name", "Stock_Count", "Location"]).to_csv("test_data/3_Inventory_Messy_Duplicates.csv", index=False)
-
-# 4. Merge Data A (Main) - 50 Rows
-df_a = pd.DataFrame({
-    "UserID": range(1, 51),
-    "Username": [f"User_{i}" for i in range(1, 51)],
-    "Email": [f"user{i}@example.com" for i in range(1, 51)]
-})
-df_a.to_csv("test_data/4_Merge_Users_Base.csv", index=False)
-
-# 5. Merge Data B (Extensions) - 50 Rows (Same IDs)
-# Tests the "Join" logic we implemented
-df_b = pd.DataFrame({
-    "UserID": range(1, 51),
-    "LoginCount": [random.randint(1, 500) for _ in range(50)],
-    "LastLogin": random_dates(pd.to_datetime('2023-01-01'), pd.to_datetime('2023-12-31'), 50)
-})
-df_b.to_csv("test_data/5_Merge_Users_Activity.csv", index=False)
-
-# 6. Merge Data C (Append with Overlap) - IDs 30 to 80
-# Base has 1-50. This has 30-80. Overlap is 30-50.
-# Merging 4 and 6 should result in 80 unique rows (1-80).
-df_c = pd.DataFrame({
-    "UserID": range(30, 81),
-    "Username": [f"User_{i}" for i in range(30, 81)],
-    "Email": [f"user{i}@example.com" for i in range(30, 81)]
-})
-df_c.to_csv("test_data/6_Merge_Users_Append.csv", index=False)
-
-print("Generated 6 cleaned datasets (including new overlap test) in test_data/.")
+    duplicates = df.iloc[rng.integers(0, unique, size=n - unique)]
+    return pd.concat([df, duplicates], ignore_index=True)
+
+# 4. Merge Data A (Main)
+def make_users_base(rows, rng, total):
+    ids = rows + 1
+    return pd.DataFrame({
+        "UserID": ids,
+        "Username": labels("User_{}", ids),
+        "Email": labels("user{}@example.com", ids),
+    })
+
+# 5. Merge Data B (Extensions) - Same IDs
+# Tests the "Join" logic
+def make_users_activity(rows, rng, total):
+    return pd.DataFrame({
+        "UserID": rows + 1,
+        "LoginCount": rng.integers(1, 500, size=len(rows), endpoint=True),
+        "LastLogin": random_dates(rng, "2023-01-01", "2023-12-31", len(rows)),
+    })
+
+# 6. Merge Data C (Append with Overlap)
+# Base has IDs 1..n, this one starts at 0.6n, so the last 40% of the base overlaps
+def make_users_append(rows, rng, total):
+    return make_users_base(rows + int(total * 0.6) - 1, rng, total)
+
+# file name -> builder(rows, rng, total)
+DATASETS = {
+    "1_Employees.csv": make_employees,
+    "2_Sales_Missing_Values.xlsx": make_sales,
+    "3_Inventory_Messy_Duplicates.csv": make_inventory,
+    "4_Merge_Users_Base.csv": make_users_base,
+    "5_Merge_Users_Activity.csv": make_users_activity,
+    "6_Merge_Users_Append.csv": make_users_append,
+}
+
+def make_dataset(file_name, total, seed=None):
+    """Build one whole dataset in memory"""
+    return DATASETS[file_name](np.arange(total), np.random.default_rng(seed), total)
+
+def generate(rows=SAMPLE_ROWS, out_dir="test_data", seed=None, names=None):
+    """Write the datasets (all six by default) with `rows` rows each; returns the written paths.
+
+    Files are built and appended block by block, so memory stays flat up to
+    tens of millions of rows. Sales data is written as CSV instead of xlsx
+    above XLSX_MAX_ROWS rows.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for file_name in names or DATASETS:
+        make = DATASETS[file_name]
+        if file_name.endswith(".xlsx") and rows > XLSX_MAX_ROWS:
+            file_name = file_name[:-len(".xlsx")] + ".csv"
+        path = os.path.join(out_dir, file_name)
+        blocks = (make(np.arange(start, min(start + GENERATE_CHUNK_ROWS, rows)), rng, rows)
+                  for start in range(0, rows, GENERATE_CHUNK_ROWS))
+        export_chunks(blocks, path, "excel" if path.endswith(".xlsx") else "csv")
+        paths.append(path)
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets mirroring the test_data schemas")
+    parser.add_argument("--rows", type=int, default=SAMPLE_ROWS, help="rows per dataset (e.g. 10000 to 50000000)")
+    parser.add_argument("--out", default="test_data", help="output directory")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible data")
+    args = parser.parse_args()
+    paths = generate(args.rows, args.out, args.seed)
+    print(f"Generated {len(paths)} datasets with {args.rows:,} rows each in {args.out}/.")
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def make_df():
+    """Factory for the shared test frame, repeated n times.
+
+    Names need stripping, rows 0 and 2 are duplicates, one score is missing
+    and the integer column label must survive spills and sessions.
+    """
+    def make(n=1):
+        return pd.DataFrame({
+            'name': [' Ann', 'bob ', ' Ann', 'Cy'] * n,
+            'score': [1.5, 2.0, 1.5, np.nan] * n,
+            1: [1, 2, 1, 3] * n,
+        })
+    return make
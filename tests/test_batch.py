@@ -0,0 +1,40 @@
+import sys
+import os
+import subprocess
+import pandas as pd
+import pytest
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.batch import Recipe, find_inputs, run_batch
+from core.processor import remove_duplicates, standardize_column
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "test_data")
+
+def test_recipe_parsing_fuses_column_steps():
+    recipe = Recipe.from_dict({"steps": ["remove_duplicates",
+                                         {"standardize_column": {"column": "a", "method": "strip"}},
+                                         {"standardize_column": {"column": "a", "method": "title"}}],
+                               "output": {"format": "jsonl", "compression": "gzip"}})
+    assert [name for name, _ in recipe.steps] == ["remove_duplicates", "apply_column_transforms"]
+    assert recipe.extension == ".jsonl.gz"
+    with pytest.raises(ValueError):
+        Recipe(["drop_everything"])
+
+def test_run_batch_streams_each_file_and_reports_failures(tmp_path):
+    recipe = Recipe(["remove_duplicates", {"standardize_column": {"column": "Item_Name", "method": "strip"}}])
+    inputs = find_inputs(os.path.join(DATA_DIR, "[13]_*"))
+    summaries = run_batch(recipe, inputs, str(tmp_path), workers=2)
+    assert [s["input"] for s in summaries] == inputs
+    assert "error" in summaries[0] and not os.path.exists(summaries[0]["output"])
+    inventory = pd.read_csv(inputs[1])
+    expected = standardize_column(remove_duplicates(inventory), "Item_Name", "strip")
+    assert summaries[1]["rows_out"] == len(expected)
+    assert pd.read_csv(summaries[1]["output"]).equals(expected.reset_index(drop=True))
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, batch, core.batch; print(any(m.startswith(('tkinter', '_tkinter', 'ui')) for m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
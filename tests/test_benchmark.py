@@ -0,0 +1,30 @@
+import sys
+import os
+import numpy as np
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import compare
+from core.processor import merge_datasets, remove_duplicates
+from generate_test_data import generate, make_dataset
+
+def test_generated_data_mirrors_sample_schemas(tmp_path):
+    paths = generate(200, str(tmp_path), seed=1)
+    samples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+    assert sorted(map(os.path.basename, paths)) == sorted(os.listdir(samples))
+    inventory = make_dataset("3_Inventory_Messy_Duplicates.csv", 600, seed=1)
+    assert len(remove_duplicates(inventory)) < 600
+    sales = make_dataset("2_Sales_Missing_Values.xlsx", 600, seed=1)
+    assert sales["Quantity"].isna().mean() >= 0.1 and sales["Price"].isna().any()
+    base = make_dataset("4_Merge_Users_Base.csv", 600)
+    append = make_dataset("6_Merge_Users_Append.csv", 600)
+    assert len(merge_datasets([base, append])) == 959
+
+def test_compare_flags_only_real_regressions():
+    def report(seconds, peak):
+        return {"meta": {"rows": 10}, "results": {"op": {"seconds": seconds, "peak_bytes": peak}}}
+    baseline = report(1.0, 100 * 1024 ** 2)
+    assert compare(report(1.1, 100 * 1024 ** 2), baseline) == []
+    assert len(compare(report(2.0, 300 * 1024 ** 2), baseline)) == 2
+    assert compare(report(0.002, 100), report(0.001, 50)) == []
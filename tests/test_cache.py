@@ -0,0 +1,56 @@
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import FileCache
+from core.loader import load_file
+
+def test_repeat_load_is_served_from_cache(tmp_path):
+    src = tmp_path / "data.csv"
+    pd.DataFrame({'a': [1, 2, None], 'b': ['x', 'y', 'z']}).to_csv(src, index=False)
+    cache = FileCache(str(tmp_path / "cache"))
+    first = load_file(str(src), cache=cache)
+    assert len(cache.entries()) == 1
+    second = load_file(str(src), cache=cache)
+    assert second.equals(first)
+
+def test_modified_file_is_not_served_stale(tmp_path):
+    src = tmp_path / "data.csv"
+    src.write_text("a\n1\n")
+    cache = FileCache(str(tmp_path / "cache"))
+    load_file(str(src), cache=cache)
+    src.write_text("a\n1\n2\n")
+    assert len(load_file(str(src), cache=cache)) == 2
+
+def test_eviction_keeps_cache_under_cap(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"), max_bytes=1)
+    for i in range(3):
+        src = tmp_path / f"f{i}.csv"
+        src.write_text(f"a\n{i}\n")
+        load_file(str(src), cache=cache)
+    assert len(cache.entries()) <= 1
+
+def test_oversized_frame_is_not_cached(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"), max_bytes=100_000)
+    for i in range(3):
+        src = tmp_path / f"f{i}.csv"
+        src.write_text(f"a\n{i}\n")
+        load_file(str(src), cache=cache)
+    big = tmp_path / "big.csv"
+    big.write_text("a\n" + "1\n" * 50_000)
+    assert len(load_file(str(big), cache=cache)) == 50_000
+    assert len(cache.entries()) == 3 and cache.lookup(str(big), compact=False) is None
+
+def test_files_removed_by_another_worker_are_skipped(tmp_path, monkeypatch):
+    cache = FileCache(str(tmp_path / "cache"), max_bytes=1)
+    src = tmp_path / "f.csv"
+    src.write_text("a\n1\n")
+    gone = os.path.join(cache.cache_dir, "gone.arrow")
+    monkeypatch.setattr(os, "listdir", lambda path: ["gone.arrow"])
+    assert cache.entries() == []
+    monkeypatch.setattr(FileCache, "entries", lambda self: [(gone, 10, 0.0)])
+    cache.evict()
+    cache.clear()
@@ -5,7 +5,7 @@ import pandas as pd
 # Add the project root to the path so we can import from core
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.processor import standardize_column
+from core.processor import standardize_column, standardize_data, apply_column_transforms, convert_unique_values
 
 def test_num_to_words():
     df = pd.DataFrame({'numbers': [21, 105, 0, 99]})
@@ -33,10 +33,40 @@ def test_words_to_num():
     assert result['words'].iloc[4] == 'invalid'
     print("words_to_num passed successfully!")
 
+def test_apply_column_transforms_single_pass():
+    df = pd.DataFrame({'name': ['  Ann ', 'BOB'], 'city': [' Oslo', 'rome '], 'n': [1.26, 2.71]})
+    plan = [('name', 'strip'), ('name', 'title'), ('city', 'strip'), ('n', 'round', {'decimals': 1})]
+    result = apply_column_transforms(df, plan)
+    assert list(result['name']) == ['Ann', 'Bob']
+    assert list(result['city']) == ['Oslo', 'rome']
+    assert list(result['n']) == [1.3, 2.7]
+    # Input frame is left untouched
+    assert list(df['name']) == ['  Ann ', 'BOB']
+
+def test_standardize_data_strips_and_lowercases_text():
+    df = pd.DataFrame({'item': ['  Laptop ', 'LAPTOP  '], 'stock': ['5', '7']})
+    result = standardize_data(df)
+    assert list(result['item']) == ['laptop', 'laptop']
+    assert list(result['stock']) == ['5', '7']
+
+def test_conversion_runs_once_per_distinct_value():
+    calls = []
+    def convert(value):
+        calls.append(value)
+        return value * 10
+    col = pd.Series([1, 2, 1, None, 2, 1])
+    result = convert_unique_values(col, convert)
+    assert sorted(calls) == [1.0, 2.0]
+    assert list(result[[0, 1, 2, 4, 5]]) == [10, 20, 10, 20, 10]
+    assert pd.isnull(result[3])
+
 if __name__ == "__main__":
     try:
         test_num_to_words()
         test_words_to_num()
+        test_apply_column_transforms_single_pass()
+        test_standardize_data_strips_and_lowercases_text()
+        test_conversion_runs_once_per_distinct_value()
         print("\nAll tests passed!")
     except ImportError:
         print("Dependencies not installed correctly.")
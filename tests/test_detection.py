@@ -0,0 +1,29 @@
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.detection import detect_column_type, suggest_column_type
+from core.state import Dataset
+
+def test_detects_common_text_types():
+    assert detect_column_type(pd.Series([f"user{i}@example.com" for i in range(50)]))['type'] == 'email'
+    assert detect_column_type(pd.Series(['555-123-4567', '+1 (555) 123 4567'] * 20))['type'] == 'phone'
+    assert detect_column_type(pd.Series(['2023-01-05', '2023-12-31'] * 20))['type'] == 'date'
+    assert detect_column_type(pd.Series(['12', '7', '-3'] * 20))['type'] == 'integer'
+    assert detect_column_type(pd.Series(['Widget A', 'Gadget X'] * 20))['type'] == 'text'
+
+def test_large_column_stops_on_small_sample():
+    col = pd.Series([f"user{i}@example.com" for i in range(200_000)])
+    result = detect_column_type(col)
+    assert result['type'] == 'email'
+    assert result['sampled'] <= 1000
+
+def test_suggestions_cached_per_dataset_version():
+    ds = Dataset("d", pd.DataFrame({'email': ['a@b.com', 'c@d.org']}))
+    first = suggest_column_type(ds, 'email')
+    assert suggest_column_type(ds, 'email') is first
+    ds.df = pd.DataFrame({'email': ['x', 'y']})
+    assert suggest_column_type(ds, 'email')['type'] == 'text'
@@ -0,0 +1,50 @@
+import sys
+import os
+import io
+import pandas as pd
+import pyarrow as pa
+
+# Add the project root to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.exporter import export_chunks, export_data, infer_format
+
+def _frame():
+    return pd.DataFrame({'id': range(10), 'name': [f"n{i}" for i in range(10)], 'score': [i / 4 for i in range(10)]})
+
+def test_infer_format():
+    assert infer_format("out.csv.gz") == ("csv", "gzip")
+    assert infer_format("OUT.JSONL.zst") == ("jsonl", "zstd")
+    assert infer_format("out.parquet") == ("parquet", None)
+    assert infer_format("out.json") == ("json", None)
+
+def test_streamed_formats_round_trip(tmp_path):
+    df = _frame()
+    chunks = [df.iloc[i:i + 3] for i in range(0, len(df), 3)]
+    progress = []
+    assert export_chunks(iter(chunks), str(tmp_path / "a.csv.gz"), progress=lambda done, total: progress.append(done)) == 10
+    assert progress == [3, 6, 9, 10]
+    assert pd.read_csv(tmp_path / "a.csv.gz").equals(df)
+    export_chunks(iter(chunks), str(tmp_path / "a.json"))
+    assert pd.read_json(tmp_path / "a.json", orient="records").equals(df)
+    export_chunks(iter(chunks), str(tmp_path / "a.parquet"))
+    assert pd.read_parquet(tmp_path / "a.parquet").equals(df)
+    export_chunks(iter(chunks), str(tmp_path / "a.jsonl.zst"))
+    with pa.CompressedInputStream(str(tmp_path / "a.jsonl.zst"), "zstd") as source:
+        text = source.read().decode("utf-8")
+    assert pd.read_json(io.StringIO(text), lines=True).equals(df)
+
+def test_export_data_keeps_header_for_empty_frame(tmp_path):
+    export_data(_frame().head(0), str(tmp_path / "empty.csv"), "csv")
+    assert open(tmp_path / "empty.csv").read() == "id,name,score\n"
+
+def test_parquet_column_empty_in_first_chunk(tmp_path):
+    df = pd.DataFrame({'note': pd.Series([None, None, None, 'x', 'y', 'z'], dtype=object), 'qty': range(6)})
+    export_data(df, str(tmp_path / "a.parquet"), chunksize=3)
+    assert pd.read_parquet(tmp_path / "a.parquet")['note'].tolist()[3:] == ['x', 'y', 'z']
+    # Streamed chunks can't be seen ahead, so what was written is widened when a chunk doesn't fit
+    chunks = [df.iloc[:3], df.iloc[3:].assign(qty=[3.5, 4.0, 5.0])]
+    assert export_chunks(iter(chunks), str(tmp_path / "b.parquet")) == 6
+    result = pd.read_parquet(tmp_path / "b.parquet")
+    assert result['note'].tolist()[3:] == ['x', 'y', 'z'] and result['qty'].tolist() == [0, 1, 2, 3.5, 4, 5]
+    assert sorted(os.listdir(tmp_path)) == ["a.parquet", "b.parquet"]
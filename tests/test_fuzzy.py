@@ -0,0 +1,58 @@
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.fuzzy as fuzzy
+from core.fuzzy import edit_similarity, near_duplicate_clusters
+from core.processor import flag_near_duplicates
+
+def test_edit_similarity_matches_levenshtein():
+    left = ["kitten", "", "laptop", "flaw", "abc", "straße"]
+    right = ["sitting", "", "laptpo", "lawn", "", "strasse"]
+    distances = [3, 0, 2, 2, 3, 2]
+    expected = [1 - d / max(len(a), len(b), 1) for a, b, d in zip(left, right, distances)]
+    assert list(edit_similarity(left, right)) == expected
+
+def test_clusters_normalized_and_fuzzy_matches():
+    df = pd.DataFrame({
+        'Item_Name': ["  Laptop ", "laptop", "LAPTOP  ", "Lapt0p", " Mouse", "MOUSE", "KeyBoard", None, "laptop"],
+        'Stock_Count': [5, 5, 5, 5, 1, 1, 2, 4, 6],
+    })
+    clusters = near_duplicate_clusters(df, threshold=0.8)
+    # Stock_Count must match exactly, so the last laptop row stays apart
+    assert clusters.tolist() == [0, 0, 0, 1, 2, 2, 3, 4, 5]
+    # Digits have to agree by default, so "Lapt0p" only joins once that check is off
+    assert near_duplicate_clusters(df, threshold=0.8, match_digits=False).tolist()[:4] == [0, 0, 0, 0]
+    assert near_duplicate_clusters(df, threshold=1).tolist()[3] != 0
+
+def test_flag_keeps_every_row():
+    df = pd.DataFrame({'name': [f"Customer {i % 40} Ltd" for i in range(200)] + ["customer 1 ltd "]})
+    flagged = flag_near_duplicates(df)
+    assert len(flagged) == len(df) and flagged['duplicate_cluster'].nunique() == 40
+    assert flagged['duplicate_cluster'].iloc[-1] == flagged['duplicate_cluster'].iloc[1]
+    # Re-running ignores the existing cluster column
+    assert flag_near_duplicates(flagged)['duplicate_cluster'].equals(flagged['duplicate_cluster'])
+
+def test_every_text_column_is_compared_in_full():
+    df = pd.DataFrame({
+        'name': ["Alice Johnson", "Alice Johnson", "alice  johnson", "Bob Stone"],
+        'email': ["alice.johnson@example.com", "alice.johnson@example.org", "alice.johnson@example.com", "bob@example.com"],
+        'city': ["Springfield", "Shelbyville", "Springfeld", "Springfield"],
+    })
+    # Row 1 differs only late in the joined key, in a city far from the others
+    assert near_duplicate_clusters(df).tolist() == [0, 1, 0, 2]
+    long_a, long_b = "a" * 70 + "x", "a" * 70 + "yyyyyyyy"
+    assert list(edit_similarity([long_a], [long_b])) == [1 - 8 / 78]
+
+def test_long_outlier_widens_only_its_own_batch(monkeypatch):
+    widths = []
+    original = fuzzy._similarity_batch
+    monkeypatch.setattr(fuzzy, "_similarity_batch", lambda a, len_a, b, len_b: widths.append(a.shape) or original(a, len_a, b, len_b))
+    monkeypatch.setattr(fuzzy, "PAIR_BATCH", 4)
+    left = ["anna", "bob", "cara", "dan", "x" * 2000, "eve"]
+    right = ["ana", "bob", "clara", "dane", "x" * 1999 + "y", "eva"]
+    assert edit_similarity(left, right).tolist()[4] == 1 - 1 / 2000
+    assert widths == [(4, 4), (2, 2000)]  # sorted by the longer string, the outlier comes last
@@ -0,0 +1,59 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.hashindex as hashindex
+from core.hashindex import RowHashIndex, hash_rows, unseen_rows
+from core.processor import merge_datasets, remove_duplicates
+from core.state import Dataset
+
+def id_rows(start, stop):
+    ids = np.arange(start, stop)
+    return pd.DataFrame({'id': ids % 50, 'name': [f"n{i % 7}" for i in ids], 'score': np.where(ids % 5, ids % 3, np.nan)})
+
+def test_append_hashes_only_new_rows(monkeypatch):
+    master = Dataset("master", remove_duplicates(id_rows(0, 400)))
+    master.mark_unique()
+    daily = id_rows(300, 420)
+    expected = pd.concat([master.df, daily], ignore_index=True).drop_duplicates(ignore_index=True)
+    master.row_index  # built once for the master
+
+    hashed = []
+    monkeypatch.setattr(hashindex, "hash_rows", lambda df: hashed.append(len(df)) or hash_rows(df))
+    indexes = []
+    merged = merge_datasets([master.df, daily], index=master.row_index, on_unique=indexes.append)
+    pd.testing.assert_frame_equal(merged, expected)
+    assert hashed and all(n == len(daily) for n in hashed)
+    # The result's index carries forward, so a second append and dedup stay incremental
+    assert remove_duplicates(merged, index=indexes[0]) is merged
+    merged_again = merge_datasets([merged, id_rows(410, 430)], index=indexes[0], on_unique=indexes.append)
+    assert len(indexes[1]) == len(merged_again) and len(indexes[0]) == len(merged)
+
+def test_uniqueness_is_never_assumed_for_a_plain_frame():
+    unique = remove_duplicates(id_rows(0, 3))
+    unique['id'] = 1
+    unique['name'] = 'same'
+    unique['score'] = 0.0
+    assert len(remove_duplicates(unique)) == 1  # changed in place since it was de-duplicated
+
+def test_hash_collisions_are_verified():
+    frame = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+    index = RowHashIndex(positions=True)
+    index.add(hash_rows(frame), np.arange(2))
+    new = pd.DataFrame({'a': [3, 1], 'b': ['z', 'x']})
+    forged = np.array([hash_rows(frame)[0]] * 2, dtype=np.uint64)  # both rows claim row 0's hash
+    keep = unseen_rows(index, frame, new, hashes=forged)
+    assert keep.tolist() == [True, False]
+    assert sorted(index.candidates(forged[0]).tolist()) == [0, 2]
+
+def test_index_save_and_load(tmp_path):
+    index = RowHashIndex(positions=True)
+    index.add(np.array([5, 1, 9], dtype=np.uint64), np.arange(3))
+    index.add(np.array([7], dtype=np.uint64), np.array([3]))
+    loaded = RowHashIndex.load(index.save(str(tmp_path / "rows")))
+    probe = np.array([9, 7, 4], dtype=np.uint64)
+    assert loaded.lookup(probe).tolist() == index.lookup(probe).tolist() == [2, 3, -1]
@@ -0,0 +1,54 @@
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.state import Dataset
+from core.processor import remove_duplicates, standardize_column
+
+def apply_steps(ds):
+    states = [ds.df]
+    for op in (remove_duplicates,
+               lambda df: standardize_column(df, 'name', 'strip'),
+               lambda df: df.assign(total=df[1] * 2),
+               lambda df: df.drop(columns=['score']).iloc[::-1]):
+        ds.df = op(ds.df)
+        ds.save_state()
+        states.append(ds.df)
+    return states
+
+def test_undo_rebuilds_each_previous_state(make_df):
+    ds = Dataset("t", make_df())
+    states = apply_steps(ds)
+    for expected in reversed(states[:-1]):
+        assert ds.undo()
+        assert ds.df.equals(expected)
+    assert not ds.undo()
+
+def test_deltas_store_only_changed_columns(make_df):
+    ds = Dataset("t", make_df())
+    apply_steps(ds)
+    strip_delta = ds.history.deltas[1]
+    assert list(strip_delta.changed) == ['name']
+    dedup_delta = ds.history.deltas[0]
+    assert dedup_delta.changed == {} and dedup_delta.rows.dtype == bool
+
+def test_reset_returns_original_without_copy(make_df):
+    original = make_df()
+    ds = Dataset("t", original)
+    apply_steps(ds)
+    assert ds.reset()
+    assert ds.df is original
+    assert len(ds.history) == 1
+
+def test_budget_merges_oldest_steps_but_keeps_reset(make_df):
+    original = make_df()
+    ds = Dataset("t", original, history_budget=1)
+    states = apply_steps(ds)
+    # Every step got merged into a single delta from the original
+    assert len(ds.history) == 2
+    assert ds.df is states[-1]
+    assert ds.undo()
+    assert ds.df is original
@@ -0,0 +1,30 @@
+import sys
+import os
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import FileCache
+from core.ingest import ingest_files
+from core.loader import load_file
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+
+def test_ingest_matches_load_file_and_isolates_failures(tmp_path):
+    good = [os.path.join(DATA_DIR, name) for name in sorted(os.listdir(DATA_DIR))[:3]]
+    bad = str(tmp_path / "notes.txt")
+    open(bad, "w").close()
+    results = {r.path: r for r in ingest_files(good + [bad], max_workers=2)}
+    assert set(results) == set(good + [bad])
+    assert not results[bad].ok and isinstance(results[bad].error, ValueError)
+    for path in good:
+        assert results[path].ok
+        assert results[path].df.equals(load_file(path))
+
+def test_ingest_through_cache(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"))
+    path = os.path.join(DATA_DIR, sorted(os.listdir(DATA_DIR))[0])
+    first = next(ingest_files([path], cache=cache))
+    second = next(ingest_files([path], cache=cache))
+    assert len(cache.entries()) == 1
+    assert first.df.equals(second.df) and first.df.equals(load_file(path))
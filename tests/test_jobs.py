@@ -0,0 +1,71 @@
+import sys
+import os
+import threading
+import time
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.jobs import JobExecutor
+
+def wait_for(executor, timeout=5):
+    deadline = time.time() + timeout
+    while executor.busy and time.time() < deadline:
+        executor.poll()
+        time.sleep(0.01)
+    assert not executor.busy
+
+def test_jobs_on_same_dataset_run_in_order():
+    executor = JobExecutor(max_workers=4)
+    release = threading.Event()
+    order = []
+
+    def first(job):
+        release.wait(5)
+        order.append("first")
+
+    executor.submit(first, keys=("a",))
+    second = executor.submit(lambda job: order.append("second"), keys=("a",))
+    other = executor.submit(lambda job: order.append("other"), keys=("b",))
+    time.sleep(0.05)
+    assert not second.started and other.started
+    release.set()
+    wait_for(executor)
+    assert order.index("first") < order.index("second")
+
+def test_cancel_stops_job_at_next_progress_report():
+    executor = JobExecutor()
+    results = []
+
+    def work(job):
+        for i in range(1000):
+            job.report(i, 1000)
+            time.sleep(0.001)
+        return "finished"
+
+    job = executor.submit(work, on_done=results.append, on_cancel=lambda: results.append("cancelled"))
+    time.sleep(0.02)
+    assert job.fraction is not None
+    job.cancel()
+    wait_for(executor)
+    assert results == ["cancelled"]
+
+def test_errors_are_delivered_on_poll():
+    executor = JobExecutor()
+    errors = []
+    executor.submit(lambda job: 1 / 0, on_error=errors.append)
+    wait_for(executor)
+    assert isinstance(errors[0], ZeroDivisionError)
+
+def test_published_items_arrive_before_completion():
+    executor = JobExecutor()
+    events = []
+
+    def work(job):
+        for i in range(3):
+            job.publish(i)
+        return "done"
+
+    executor.submit(work, on_partial=lambda item: events.append(item), on_done=events.append)
+    wait_for(executor)
+    assert events == [0, 1, 2, "done"]
@@ -0,0 +1,50 @@
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.joins as joins
+from core.joins import plan_merge, profile_join
+from core.processor import merge_datasets
+
+def test_profile_detects_many_to_many():
+    left = pd.DataFrame({'k': [1, 1, 2], 'a': [1, 2, 3]})
+    right = pd.DataFrame({'k': [1, 1, 3], 'b': [4, 5, 6]})
+    p = profile_join(left, right, ['k'])
+    assert p['inner_rows'] == 4
+    assert p['left_only_rows'] == 1 and p['right_only_rows'] == 1
+    assert not p['left_unique'] and not p['right_unique']
+    plan = plan_merge([left, right])
+    assert plan.estimated_rows == len(merge_datasets([left, right])) == 6
+    assert any('many-to-many' in w for w in plan.warnings)
+
+def test_join_order_starts_with_smallest_pair():
+    users = pd.DataFrame({'uid': range(100), 'name': [f"u{i}" for i in range(100)]})
+    events = pd.DataFrame({'uid': [i % 100 for i in range(1000)], 'event': range(1000)})
+    vip = pd.DataFrame({'uid': [1, 2], 'name': ['u1', 'u2'], 'tier': ['gold', 'gold']})
+    plan = plan_merge([events, users, vip])
+    assert plan.order[:2] == [1, 2]
+    result = merge_datasets([events, users, vip])
+    assert list(result.columns) == ['uid', 'event', 'name', 'tier']
+    assert len(result) == plan.estimated_rows == 1000
+
+def test_union_drops_duplicates_across_frames():
+    a = pd.DataFrame({'id': [1, 2, 2], 'v': ['x', 'y', 'y']})
+    b = pd.DataFrame({'v': ['y', 'z'], 'id': [2, 3]})
+    result = merge_datasets([a, b])
+    assert result.to_dict('records') == [{'id': 1, 'v': 'x'}, {'id': 2, 'v': 'y'}, {'id': 3, 'v': 'z'}]
+    assert plan_merge([a, b]).estimated_rows == 3
+
+def test_union_rows_are_hashed_once(monkeypatch):
+    a = pd.DataFrame({'id': [1, 2, 2], 'v': ['x', 'y', 'y']})
+    b = pd.DataFrame({'id': [2, 3], 'v': ['y', 'z']})
+    hashed = []
+    original = joins.hash_rows
+    monkeypatch.setattr(joins, "hash_rows", lambda df: hashed.append(len(df)) or original(df))
+    plan = plan_merge([a, b])
+    result = merge_datasets([a, b], plan=plan)
+    assert hashed == [3, 2] and len(result) == plan.estimated_rows == 3
+    merge_datasets([a, b.copy()], plan=plan)  # other frames than planned are hashed again
+    assert hashed == [3, 2, 3, 2]
@@ -0,0 +1,37 @@
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.loader import load_file, load_file_in_chunks, iter_file_chunks
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+
+def test_csv_chunks_match_full_load():
+    path = os.path.join(DATA_DIR, "3_Inventory_Messy_Duplicates.csv")
+    full = load_file(path)
+    chunks = list(iter_file_chunks(path, chunksize=25, sample_rows=10))
+    assert [len(c) for c in chunks] == [25, 25, 10]
+    # Every chunk shares the schema inferred from the sample
+    assert all(c.dtypes.equals(chunks[0].dtypes) for c in chunks)
+    combined = pd.concat(chunks)
+    assert combined.astype(full.dtypes.to_dict()).equals(full)
+
+def test_excel_chunks_projection_and_row_limit():
+    path = os.path.join(DATA_DIR, "2_Sales_Missing_Values.xlsx")
+    chunks = list(iter_file_chunks(path, chunksize=7, usecols=["Product", "Price"], nrows=20))
+    assert [len(c) for c in chunks] == [7, 7, 6]
+    assert list(chunks[0].columns) == ["Product", "Price"]
+    assert list(chunks[-1].index) == list(range(14, 20))
+
+def test_chunk_violating_sample_dtypes_widens(tmp_path):
+    path = tmp_path / "drift.csv"
+    path.write_text("a,notes\n" + "1,\n" * 10 + "2.5,\nnot-a-number,hello\n")
+    chunks = list(iter_file_chunks(str(path), chunksize=4, sample_rows=5))
+    # The last chunk doesn't fit the sample's integers and blanks, so its columns widen to text
+    assert [(str(c['a'].dtype), str(c['notes'].dtype)) for c in chunks] == [('Int64', 'float64')] * 2 + [('str', 'str')]
+    assert list(chunks[-1].index) == [8, 9, 10, 11]
+    # Loading the whole file gives what a plain read_csv gives
+    pd.testing.assert_frame_equal(load_file_in_chunks(str(path), chunksize=4), load_file(str(path)))
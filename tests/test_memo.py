@@ -0,0 +1,74 @@
+import functools
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memo import ResultCache, frame_fingerprint
+from core.processor import handle_missing_values, remove_duplicates
+from core.state import DatasetManager
+
+def _frame():
+    return pd.DataFrame({'a': [1, 1, 2, 3] * 100, 'b': ['x', 'x', 'y', 'z'] * 100})
+
+def test_fingerprint_tracks_content_not_identity():
+    df = _frame()
+    assert frame_fingerprint(df) == frame_fingerprint(_frame())
+    changed = df.copy()
+    changed.loc[5, 'b'] = 'q'
+    fp, changed_fp = frame_fingerprint(df), frame_fingerprint(changed)
+    assert fp != changed_fp
+    assert fp[1][0] == changed_fp[1][0]  # untouched column keeps its digest
+    assert frame_fingerprint(df.astype({'a': 'float64'})) != fp
+
+def test_repeated_operation_returns_cached_result():
+    manager = DatasetManager()
+    manager.add_dataset("a", _frame())
+    manager.add_dataset("copy", _frame())
+    ds = manager.datasets["a"]
+    first, record = manager.compute("remove_duplicates", remove_duplicates, ds)
+    again, cached = manager.compute("remove_duplicates", remove_duplicates, manager.datasets["copy"])
+    assert again is first and cached.name == "remove_duplicates (cached)"
+    assert manager.results.hits == 1
+    # Undo back to the original content and dedup again
+    manager.apply_basic_op(remove_duplicates, op_name="remove_duplicates")
+    ds.undo()
+    assert manager.apply_basic_op(remove_duplicates, op_name="remove_duplicates") and ds.df is first
+
+def test_unnamed_operations_are_never_memoized():
+    def filler(value):
+        def op(df):
+            return df.fillna(value)
+        return op
+    manager = DatasetManager()
+    manager.add_dataset("a", pd.DataFrame({'a': [1.0, None, 3.0]}))
+    ds = manager.datasets["a"]
+    manager.apply_basic_op(filler(5))
+    ds.undo()
+    manager.apply_basic_op(filler(9))
+    assert ds.df['a'].tolist() == [1.0, 9.0, 3.0]
+    ds.undo()
+    manager.apply_basic_op(functools.partial(handle_missing_values, method="fill", fill_value=7))
+    assert ds.df['a'].tolist() == [1.0, 7.0, 3.0] and ds.operations[-1].name == "handle_missing_values"
+    assert len(manager.results) == 0
+
+def test_no_op_returns_input():
+    manager = DatasetManager()
+    manager.add_dataset("a", _frame())
+    ds = manager.datasets["a"]
+    result, _ = manager.compute("handle_missing_values", handle_missing_values, ds, method="zero")
+    assert result is ds.df
+    assert not manager.apply_basic_op(handle_missing_values, method="delete")
+    assert not ds.can_undo
+
+def test_result_cache_evicts_least_recently_used():
+    df = _frame()
+    size = ResultCache._size(df)
+    cache = ResultCache(max_bytes=2 * size)
+    cache.put("a", df)
+    cache.put("b", df.copy())
+    cache.get("a")
+    cache.put("c", df.copy())
+    assert cache.get("b") is None and cache.get("a") is df and cache.nbytes <= 2 * size
@@ -0,0 +1,42 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memory import compact_dataframe
+from core.state import DatasetManager
+from core.processor import handle_missing_values
+
+def test_compaction_is_lossless_and_smaller():
+    df = pd.DataFrame({
+        'Department': ['HR', 'Sales', 'HR', 'Sales', None, 'HR'] * 10,
+        'Salary': np.arange(60, dtype=np.int64) * 1000,
+        'Score': np.array([0.5, 1.25, np.nan] * 20),
+        'Ratio': np.arange(60) / 7,
+    })
+    compact, report = compact_dataframe(df)
+    assert isinstance(compact['Department'].dtype, pd.CategoricalDtype)
+    assert compact['Salary'].dtype == np.int32
+    assert compact['Score'].dtype == np.float32
+    assert compact['Ratio'].dtype == np.float64  # float32 would lose precision
+    assert compact.astype(df.dtypes.to_dict()).equals(df)
+    assert report['bytes_after'].sum() < report['bytes_before'].sum()
+
+def test_manager_keeps_memory_report_and_fill_still_works():
+    manager = DatasetManager(compact=True)
+    manager.add_dataset("d", pd.DataFrame({'Department': ['HR', 'Sales', None, 'HR'] * 5, 'Salary': range(20)}))
+    ds = manager.datasets["d"]
+    assert list(ds.memory_report.index) == list(ds.df.columns)
+    filled = handle_missing_values(ds.df, method="fill", fill_value="Unknown")
+    assert filled['Department'].isna().sum() == 0
+
+def test_frame_compacted_ahead_of_time_keeps_its_report():
+    manager = DatasetManager()
+    df, report, operations = manager.prepare_frame(pd.DataFrame({'Salary': range(20)}), compact=True)
+    manager.add_dataset("d", df, compact=False, operations=operations, memory_report=report)
+    ds = manager.datasets["d"]
+    assert ds.df['Salary'].dtype == np.int8 and ds.memory_report is report
+    assert [r.name for r in ds.operations] == ["compact_dataframe"]
@@ -0,0 +1,63 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.batch import Recipe
+from core.pipeline import iter_pipeline
+from core.plan import LazyPlan
+from core.processor import handle_missing_values
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'store': ['a', 'a', 'b', 'b', 'b', 'a'],
+        'qty': pd.array([1, None, 4, None, 6, 2], dtype='Int64'),
+        'price': np.array([1.0, np.nan, 3.0, np.nan, 5.0, 2.0], dtype='float32'),
+        'city': pd.Categorical(['x', None, 'y', 'y', None, 'x']),
+        'note': ['p', None, 'q', 'q', None, 'r'],
+    }, index=[0, 0, 1, 1, 2, 2])  # fills line up by position, not label
+
+def test_per_column_strategies_keep_dtypes(df):
+    result = handle_missing_values(df, strategies={
+        'qty': 'mean',
+        'price': {'method': 'median', 'by': 'store'},
+        'city': {'method': 'mode', 'by': 'store'},
+        'note': {'method': 'constant', 'value': 7},
+    })
+    assert result['qty'].tolist() == [1, 3, 4, 3, 6, 2]  # mean 3.25, rounded for an integer column
+    assert result['price'].tolist() == [1.0, 1.5, 3.0, 4.0, 5.0, 2.0]
+    assert result['city'].tolist() == ['x', 'x', 'y', 'y', 'y', 'x']
+    assert result['note'].tolist() == ['p', '7', 'q', 'q', '7', 'r']
+    assert result.dtypes.equals(df.dtypes) and result.index.equals(df.index)
+    dropped = handle_missing_values(df, strategies={'price': 'drop', 'note': 'ffill', 'qty': 'leave'})
+    assert dropped['note'].tolist() == ['p', 'q', 'q', 'r'] and dropped['qty'].isna().sum() == 0
+
+def test_fill_value_is_converted_per_column(df):
+    filled = handle_missing_values(df, method="fill", fill_value="5")
+    assert filled['price'].dtype == np.float32 and filled['price'].isna().sum() == 0
+    assert filled['qty'].tolist() == [1, 5, 4, 5, 6, 2]
+    text = handle_missing_values(df, method="fill", fill_value="n/a")
+    assert text['qty'].dtype == 'Int64' and text['qty'].isna().sum() == 2  # numeric columns keep their gaps
+    assert (text['note'] == 'n/a').sum() == 2
+    with pytest.raises(ValueError):
+        handle_missing_values(df, strategies={'qty': {'method': 'constant', 'value': 'n/a'}})
+    with pytest.raises(ValueError):
+        handle_missing_values(df, strategies={'note': 'median'})
+
+def test_only_row_strategies_stream(df):
+    df = df.reset_index(drop=True)
+    row_wise = {'strategies': {'note': {'method': 'constant', 'value': '-'}, 'price': 'drop'}}
+    chunks = iter_pipeline([df.iloc[:3], df.iloc[3:]], [("handle_missing_values", row_wise)])
+    pd.testing.assert_frame_equal(pd.concat(chunks), handle_missing_values(df, **row_wise))
+    whole = {'strategies': {'qty': 'median'}}
+    with pytest.raises(ValueError):
+        list(iter_pipeline([df], [("handle_missing_values", whole)]))
+    with pytest.raises(ValueError):
+        Recipe([{"handle_missing_values": whole}])
+    plan = LazyPlan(df).then("handle_missing_values", **whole)
+    pd.testing.assert_frame_equal(pd.concat(plan.iter_chunks(chunksize=2)), handle_missing_values(df, **whole))
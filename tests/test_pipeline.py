@@ -0,0 +1,39 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.hashindex as hashindex
+from core.pipeline import iter_pipeline, clean_file
+from core.processor import remove_duplicates, handle_missing_values
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+
+def test_dedup_across_chunks():
+    df = pd.DataFrame({'a': [1, 2, 1, 3, 2, 4, 1], 'b': ['x', 'y', 'x', 'z', 'y', 'w', 'q']})
+    chunks = [df.iloc[i:i + 2] for i in range(0, len(df), 2)]
+    result = pd.concat(iter_pipeline(chunks, ["remove_duplicates"]))
+    assert result.equals(remove_duplicates(df))
+
+def test_dedup_hash_collisions_keep_distinct_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(hashindex, "hash_rows", lambda df: np.zeros(len(df), dtype=np.uint64))
+    df = pd.DataFrame({'a': [1, 2, 1, 3, 2], 'b': ['x', 'y', 'x', 'z', 'y']})
+    chunks = [df.iloc[i:i + 2] for i in range(0, len(df), 2)]
+    assert pd.concat(iter_pipeline(chunks, ["remove_duplicates"])).equals(remove_duplicates(df))
+    spooled = pd.concat(iter_pipeline(chunks, ["remove_duplicates"], spool_dir=str(tmp_path)))
+    assert spooled.equals(remove_duplicates(df))
+
+def test_clean_file_matches_in_memory(tmp_path):
+    path = os.path.join(DATA_DIR, "3_Inventory_Messy_Duplicates.csv")
+    out = str(tmp_path / "out.csv")
+    steps = ["remove_duplicates", ("handle_missing_values", {"method": "zero"})]
+    summary = clean_file(path, out, steps, chunksize=8)
+
+    expected = handle_missing_values(remove_duplicates(pd.read_csv(path)), method="zero")
+    result = pd.read_csv(out)
+    assert summary["rows_in"] == 60
+    assert summary["rows_out"] == len(expected)
+    assert result.equals(expected.reset_index(drop=True))
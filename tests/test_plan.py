@@ -0,0 +1,52 @@
+import sys
+import os
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plan import LazyPlan, fuse_steps
+from core.processor import remove_duplicates, standardize_column
+from core.state import DatasetManager
+
+def _frame():
+    return pd.DataFrame({'name': [' Ann ', 'bob', ' Ann ', None, 'CAROL'] * 400,
+                         'qty': [1, 2, 1, 3, None] * 400})
+
+def test_fuse_steps_merges_column_transforms():
+    steps = [("standardize_column", {"column": "name", "method": "strip"}),
+             ("standardize_column", {"column": "name", "method": "title"}),
+             ("remove_duplicates", {}),
+             ("standardize_column", {"column": "name", "method": "lowercase"})]
+    fused = fuse_steps(steps)
+    assert [name for name, _ in fused] == ["apply_column_transforms", "remove_duplicates", "apply_column_transforms"]
+    assert fused[0][1]["plan"] == [("name", "strip", {}), ("name", "title", {})]
+
+def test_lazy_plan_matches_eager():
+    df = _frame()
+    plan = (LazyPlan(df).then("standardize_column", column="name", method="strip")
+            .then("remove_duplicates").then("handle_missing_values", method="zero"))
+    eager = remove_duplicates(standardize_column(df, "name", "strip")).fillna({"name": "0", "qty": 0})  # zero keeps text as text
+    assert plan.collect().equals(eager)
+    assert pd.concat(plan.iter_chunks(chunksize=300)).equals(eager)
+    assert plan.head(2).equals(eager.head(2))
+
+def test_lazy_dataset_chains_until_accessed():
+    manager = DatasetManager()
+    manager.add_dataset("src", _frame())
+    manager.add_lazy_dataset("a", "src", "remove_duplicates")
+    b = manager.add_lazy_dataset("b", "a", "standardize_column", column="name", method="uppercase")
+    assert b.is_lazy and not b.can_undo
+    assert len(b.plan.steps) == 2
+    assert list(b.head(2)['name']) == [' ANN ', 'BOB']
+    assert len(b.df) == 4 and not b.is_lazy
+
+def test_lazy_dataset_counts_its_source_until_materialized():
+    manager = DatasetManager()
+    manager.add_dataset("src", _frame())
+    src = manager.datasets["src"]
+    lazy = manager.add_lazy_dataset("a", "src", "remove_duplicates")
+    pending = lazy.nbytes
+    assert pending >= src.nbytes
+    lazy.df
+    assert lazy.plan is None and lazy.nbytes < pending
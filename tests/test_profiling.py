@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.profiling import Profiler
+from core.processor import remove_duplicates, merge_datasets
+from core.state import DatasetManager
+
+def _frame():
+    return pd.DataFrame({'a': [1, 1, 2, 3] * 250, 'b': ['x', 'x', 'y', 'z'] * 250})
+
+def test_call_records_shapes_and_times():
+    profiler = Profiler(trace_memory=True)
+    result, record = profiler.call("alloc", lambda df, n: np.ones(n), _frame(), n=1_000_000)
+    assert len(result) == 1_000_000
+    assert (record.rows_in, record.cols_in) == (1000, 2) and record.rows_out is None
+    assert record.params == {"n": 1_000_000}
+    assert record.wall >= 0 and record.cpu >= 0
+    assert record.memory_source == "tracemalloc" and record.peak_bytes >= 8_000_000
+    assert list(profiler.records) == [record]
+
+def test_manager_attaches_records_to_datasets():
+    manager = DatasetManager()
+    manager.add_dataset("a", _frame())
+    manager.add_dataset("b", _frame())
+    manager.apply_basic_op(remove_duplicates)
+    record = manager.datasets["a"].operations[-1]
+    assert record.name == "remove_duplicates" and (record.rows_in, record.rows_out) == (1000, 3)
+    manager.apply_cross_file_op(["a", "b"], merge_datasets, "merged")
+    record = manager.datasets["merged"].operations[-1]
+    assert record.name == "merge_datasets" and record.rows_in == 1003 and record.bytes_out > 0
+
+def test_chrome_trace_export(tmp_path):
+    profiler = Profiler()
+    profiler.call("remove_duplicates", remove_duplicates, _frame())
+    profiler.to_chrome_trace(str(tmp_path / "trace.json"))
+    profiler.to_json(str(tmp_path / "ops.json"))
+    events = json.load(open(tmp_path / "trace.json"))["traceEvents"]
+    assert [(e["name"], e["ph"]) for e in events] == [("remove_duplicates", "X")]
+    assert events[0]["args"]["rows_out"] == 3
+    assert json.load(open(tmp_path / "ops.json"))[0]["rows_in"] == 1000
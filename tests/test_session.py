@@ -0,0 +1,103 @@
+import json
+import pickle
+import sys
+import os
+import pandas as pd
+import pytest
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.processor import standardize_column
+from core.session import MANIFEST_FILE, open_session, save_session, session_datasets
+from core.state import DatasetManager
+
+def dataset_dirs(path):
+    return sorted(name for name in os.listdir(path) if name != MANIFEST_FILE)
+
+def test_session_round_trip_keeps_history(tmp_path, make_df):
+    manager = DatasetManager(spill_dir=str(tmp_path / "spill"))
+    manager.add_dataset("a", make_df(1000))
+    manager.add_dataset("b", make_df(3), temporary=True)
+    ds = manager.datasets["a"]
+    original = ds.df
+    ds.df = standardize_column(ds.df, 'name', 'strip')
+    ds.save_state()
+    edited = ds.df
+    manager.active_dataset_name = "b"
+    assert save_session(manager, str(tmp_path / "session")) == ["a", "b"]
+    manager.close()
+
+    restored = DatasetManager()
+    assert open_session(restored, str(tmp_path / "session")) == ["a", "b"]
+    assert restored.active_dataset_name == "b" and restored.datasets["b"].is_temporary
+    ds = restored.datasets["a"]
+    assert ds.is_spilled and list(ds.columns) == ['name', 'score', 1]
+    pd.testing.assert_frame_equal(ds.df, edited)
+    assert ds.undo()
+    pd.testing.assert_frame_equal(ds.df, original)
+    restored.remove_dataset("a")
+    restored.close()
+    assert len(dataset_dirs(tmp_path / "session")) == 2  # session files belong to the session
+
+def test_saving_again_writes_only_changed_datasets(tmp_path, make_df):
+    path = str(tmp_path / "session")
+    manager = DatasetManager()
+    manager.add_dataset("a", make_df(1000))
+    manager.add_dataset("b", make_df(2))
+    save_session(manager, path)
+    before = dataset_dirs(path)
+    manager.datasets["b"].df = manager.datasets["b"].df.head(3)
+    save_session(manager, path)
+    after = dataset_dirs(path)
+    assert len(after) == 2 and len(set(before) & set(after)) == 1  # "a" kept its files, "b"'s old ones are gone
+    manager.remove_dataset("a")
+    assert session_datasets(path) == ["a", "b"] and session_datasets(str(tmp_path / "none")) == []
+    save_session(manager, path)
+    assert len(dataset_dirs(path)) == 1 and session_datasets(path) == ["b"]
+
+    restored = DatasetManager()
+    open_session(restored, path)
+    assert list(restored.datasets) == ["b"] and len(restored.datasets["b"].df) == 3
+
+def test_lazy_dataset_is_computed_on_save(tmp_path, make_df):
+    manager = DatasetManager()
+    manager.add_dataset("a", make_df(5))
+    manager.add_lazy_dataset("a_clean", "a", "standardize_column", column='name', method='strip')
+    save_session(manager, str(tmp_path))
+    restored = DatasetManager()
+    open_session(restored, str(tmp_path))
+    pd.testing.assert_frame_equal(restored.datasets["a_clean"].df, standardize_column(make_df(5), 'name', 'strip'))
+
+def test_session_files_are_never_unpickled(tmp_path, monkeypatch):
+    manager = DatasetManager(compact=True)
+    df = pd.DataFrame({'name': ['a', 'b', 'a', 'c'], ('x', 1): [1.0, 2.0, 1.0, None]})
+    manager.add_dataset("a", df)
+    ds = manager.datasets["a"]
+    states = [ds.df]
+    for op in (lambda df: df.iloc[[3, 0]], lambda df: df.set_axis(['p', 'q'])):  # row selection, then a new index
+        ds.df = op(ds.df)
+        ds.save_state()
+        states.append(ds.df)
+    save_session(manager, str(tmp_path))
+    assert os.path.exists(tmp_path / "session.json")
+
+    monkeypatch.setattr(pickle, "load", lambda *args: pytest.fail("unpickled a session file"))
+    restored = DatasetManager()
+    open_session(restored, str(tmp_path))
+    ds = restored.datasets["a"]
+    pd.testing.assert_frame_equal(ds.memory_report, manager.datasets["a"].memory_report)
+    assert [r.name for r in ds.operations] == ["compact_dataframe"]
+    for expected in reversed(states):
+        pd.testing.assert_frame_equal(ds.df, expected)
+        ds.undo()
+
+    # A session pointing at a pickle file is refused instead of loading it
+    directory = dataset_dirs(tmp_path)[0]
+    metadata = json.loads((tmp_path / directory / "spill.json").read_text())
+    metadata["frame"]["file"] = "frame.pkl"
+    (tmp_path / directory / "spill.json").write_text(json.dumps(metadata))
+    restored = DatasetManager()
+    open_session(restored, str(tmp_path))
+    with pytest.raises(ValueError):
+        restored.datasets["a"].df
@@ -0,0 +1,89 @@
+import gc
+import sys
+import threading
+import os
+import weakref
+import pandas as pd
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.processor import remove_duplicates, standardize_column
+from core.state import Dataset, DatasetManager
+
+def test_spilled_dataset_restores_frame_and_history(tmp_path, make_df):
+    ds = Dataset("a", make_df(5))
+    states = [ds.df]
+    for op in (lambda df: standardize_column(df, 'name', 'strip'), lambda df: df.iloc[::2], remove_duplicates):
+        ds.df = op(ds.df)
+        ds.save_state()
+        states.append(ds.df)
+    version = ds.version
+    assert ds.spill(str(tmp_path / "a")) and ds.is_spilled and ds.nbytes == 0
+    assert list(ds.columns) == ['name', 'score', 1] and ds.can_undo
+    pd.testing.assert_frame_equal(ds.df, states[-1])
+    assert ds.version == version and not ds.is_spilled
+    for expected in reversed(states[:-1]):
+        assert ds.undo()
+        pd.testing.assert_frame_equal(ds.df, expected)
+
+def test_manager_spills_least_recently_used(tmp_path, make_df):
+    manager = DatasetManager(memory_budget=350_000, spill_dir=str(tmp_path))
+    manager.add_dataset("a", make_df(1000).assign(tag="a"))
+    manager.add_dataset("b", make_df(1000).assign(tag="b"))
+    manager.active_dataset_name = "b"
+    manager.add_dataset("c", make_df(1000).assign(tag="c"))
+    assert manager.datasets["a"].is_spilled and not manager.datasets["c"].is_spilled
+    assert sum(manager.memory_usage().values()) <= 350_000
+    # Touching a spilled dataset brings it back and pushes out the least recently used inactive one
+    assert (manager.datasets["a"].df["tag"] == "a").all()
+    assert manager.datasets["c"].is_spilled and not manager.datasets["b"].is_spilled
+    manager.remove_dataset("c")
+    manager.close()
+    assert os.listdir(tmp_path) == []
+
+def test_spilling_evicts_cached_results_first(tmp_path, make_df):
+    manager = DatasetManager(memory_budget=350_000, spill_dir=str(tmp_path))
+    manager.add_dataset("a", make_df(1000).assign(tag="a"))
+    result, _ = manager.compute("standardize_column", standardize_column, manager.datasets["a"],
+                                column='name', method='strip')
+    frame = weakref.ref(manager.datasets["a"].df)
+    cached = weakref.ref(result)
+    del result
+    assert manager.results.nbytes > 0
+    manager.add_dataset("b", make_df(1000).assign(tag="b"))
+    manager.active_dataset_name = "b"
+    manager.add_dataset("c", make_df(1000).assign(tag="c"))
+    assert manager.datasets["a"].is_spilled and manager.results.nbytes == 0
+    gc.collect()
+    assert frame() is None and cached() is None  # nothing spilled stays pinned by the cache
+    manager.close()
+
+def test_spill_keeps_row_index(tmp_path, make_df):
+    ds = Dataset("a", remove_duplicates(make_df(1000)))
+    ds.mark_unique()
+    size = len(ds.row_index)
+    assert ds.spill(str(tmp_path / "a"))
+    assert len(ds.row_index) == size and len(os.listdir(tmp_path / "a")) == 2
+
+def test_budget_runner_defers_spilling(tmp_path, make_df):
+    manager = DatasetManager(memory_budget=350_000, spill_dir=str(tmp_path))
+    requests = []
+    manager.budget_runner = requests.append
+    for name in "abc":
+        manager.add_dataset(name, make_df(1000).assign(tag=name))
+    assert not any(ds.is_spilled for ds in manager.datasets.values()) and len(requests) == 3
+    assert manager.enforce_budget(keep=requests[-1]) == ["b"]  # "a" is active
+    manager.close()
+
+def test_replacing_the_frame_waits_for_a_running_spill(make_df):
+    ds = Dataset("a", make_df(5))
+    new = make_df(6)
+    ds._lock.acquire()  # as Dataset.spill does while writing
+    setter = threading.Thread(target=setattr, args=(ds, "df", new))
+    setter.start()
+    setter.join(0.2)
+    assert setter.is_alive() and ds.version == 1
+    ds._lock.release()
+    setter.join()
+    assert ds.df is new and ds.version == 2
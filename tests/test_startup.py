@@ -0,0 +1,15 @@
+import sys
+import os
+
+# Add the project root to the path so we can import from benchmark
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import measure_startup
+
+def test_ui_import_does_not_load_data_stack():
+    _, loaded = measure_startup("ui.tkinter_ui", repeat=1)
+    assert loaded == []
+
+def test_jobs_and_utils_stay_lightweight():
+    _, loaded = measure_startup("core.jobs, core.utils", repeat=1)
+    assert loaded == []
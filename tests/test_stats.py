@@ -0,0 +1,66 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.stats as stats
+from core.detection import suggest_column_type
+from core.processor import handle_missing_values, standardize_column
+from core.state import Dataset
+from core.stats import column_stats, frame_column_stats, stream_column_stats
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'name': [' Ann', 'bob ', None, 'Cy'] * 100,
+        'score': [1.5, np.nan, 1.5, 4.0] * 100,
+        'city': pd.Categorical(['b', 'a', 'b', None] * 100),
+        'note': pd.Series([None] * 400, dtype=object),
+    })
+
+def test_column_stats_in_one_pass(df):
+    result = frame_column_stats(df)
+    assert result.loc['name', 'nulls'] == 100 and result.loc['name', 'distinct'] == 3
+    assert (result.loc['score', 'min'], result.loc['score', 'max'], result.loc['score', 'count']) == (1.5, 4.0, 300)
+    assert (result.loc['city', 'min'], result.loc['city', 'max']) == ('a', 'b')
+    assert result.loc['note', 'count'] == 0 and result.loc['note', 'min'] is None
+    assert result['bytes'].tolist() == df.memory_usage(deep=True, index=False).tolist()
+    streamed = stream_column_stats(df.iloc[i:i + 150] for i in range(0, len(df), 150))
+    pd.testing.assert_frame_equal(streamed.drop(columns='bytes'), result.drop(columns='bytes'))
+
+def test_only_changed_columns_are_rescanned(monkeypatch, df):
+    ds = Dataset("a", df)
+    ds.stats()
+    scanned = []
+    monkeypatch.setattr(stats, "column_stats", lambda col_data: scanned.append(col_data.name) or column_stats(col_data))
+    ds.df = standardize_column(ds.df, 'name', 'strip')
+    assert ds.column_stats('name')['min'] == 'Ann'
+    ds.stats()
+    ds.df = handle_missing_values(ds.df, method="zero")
+    assert ds.stats()['nulls'].sum() == 0
+    assert scanned == ['name'] + list(ds.columns)  # then every column had nulls to fill
+
+def test_missing_values_and_detection_read_the_cache(df):
+    df = df.assign(id=range(400))
+    filled = handle_missing_values(df, method="fill", fill_value="x")
+    assert filled.isna().sum().to_dict() == {'name': 0, 'score': 100, 'city': 0, 'note': 0, 'id': 0}  # text doesn't fit 'score'
+    assert np.shares_memory(filled['id'].to_numpy(), df['id'].to_numpy())  # columns without nulls are left alone
+    ds = Dataset("a", df)
+    assert ds.missing_columns() == ['name', 'score', 'city', 'note']
+    # Columns the dataset's statistics show are complete aren't scanned or touched
+    clean = df[['id']]
+    assert handle_missing_values(clean, missing=Dataset("b", clean).missing_columns()) is clean
+    assert len(handle_missing_values(df, missing=ds.missing_columns())) == 0
+    assert suggest_column_type(ds, 'note') == {"type": "empty", "confidence": 1.0, "sampled": 0}
+
+def test_statistics_never_outlive_the_frame_they_describe():
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0]})
+    frame_column_stats(df)
+    Dataset("a", df).stats()
+    df.loc[0, 'a'] = np.nan  # changed in place behind the statistics' back
+    assert len(handle_missing_values(df)) == 2
+    assert handle_missing_values(df, strategies={'a': 'mean'})['a'].tolist() == [2.5, 2.0, 3.0]
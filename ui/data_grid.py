@@ -0,0 +1,122 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+import pandas as pd
+
+
+class GridModel:
+    """Row-window access to a DataFrame with cached sort orders"""
+
+    def __init__(self, df):
+        self.df = df
+        self.order = None  # row positions in display order, None for natural order
+        self.sort_column = None
+        self.ascending = True
+        self._sort_cache = {}  # (column, ascending) -> positions
+
+    def __len__(self):
+        return len(self.df)
+
+    def sort_by(self, column, ascending=True):
+        key = (column, ascending)
+        if key not in self._sort_cache:
+            col_data = self.df[column].reset_index(drop=True)
+            try:
+                ordered = col_data.sort_values(ascending=ascending, kind="stable", na_position="last")
+            except TypeError:
+                # Mixed types in an object column, fall back to text order
+                ordered = col_data.sort_values(ascending=ascending, kind="stable", na_position="last",
+                                               key=lambda s: s.astype(str))
+            self._sort_cache[key] = ordered.index.to_numpy()
+        self.order = self._sort_cache[key]
+        self.sort_column = column
+        self.ascending = ascending
+
+    def window(self, start, count):
+        """Return (index labels, formatted rows) for `count` display rows from `start`"""
+        stop = min(start + count, len(self.df))
+        positions = np.arange(start, stop) if self.order is None else self.order[start:stop]
+        page = self.df.iloc[positions]
+        rows = [["" if pd.isnull(v) else str(v) for v in row] for row in page.itertuples(index=False, name=None)]
+        return [str(label) for label in page.index], rows
+
+
+class DataGrid(ttk.Frame):
+    """Virtualized table that only formats the rows currently on screen"""
+
+    ROW_HEIGHT = 20
+
+    def __init__(self, parent, df, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.model = GridModel(df)
+        self.offset = 0
+        self.visible_rows = 20
+        self.columns = [str(c) for c in df.columns]
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="tree headings", selectmode="browse")
+        self.tree.column("#0", width=80, stretch=False)
+        for i, col in enumerate(self.columns):
+            self.tree.heading(col, text=col, command=lambda c=df.columns[i]: self.toggle_sort(c))
+            self.tree.column(col, width=120, stretch=False)
+
+        self.vbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        hbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        hbar.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.offset - self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.offset + self.visible_rows))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self.model)))
+        self.render()
+
+    def on_resize(self, event):
+        rows = max(1, event.height // self.ROW_HEIGHT - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def on_mousewheel(self, event):
+        self.scroll_to(self.offset - 3 if event.delta > 0 else self.offset + 3)
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(value) * len(self.model)))
+        elif action == tk.SCROLL:
+            step = self.visible_rows if unit == tk.PAGES else 1
+            self.scroll_to(self.offset + int(value) * step)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.model) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def toggle_sort(self, column):
+        ascending = not (self.model.sort_column == column and self.model.ascending)
+        self.model.sort_by(column, ascending)
+        for i, col in enumerate(self.model.df.columns):
+            arrow = (" ▲" if ascending else " ▼") if col == column else ""
+            self.tree.heading(self.columns[i], text=self.columns[i] + arrow)
+        self.offset = 0
+        self.render()
+
+    def render(self):
+        """Replace the Treeview items with the current row window"""
+        labels, rows = self.model.window(self.offset, self.visible_rows)
+        self.tree.delete(*self.tree.get_children())
+        for label, values in zip(labels, rows):
+            self.tree.insert("", tk.END, text=label, values=values)
+        total = len(self.model)
+        if total:
+            self.vbar.set(self.offset / total, min((self.offset + self.visible_rows) / total, 1.0))
+        else:
+            self.vbar.set(0, 1)
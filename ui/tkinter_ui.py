@@ -1,20 +1,71 @@
+import os
+import threading
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox, simpledialog, Menu
-from core.state import DatasetManager
-from core.loader import load_file
-from core.processor import remove_duplicates, handle_missing_values, standardize_data, standardize_column, merge_datasets
+from core.jobs import JobExecutor
 from core.utils import generate_temp_name
 
+# pandas and the modules built on it are imported inside the methods that need
+# them, so the window appears before the data stack has loaded
+
+LAZY_PREVIEW_ROWS = 1000
+SESSION_JOB = ("session",)  # job key of session saves; never a dataset name
+BUDGET_JOB = ("budget",)  # job key of memory budget checks
+
 class DataProcessingApp:
-    def __init__(self, root):
+    def __init__(self, root, warm_up=True):
         self.root = root
         self.root.title("Data Processing App")
         self.root.geometry("700x600")
         self.root.resizable(True, True)
-        self.manager = DatasetManager()
+        self._manager = None  # DatasetManager, see the manager property
+        self._file_cache = None  # FileCache, see the file_cache property
+        self._init_lock = threading.Lock()
         self.selection_order = []  # Track order of dataset selection
+        self.listbox_names = []  # dataset name of each listbox row; rows also show memory status
+        self.jobs = JobExecutor()  # Runs long operations off the Tk main thread
+        self.session_path = None  # directory of the last saved or opened session, offered by the dialogs
+        self._budget_due = False  # a memory budget check was requested, see schedule_budget
+        self._budget_keep = None  # dataset that check keeps in memory
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(100, self.poll_jobs)
+        if warm_up:
+            # Load the data stack once the window has been drawn
+            self.root.after(200, self.warm_up)
+
+    @property
+    def manager(self):
+        """DatasetManager, created on first use because it loads pandas"""
+        if self._manager is None:
+            with self._init_lock:
+                if self._manager is None:
+                    from core.spill import default_memory_budget
+                    from core.state import DatasetManager
+                    manager = DatasetManager(memory_budget=default_memory_budget())
+                    manager.budget_runner = self.schedule_budget
+                    self._manager = manager
+        return self._manager
+
+    @property
+    def file_cache(self):
+        """Parsed copies of uploaded files, reused on re-open"""
+        if self._file_cache is None:
+            with self._init_lock:
+                if self._file_cache is None:
+                    from core.cache import FileCache
+                    self._file_cache = FileCache()
+        return self._file_cache
+
+    def warm_up(self):
+        """Import pandas and the core modules on a background thread so the first operation starts fast"""
+        def load():
+            import core.processor, core.loader, core.ingest, core.detection, core.pipeline  # noqa: F401
+            import utils.exporter, ui.data_grid  # noqa: F401
+            self.manager
+            self.file_cache
+        threading.Thread(target=load, name="warm-up", daemon=True).start()
 
     def create_widgets(self):
         # Main container
@@ -29,6 +80,12 @@ class DataProcessingApp:
         upload_frame = ttk.LabelFrame(main_frame, text="File Management", padding="10")
         upload_frame.pack(fill=tk.X, pady=(0, 10))
         ttk.Button(upload_frame, text="📁 Upload Files", command=self.upload_files).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(upload_frame, text="💾 Save Session", command=self.save_session).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(upload_frame, text="📂 Open Session", command=self.open_session).pack(side=tk.LEFT, padx=(0, 10))
+        self.compact_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(upload_frame, text="Compact memory", variable=self.compact_var).pack(side=tk.LEFT)
+        self.lazy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(upload_frame, text="Lazy operations", variable=self.lazy_var).pack(side=tk.LEFT, padx=(10, 0))
 
         # Dataset selection
         select_frame = ttk.LabelFrame(main_frame, text="Dataset Selection", padding="10")
@@ -47,6 +104,8 @@ class DataProcessingApp:
         clean_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
         self.remove_dup_btn = ttk.Button(clean_frame, text="🗑️ Remove Duplicates", command=self.remove_duplicates, state=tk.DISABLED)
         self.remove_dup_btn.pack(fill=tk.X, pady=2)
+        self.near_dup_btn = ttk.Button(clean_frame, text="🔍 Find Near Duplicates", command=self.find_near_duplicates, state=tk.DISABLED)
+        self.near_dup_btn.pack(fill=tk.X, pady=2)
         self.handle_missing_btn = ttk.Button(clean_frame, text="🔧 Handle Missing Values", command=self.handle_missing_values, state=tk.DISABLED)
         self.handle_missing_btn.pack(fill=tk.X, pady=2)
         self.standardize_btn = ttk.Button(clean_frame, text="✨ Standardize Data", command=self.standardize_data, state=tk.DISABLED)
@@ -74,25 +133,270 @@ class DataProcessingApp:
         self.export_btn = ttk.Button(view_frame, text="💾 Export Dataset", command=self.export_dataset, state=tk.DISABLED)
         self.export_btn.pack(fill=tk.X, pady=2)
 
+        # Background job status
+        status_frame = ttk.Frame(main_frame)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM)
+        self.status_var = tk.StringVar(value="Ready")
+        ttk.Label(status_frame, textvariable=self.status_var).pack(side=tk.LEFT)
+        self.cancel_btn = ttk.Button(status_frame, text="✖ Cancel", command=self.cancel_jobs, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT)
+        self.progress = ttk.Progressbar(status_frame, length=200, mode="determinate")
+        self.progress.pack(side=tk.RIGHT, padx=10)
+
+    # ---------------- Background jobs ----------------
+    def run_job(self, description, func, *args, keys=(), on_done=None, on_partial=None):
+        """Run func(job, *args) off the UI thread; on_done(result) and on_partial(item) run back on the UI thread"""
+        def done(result):
+            self.status_var.set(f"Finished: {description}")
+            if on_done:
+                on_done(result)
+            self.update_listbox_labels()  # jobs load and spill datasets
+
+        def failed(error):
+            self.status_var.set(f"Failed: {description}")
+            messagebox.showerror("Error", str(error))
+
+        def cancelled():
+            self.status_var.set(f"Cancelled: {description}")
+
+        return self.jobs.submit(func, *args, keys=keys, description=description,
+                                on_done=done, on_error=failed, on_cancel=cancelled, on_partial=on_partial)
+
+    def schedule_budget(self, keep):
+        """Budget runner of the manager: spills run as a job started from poll_jobs, never on the Tk thread.
+
+        Requests come from any thread (datasets load inside jobs), so they are only recorded here.
+        """
+        self._budget_keep = keep
+        self._budget_due = True
+
+    def poll_jobs(self):
+        self.jobs.poll()
+        if self._budget_due and not any(BUDGET_JOB in job.keys for job in self.jobs.running + self.jobs.waiting):
+            self._budget_due = False
+            keep = self._budget_keep
+            self.run_job("Freeing memory", lambda job: self.manager.enforce_budget(keep=keep), keys=BUDGET_JOB)
+        if self.jobs.running:
+            job = self.jobs.running[0]
+            queued = len(self.jobs.waiting) + len(self.jobs.running) - 1
+            self.status_var.set(f"{job.description}..." + (f" ({queued} more queued)" if queued else ""))
+            fraction = job.fraction
+            if fraction is None:
+                if str(self.progress.cget("mode")) != "indeterminate":
+                    self.progress.config(mode="indeterminate")
+                    self.progress.start(10)
+            else:
+                self.progress.stop()
+                self.progress.config(mode="determinate", value=fraction * 100)
+            self.cancel_btn.config(state=tk.NORMAL)
+        else:
+            self.progress.stop()
+            self.progress.config(mode="determinate", value=0)
+            self.cancel_btn.config(state=tk.DISABLED)
+        self.root.after(100, self.poll_jobs)
+
+    def cancel_jobs(self):
+        self.jobs.cancel_all()
+
+    def on_close(self):
+        if any(SESSION_JOB in job.keys for job in self.jobs.running + self.jobs.waiting):
+            # Spill files a save may still be copying are deleted below
+            messagebox.showinfo("Saving Session", "Please wait until the session has been saved.")
+            return
+        self.jobs.shutdown()
+        if self._manager is not None:
+            self._manager.close()  # delete spill files
+        self.root.destroy()
+
+    def run_operation(self, ds, step, base, description, message, with_progress=False, func=None, unique=False,
+                      **kwargs):
+        """Run a processor step on a dataset as a background job, or record it as a plan in lazy mode.
+
+        `func` runs operations that are not pipeline STEPS; those always run eagerly.
+        With `unique` the result is recorded as having no duplicate rows.
+        """
+        from core.pipeline import STEPS
+        if func is None and self.lazy_var.get():
+            new_name = generate_temp_name(base=base)
+            self.manager.add_lazy_dataset(new_name, ds.name, step, **kwargs)
+            self.select_dataset(new_name)
+            messagebox.showinfo("Done", f"{message} New lazy dataset '{new_name}' created; it runs when previewed or exported.")
+            return
+
+        def done(result):
+            new_df, record = result
+            if new_df is ds.df:
+                ds.log(record)
+                if unique and not ds.is_unique:
+                    ds.mark_unique()
+                messagebox.showinfo("No Changes", f"Nothing to change in '{ds.name}'; no new dataset created.")
+                return
+            existing = self.manager.find_dataset(new_df)
+            if existing:
+                # Memoized result of a repeated operation; reuse the dataset holding it
+                self.select_dataset(existing)
+                messagebox.showinfo("Done", f"{message} Same result as existing dataset '{existing}', selected it.")
+                return
+            new_name = self.add_result_dataset(new_df, base=base, operations=ds.operations + [record])
+            if unique:
+                self.manager.datasets[new_name].mark_unique()
+            messagebox.showinfo("Done", f"{message} New dataset '{new_name}' created.")
+
+        def work(job, ds):
+            op = func or STEPS[step]
+            if with_progress:
+                return self.manager.compute(step, op, ds, params=kwargs, progress=job.report, **kwargs)
+            return self.manager.compute(step, op, ds, **kwargs)
+
+        self.run_job(description, work, ds, keys=(ds.name,), on_done=done)
+
+    def add_result_dataset(self, new_df, base, operations=None):
+        """Register an operation result as a temporary dataset and select it"""
+        new_name = generate_temp_name(base=base)
+        self.manager.add_dataset(new_name, new_df, temporary=True, operations=operations)
+        self.select_dataset(new_name)
+        return new_name
+
+    def select_dataset(self, new_name):
+        self.refresh_listbox()
+        
+        # Select the new dataset
+        idx = list(self.manager.datasets.keys()).index(new_name)
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(idx)
+        self.listbox.activate(idx)
+        self.manager.active_dataset_name = new_name
+        self.update_undo_buttons()
+
     # ---------------- Upload ----------------
     def upload_files(self):
+        from core.loader import load_file_in_chunks
         paths = filedialog.askopenfilenames(filetypes=[("CSV & Excel", "*.csv *.xlsx")])
+        if len(paths) > 1:
+            self.ingest_paths(paths)
+            return
+        compact = self.compact_var.get()
+
+        def load(job, path):
+            df, record = self.manager.profiler.call("load_file", load_file_in_chunks, path, params={"path": path},
+                                                    progress=job.report, cache=self.file_cache)
+            return self.manager.prepare_frame(df, compact, [record])  # compacted here, off the Tk thread
+
         for path in paths:
-            try:
-                df = load_file(path)
-                name = path.split("/")[-1]
-                self.manager.add_dataset(name, df)
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            name = path.split("/")[-1]
+            self.run_job(f"Loading {name}", load, path, keys=(name,),
+                         on_done=lambda result, name=name: self.on_file_loaded(name, *result))
+
+    def ingest_paths(self, paths):
+        """Load several files in parallel worker processes, adding each dataset as soon as it is ready"""
+        from core.ingest import ingest_files
+        from core.profiling import OpRecord
+        names = [path.split("/")[-1] for path in paths]
+        compact = self.compact_var.get()
+
+        def load_all(job, paths):
+            failures = []
+            for done, result in enumerate(ingest_files(paths, cache=self.file_cache), start=1):
+                if result.ok:
+                    # Parsed in a worker process, so only the wall time is known
+                    record = OpRecord("load_file", {"path": result.path}, wall=result.seconds, output=result.df)
+                    self.manager.profiler.add(record)
+                    job.publish((result.name, *self.manager.prepare_frame(result.df, compact, [record])))
+                else:
+                    failures.append(f"{result.name}: {result.error}")
+                job.report(done, len(paths), message=result.name)
+            return failures
+
+        def done(failures):
+            if failures:
+                messagebox.showerror("Error", "Some files could not be loaded:\n" + "\n".join(failures))
+
+        self.run_job(f"Loading {len(paths)} files", load_all, paths, keys=names, on_done=done,
+                     on_partial=lambda loaded: self.on_file_loaded(*loaded))
+
+    def on_file_loaded(self, name, df, report, operations):
+        """Add a frame the load job already compacted (see DatasetManager.prepare_frame)"""
+        self.manager.add_dataset(name, df, compact=False, operations=operations, memory_report=report)
         self.refresh_listbox()
 
+    # ---------------- Sessions ----------------
+    def save_session(self):
+        from core.session import save_session, session_datasets
+        if not self.manager.datasets:
+            messagebox.showinfo("Info", "There are no datasets to save")
+            return
+        path = filedialog.askdirectory(title="Save session to folder", mustexist=False,
+                                       initialdir=self.session_path)
+        if not path:
+            return
+        try:
+            dropped = [name for name in session_datasets(path) if name not in self.manager.datasets]
+        except (OSError, ValueError, KeyError, TypeError):
+            dropped = []  # not a session this version can read; it is overwritten
+        if dropped and not messagebox.askyesno(
+                "Replace Session", f"The session in {path} also holds {', '.join(dropped)}, which "
+                                   "will be deleted from it. Save anyway?"):
+            return
+
+        def done(names):
+            self.session_path = path
+            messagebox.showinfo("Success", f"Saved {len(names)} dataset(s) to {path}")
+
+        # Waits for operations on the datasets and for other saves
+        self.run_job("Saving session", lambda job, path: save_session(self.manager, path), path,
+                     keys=(SESSION_JOB, *self.manager.datasets), on_done=done)
+
+    def open_session(self):
+        from core.session import open_session
+        path = filedialog.askdirectory(title="Open session folder", mustexist=True)
+        if not path:
+            return
+        try:
+            open_session(self.manager, path)
+        except (OSError, ValueError, KeyError, TypeError) as e:  # missing, unsupported or malformed files
+            messagebox.showerror("Error", f"Could not open the session: {e}")
+            return
+        self.session_path = path
+        active = self.manager.active_dataset_name
+        if active in self.manager.datasets:
+            self.select_dataset(active)
+        else:
+            self.refresh_listbox()
+
     # ---------------- Listbox ----------------
     def refresh_listbox(self):
         self.listbox.delete(0, tk.END)
-        for name in self.manager.datasets:
-            self.listbox.insert(tk.END, name)
+        self.listbox_names = list(self.manager.datasets)
+        for name in self.listbox_names:
+            self.listbox.insert(tk.END, self.listbox_label(name))
         self.selection_order = []  # Reset selection order after refresh
 
+    def listbox_label(self, name):
+        from core.memory import format_bytes
+        ds = self.manager.datasets[name]
+        if ds.is_lazy:
+            status = "lazy"
+        elif ds.is_spilled:
+            status = "on disk"
+        else:
+            status = format_bytes(ds.nbytes)
+        return f"{name}  [{status}]"
+
+    def update_listbox_labels(self):
+        """Refresh memory/spill status in place, keeping the selection"""
+        if self._manager is None:
+            return
+        selected = self.listbox.curselection()
+        for idx, name in enumerate(self.listbox_names):
+            if name not in self.manager.datasets:
+                continue
+            label = self.listbox_label(name)
+            if self.listbox.get(idx) != label:
+                self.listbox.delete(idx)
+                self.listbox.insert(idx, label)
+        for idx in selected:
+            self.listbox.selection_set(idx)
+
     def on_select(self, event):
         current_selection = set(self.listbox.curselection())
         previous_selection = set(self.selection_order)
@@ -107,7 +411,7 @@ class DataProcessingApp:
         
         # Add newly selected in order
         for idx in newly_selected:
-            name = self.listbox.get(idx)
+            name = self.listbox_names[idx]
             if name not in self.selection_order:
                 self.selection_order.append(name)
         
@@ -117,6 +421,7 @@ class DataProcessingApp:
             self.manager.active_dataset_name = self.selection_order[0] if self.selection_order else None
             # Enable buttons
             self.remove_dup_btn.config(state=tk.NORMAL)
+            self.near_dup_btn.config(state=tk.NORMAL)
             self.handle_missing_btn.config(state=tk.NORMAL)
             self.standardize_btn.config(state=tk.NORMAL)
             self.preview_btn.config(state=tk.NORMAL)
@@ -125,7 +430,7 @@ class DataProcessingApp:
             ds = self.manager.get_active_dataset()
             if ds:
                 self.reset_btn.config(state=tk.NORMAL)
-                self.undo_btn.config(state=tk.NORMAL if len(ds.history) > 1 else tk.DISABLED)
+                self.undo_btn.config(state=tk.NORMAL if ds.can_undo else tk.DISABLED)
             # Enable merge if at least 2 selected
             if len(self.selection_order) >= 2:
                 self.merge_btn.config(state=tk.NORMAL)
@@ -136,6 +441,7 @@ class DataProcessingApp:
             self.manager.active_dataset_name = None
             self.selection_order = []
             self.remove_dup_btn.config(state=tk.DISABLED)
+            self.near_dup_btn.config(state=tk.DISABLED)
             self.handle_missing_btn.config(state=tk.DISABLED)
             self.standardize_btn.config(state=tk.DISABLED)
             self.merge_btn.config(state=tk.DISABLED)
@@ -150,18 +456,108 @@ class DataProcessingApp:
         if index < 0 or index >= self.listbox.size():
             return
         
-        name = self.listbox.get(index)
+        name = self.listbox_names[index]
         if name not in self.manager.datasets:
             return
         
         # Create context menu
         menu = Menu(self.root, tearoff=0)
+        menu.add_command(label="Memory Report", command=lambda: self.show_memory_report(name))
+        menu.add_command(label="Column Statistics", command=lambda: self.show_column_stats(name))
+        menu.add_command(label="Operation Profile", command=lambda: self.show_profile(name))
         menu.add_command(label="Delete Dataset", command=lambda: self.delete_dataset(name))
         menu.post(event.x_root, event.y_root)
 
+    def show_memory_report(self, name):
+        import pandas as pd
+        from core.memory import column_memory, format_bytes
+        ds = self.manager.datasets[name]
+        report = ds.memory_report
+        if report is None:
+            usage = column_memory(ds.df)
+            report = pd.DataFrame({"dtype_before": ds.df.dtypes.astype(str), "dtype_after": ds.df.dtypes.astype(str),
+                                   "bytes_before": usage, "bytes_after": usage})
+        top = tk.Toplevel(self.root)
+        top.title(f"Memory: {name}")
+        total_before, total_after = report["bytes_before"].sum(), report["bytes_after"].sum()
+        ttk.Label(top, text=f"Total: {format_bytes(total_before)} -> {format_bytes(total_after)}").pack(anchor=tk.W, padx=5, pady=5)
+        columns = ("dtype", "before", "after")
+        tree = ttk.Treeview(top, columns=columns, show="tree headings", height=15)
+        tree.heading("#0", text="Column")
+        tree.heading("dtype", text="Type")
+        tree.heading("before", text="Before")
+        tree.heading("after", text="After")
+        for col, row in report.iterrows():
+            dtype = row["dtype_before"] if row["dtype_before"] == row["dtype_after"] else f"{row['dtype_before']} -> {row['dtype_after']}"
+            tree.insert("", tk.END, text=str(col), values=(dtype, format_bytes(row["bytes_before"]), format_bytes(row["bytes_after"])))
+        tree.pack(expand=True, fill=tk.BOTH)
+
+    def show_column_stats(self, name):
+        """Null, distinct, min/max and memory figures per column, from the dataset's statistics cache"""
+        import pandas as pd
+        from core.memory import format_bytes
+        ds = self.manager.datasets[name]
+        stats = ds.stats()
+        top = tk.Toplevel(self.root)
+        top.title(f"Column Statistics: {name}")
+        top.geometry("800x350")
+        columns = ("dtype", "count", "nulls", "distinct", "min", "max", "bytes")
+        tree = ttk.Treeview(top, columns=columns, show="tree headings", height=15)
+        tree.heading("#0", text="Column")
+        for field in columns:
+            tree.heading(field, text=field.capitalize())
+            tree.column(field, width=90)
+        for col, row in stats.iterrows():
+            tree.insert("", tk.END, text=str(col), values=(
+                str(row["dtype"]), f"{row['count']:,}", f"{row['nulls']:,}", f"{row['distinct']:,}",
+                "" if pd.isna(row["min"]) else str(row["min"]), "" if pd.isna(row["max"]) else str(row["max"]),
+                format_bytes(row["bytes"])))
+        tree.pack(expand=True, fill=tk.BOTH)
+
+    def show_profile(self, name):
+        """Cost of every operation recorded on a dataset, with JSON / Chrome trace export"""
+        from core.memory import format_bytes
+        ds = self.manager.datasets[name]
+        top = tk.Toplevel(self.root)
+        top.title(f"Operation Profile: {name}")
+        top.geometry("900x350")
+        columns = ("wall", "cpu", "peak", "rows", "cols", "bytes")
+        tree = ttk.Treeview(top, columns=columns, show="tree headings", height=12)
+        tree.heading("#0", text="Operation")
+        for col, label in zip(columns, ("Wall (ms)", "CPU (ms)", "Peak memory", "Rows in -> out", "Cols in -> out", "Size in -> out")):
+            tree.heading(col, text=label)
+            tree.column(col, width=110, anchor=tk.E)
+
+        def ms(seconds):
+            return "" if seconds is None else f"{seconds * 1000:,.1f}"
+
+        def change(before, after, fmt=lambda v: f"{v:,}"):
+            return " -> ".join("-" if v is None else fmt(v) for v in (before, after))
+
+        for r in ds.operations:
+            peak = "" if r.peak_bytes is None else f"{format_bytes(r.peak_bytes)} ({r.memory_source})"
+            tree.insert("", tk.END, text=r.name, values=(
+                ms(r.wall), ms(r.cpu), peak, change(r.rows_in, r.rows_out), change(r.cols_in, r.cols_out),
+                change(r.bytes_in, r.bytes_out, format_bytes)))
+        tree.pack(expand=True, fill=tk.BOTH)
+
+        def export(write, extension, records):
+            path = filedialog.asksaveasfilename(defaultextension=extension, filetypes=[("JSON", "*.json")])
+            if path:
+                write(path, records)
+
+        profiler = self.manager.profiler
+        buttons = ttk.Frame(top)
+        buttons.pack(fill=tk.X, pady=5)
+        ttk.Button(buttons, text="Export JSON", command=lambda: export(profiler.to_json, ".json", ds.operations)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Export Chrome Trace",
+                   command=lambda: export(profiler.to_chrome_trace, ".json", ds.operations)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Export Session Trace",
+                   command=lambda: export(profiler.to_chrome_trace, ".json", list(profiler.records))).pack(side=tk.LEFT, padx=5)
+
     def delete_dataset(self, name):
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete '{name}'?"):
-            del self.manager.datasets[name]
+            self.manager.remove_dataset(name)
             if name in self.selection_order:
                 self.selection_order.remove(name)
             if self.manager.active_dataset_name == name:
@@ -170,7 +566,7 @@ class DataProcessingApp:
             self.on_select(None)  # Update button states
         ds = self.manager.get_active_dataset()
         if ds:
-            self.undo_btn.config(state=tk.NORMAL if len(ds.history) > 1 else tk.DISABLED)
+            self.undo_btn.config(state=tk.NORMAL if ds.can_undo else tk.DISABLED)
             self.reset_btn.config(state=tk.NORMAL)
         else:
             self.undo_btn.config(state=tk.DISABLED)
@@ -195,30 +591,48 @@ class DataProcessingApp:
     def remove_duplicates(self):
         ds = self.manager.get_active_dataset()
         if ds:
-            new_df = remove_duplicates(ds.df)
-            new_name = generate_temp_name(base="deduped")
-            self.manager.add_dataset(new_name, new_df, temporary=True)
-            self.refresh_listbox()
-            # Optionally, select the new dataset
-            idx = list(self.manager.datasets.keys()).index(new_name)
-            self.listbox.selection_clear(0, tk.END)
-            self.listbox.selection_set(idx)
-            self.listbox.activate(idx)
-            self.manager.active_dataset_name = new_name
-            messagebox.showinfo("Done", f"Duplicates removed. New dataset '{new_name}' created.")
-            self.update_undo_buttons()
+            if ds.is_unique:
+                messagebox.showinfo("No Changes", f"'{ds.name}' has no duplicate rows; no new dataset created.")
+                return
+            self.run_operation(ds, "remove_duplicates", "deduped", f"Removing duplicates from {ds.name}",
+                               "Duplicates removed.", unique=True)
+
+    def find_near_duplicates(self):
+        from core.fuzzy import DEFAULT_THRESHOLD
+        from core.processor import flag_near_duplicates
+        ds = self.manager.get_active_dataset()
+        if not ds:
+            return
+        threshold = simpledialog.askfloat("Near Duplicates",
+                                          "Similarity threshold (0-1); rows at or above it share a cluster id:",
+                                          initialvalue=DEFAULT_THRESHOLD, minvalue=0.0, maxvalue=1.0)
+        if threshold is not None:
+            self.run_operation(ds, "flag_near_duplicates", "clusters", f"Finding near duplicates in {ds.name}",
+                               "Near-duplicate clusters added as column 'duplicate_cluster'.",
+                               func=flag_near_duplicates, threshold=threshold)
 
     def handle_missing_values(self):
         ds = self.manager.get_active_dataset()
         if not ds:
             return
+        missing = None
+        if not ds.is_lazy:
+            stats = ds.stats()  # cached per version
+            missing = stats.loc[stats["nulls"] > 0, "nulls"]
+            if missing.empty:
+                messagebox.showinfo("Handle Missing Values", f"'{ds.name}' has no missing values.")
+                return
         
         # Create a custom dialog for method selection
         dialog = tk.Toplevel(self.root)
         dialog.title("Handle Missing Values")
-        dialog.geometry("300x150")
+        dialog.geometry("360x190")
         dialog.resizable(False, False)
         
+        if missing is not None:
+            shown = ", ".join(f"{col} ({count:,})" for col, count in missing.head(5).items())
+            more = f" and {len(missing) - 5} more" if len(missing) > 5 else ""
+            tk.Label(dialog, text=f"Missing values in: {shown}{more}", wraplength=280, fg="gray").pack(pady=(10, 0))
         tk.Label(dialog, text="Choose method to handle missing values:").pack(pady=10)
         
         method_var = tk.StringVar()
@@ -233,31 +647,89 @@ class DataProcessingApp:
         tk.Button(button_frame, text="Delete", command=lambda: select_method("delete")).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Zero", command=lambda: select_method("zero")).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Fill", command=lambda: select_method("fill")).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Per Column...", command=lambda: select_method("columns")).pack(side=tk.LEFT, padx=5)
         
         dialog.wait_window()
         
         method = method_var.get()
+        # Eager runs see this very version, so they needn't scan columns the statistics show are complete
+        known = {} if missing is None or self.lazy_var.get() else {"missing": list(missing.index)}
+        if method == "columns":
+            strategies = self.ask_missing_strategies(ds, missing)
+            if strategies:
+                self.run_operation(ds, "handle_missing_values", "clean", f"Handling missing values in {ds.name}",
+                                   "Missing values handled.", strategies=strategies, **known)
+            return
         fill_val = None
         if method == "fill":
+            # Converted per column; columns the value doesn't fit (e.g. text for numbers) keep their gaps
             fill_val = simpledialog.askstring("Fill Value", "Enter value to fill missing:")
         
         if method and (method != "fill" or fill_val is not None):
-            new_df = handle_missing_values(ds.df, method=method, fill_value=fill_val)
-            new_name = generate_temp_name(base="clean")
-            self.manager.add_dataset(new_name, new_df, temporary=True)
-            self.refresh_listbox()
-            
-            # Select the new dataset
-            idx = list(self.manager.datasets.keys()).index(new_name)
-            self.listbox.selection_clear(0, tk.END)
-            self.listbox.selection_set(idx)
-            self.listbox.activate(idx)
-            self.manager.active_dataset_name = new_name
-            
-            messagebox.showinfo("Done", f"Missing values handled. New dataset '{new_name}' created.")
-            self.update_undo_buttons()
+            self.run_operation(ds, "handle_missing_values", "clean", f"Handling missing values in {ds.name}",
+                               "Missing values handled.", method=method, fill_value=fill_val, **known)
+
+    def ask_missing_strategies(self, ds, missing=None):
+        """Dialog choosing a missing-value strategy per column; returns the strategies map, or None if cancelled"""
+        from core.processor import MISSING_STRATEGIES, missing_strategies_for, missing_strategy
+        columns = list(ds.columns) if missing is None else list(missing.index)
+        labels = {str(col): col for col in ds.columns}
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Missing Values per Column")
+        dialog.geometry(f"560x{min(140 + 30 * len(columns), 600)}")
+        
+        tk.Label(dialog, text="Value is the constant to fill; group by fills per group of another column.").pack(pady=5)
+        grid = tk.Frame(dialog)
+        grid.pack(padx=10, fill=tk.X)
+        for c, heading in enumerate(("Column", "Strategy", "Value", "Group by")):
+            tk.Label(grid, text=heading, font=("TkDefaultFont", 9, "bold")).grid(row=0, column=c, sticky=tk.W, padx=3)
+        rows = {}
+        for r, col in enumerate(columns, start=1):
+            text = str(col) if missing is None else f"{col} ({missing[col]:,} missing)"
+            tk.Label(grid, text=text).grid(row=r, column=0, sticky=tk.W, padx=3)
+            choices = MISSING_STRATEGIES if ds.is_lazy else missing_strategies_for(ds.column_stats(col)["dtype"])
+            strategy = ttk.Combobox(grid, values=choices, state="readonly", width=10)
+            strategy.set("leave")
+            strategy.grid(row=r, column=1, padx=3, pady=2)
+            value = ttk.Entry(grid, width=12)
+            value.grid(row=r, column=2, padx=3)
+            group = ttk.Combobox(grid, values=[""] + [label for label in labels if labels[label] != col],
+                                 state="readonly", width=12)
+            group.grid(row=r, column=3, padx=3)
+            rows[col] = (strategy, value, group)
+        
+        result = {}
+        
+        def apply():
+            strategies = {}
+            for col, (strategy, value, group) in rows.items():
+                spec = {"method": strategy.get()}
+                if spec["method"] == "leave":
+                    continue
+                if spec["method"] == "constant":
+                    spec["value"] = value.get()
+                if group.get():
+                    spec["by"] = labels[group.get()]
+                try:
+                    missing_strategy(spec)
+                except ValueError as e:
+                    messagebox.showerror("Error", f"{col}: {e}", parent=dialog)
+                    return
+                strategies[col] = spec
+            result["strategies"] = strategies
+            dialog.destroy()
+        
+        button_frame = tk.Frame(dialog)
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="Apply", command=apply).pack(side=tk.LEFT, padx=10)
+        tk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=10)
+        dialog.wait_window()
+        return result.get("strategies") or None
 
     def standardize_data(self):
+        import pandas as pd
+        from core.detection import suggest_column_type
+        from core.processor import is_text_dtype
         ds = self.manager.get_active_dataset()
         if not ds:
             return
@@ -271,8 +743,10 @@ class DataProcessingApp:
         tk.Label(dialog, text="Select column to standardize:").pack(pady=5)
         
         column_var = tk.StringVar()
-        column_menu = tk.OptionMenu(dialog, column_var, *ds.df.columns)
+        column_menu = tk.OptionMenu(dialog, column_var, *ds.columns)
         column_menu.pack(pady=5)
+        detected_label = tk.Label(dialog, text="", fg="gray")
+        detected_label.pack()
         
         tk.Label(dialog, text="Select standardization method:").pack(pady=5)
         
@@ -290,11 +764,20 @@ class DataProcessingApp:
         def on_column_change(*args):
             col = column_var.get()
             if col:
-                dtype = str(ds.df[col].dtype)
+                # Rule-based suggestion, cached per dataset version
+                suggestion = suggest_column_type(ds, col)
+                sampled = f" of {suggestion['sampled']:,} sampled" if suggestion['sampled'] else ""
+                if ds.is_lazy:
+                    # Lazy datasets are inspected through the rows a preview would compute
+                    dtype, summary = ds.head(LAZY_PREVIEW_ROWS)[col].dtype, ""
+                else:
+                    stats = ds.column_stats(col)  # cached per column, so switching columns doesn't rescan
+                    dtype, summary = stats["dtype"], f"\n{stats['nulls']:,} missing, {stats['distinct']:,} distinct"
+                detected_label.config(text=f"Detected type: {suggestion['type']} ({suggestion['confidence']:.0%}{sampled}){summary}")
                 # Clear previous radiobuttons
                 for widget in method_frame.winfo_children():
                     widget.destroy()
-                if 'object' in dtype or 'string' in dtype:
+                if is_text_dtype(dtype):
                     methods = [
                         ('Convert to lowercase', 'lowercase'), 
                         ('Convert to uppercase', 'uppercase'), 
@@ -302,9 +785,12 @@ class DataProcessingApp:
                         ('Strip whitespace', 'strip'),
                         ('Convert to number', 'words_to_num')
                     ]
+                    if suggestion['type'] in ('integer', 'float'):
+                        # Numbers stored as text
+                        methods.insert(0, ('Convert to numeric', 'to_numeric'))
                     extra_label.config(text="")
                     extra_entry.pack_forget()
-                elif 'int' in dtype or 'float' in dtype:
+                elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
                     methods = [
                         ('Round numbers', 'round'), 
                         ('Convert to words', 'num_to_words')
@@ -322,102 +808,179 @@ class DataProcessingApp:
         column_var.trace('w', on_column_change)
         
         # Set initial column if any
-        if not ds.df.columns.empty:
-            column_var.set(ds.df.columns[0])
+        if not ds.columns.empty:
+            column_var.set(ds.columns[0])
             on_column_change()
         
-        def apply_standardization():
+        # Steps queued with "Add to Plan" are applied together in one pass
+        plan = []
+        tk.Label(dialog, text="Planned steps:").pack(pady=(10, 0))
+        plan_listbox = tk.Listbox(dialog, height=5)
+        plan_listbox.pack(fill=tk.X, padx=10)
+        
+        def current_step():
             col = column_var.get()
             method = method_var.get()
             if not col or not method:
                 messagebox.showwarning("Incomplete", "Select column and method")
-                return
+                return None
             kwargs = {}
             if method == 'round':
                 try:
                     kwargs['decimals'] = int(extra_entry.get())
                 except ValueError:
                     messagebox.showerror("Error", "Enter valid number for decimals")
+                    return None
+            return (col, method, kwargs)
+        
+        def add_to_plan():
+            step = current_step()
+            if step:
+                plan.append(step)
+                plan_listbox.insert(tk.END, f"{step[0]}: {step[1]}")
+        
+        def apply_standardization():
+            steps = list(plan)
+            if not steps:
+                step = current_step()
+                if not step:
                     return
-            new_df = standardize_column(ds.df, col, method, **kwargs)
-            new_name = generate_temp_name(base="std")
-            self.manager.add_dataset(new_name, new_df, temporary=True)
-            self.refresh_listbox()
-            
-            # Select the new dataset
-            idx = list(self.manager.datasets.keys()).index(new_name)
-            self.listbox.selection_clear(0, tk.END)
-            self.listbox.selection_set(idx)
-            self.listbox.activate(idx)
-            self.manager.active_dataset_name = new_name
-            
-            messagebox.showinfo("Done", f"Column '{col}' standardized. New dataset '{new_name}' created.")
+                steps = [step]
+            cols = ", ".join(dict.fromkeys(f"'{step[0]}'" for step in steps))
+            self.run_operation(ds, "apply_column_transforms", "std", f"Standardizing {ds.name}",
+                               f"Column(s) {cols} standardized.", with_progress=True, plan=steps)
             dialog.destroy()
-            self.update_undo_buttons()
         
         button_frame = tk.Frame(dialog)
         button_frame.pack(pady=20)
+        tk.Button(button_frame, text="Add to Plan", command=add_to_plan).pack(side=tk.LEFT, padx=10)
         tk.Button(button_frame, text="Apply", command=apply_standardization).pack(side=tk.LEFT, padx=10)
         tk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=10)
 
     # ---------------- Cross-file ops ----------------
     def cross_file_merge(self):
+        from core.joins import plan_merge
+        from core.processor import merge_datasets
         if len(self.selection_order) < 2:
             messagebox.showwarning("Selection Error", "Select at least two datasets")
             return
-        names = self.selection_order
-        temp_name = generate_temp_name("merged")
-        self.manager.apply_cross_file_op(names, merge_datasets, temp_name)
-        messagebox.showinfo("Done", f"Temporary dataset created: {temp_name}")
-        self.refresh_listbox()
+        names = [name for name in self.selection_order if name in self.manager.datasets]
+        datasets = [self.manager.datasets[name] for name in names]
+
+        first = datasets[0]
+        indexes = []  # RowHashIndex of a union result, see merge_datasets
+
+        def base_index():
+            return first.row_index if first.is_unique else None
+
+        def done(result):
+            merged_df, record = result
+            existing = self.manager.find_dataset(merged_df)
+            if existing:
+                self.select_dataset(existing)
+                messagebox.showinfo("Done", f"Same merge as existing dataset '{existing}', selected it.")
+                return
+            temp_name = generate_temp_name("merged")
+            self.manager.add_dataset(temp_name, merged_df, temporary=True, operations=[record])
+            if indexes:
+                # Later appends to the union and de-duplication build on its index
+                self.manager.datasets[temp_name].mark_unique(indexes[-1])
+            self.manager.active_dataset_name = temp_name
+            messagebox.showinfo("Done", f"Temporary dataset created: {temp_name}")
+            self.refresh_listbox()
+
+        def confirm(result):
+            plan, _ = result
+            # Show the join order and estimated size before doing the work
+            if not messagebox.askyesno("Confirm Merge", plan.describe(names) + "\n\nProceed with the merge?"):
+                return
+            self.run_job(f"Merging {len(datasets)} datasets",
+                         lambda job, datasets: self.manager.compute(
+                             "merge_datasets", merge_datasets, datasets, params={"plan": plan.kind, "order": plan.order},
+                             progress=job.report, plan=plan, index=base_index(), on_unique=indexes.append),
+                         datasets, keys=names, on_done=done)
+
+        self.run_job(f"Planning merge of {len(datasets)} datasets",
+                     # Not memoized: a union plan carries the duplicate masks the merge reuses
+                     lambda job, datasets: self.manager.compute("plan_merge", plan_merge, datasets, params={},
+                                                                memoize=False, index=base_index()),
+                     datasets, keys=names, on_done=confirm)
 
     # ---------------- Preview ----------------
     def preview_data(self):
+        from ui.data_grid import DataGrid
         ds = self.manager.get_active_dataset()
         if not ds:
             messagebox.showwarning("No Dataset", "No active dataset")
             return
         top = tk.Toplevel(self.root)
-        top.title(f"Preview: {ds.name} | Shape: {ds.df.shape}")
-        text = tk.Text(top, width=120, height=40)
-        text.pack(expand=True, fill=tk.BOTH)
+        top.geometry("900x600")
+        if ds.is_lazy:
+            # Only compute the rows the preview shows
+            frame = ds.head(LAZY_PREVIEW_ROWS)
+            top.title(f"Preview: {ds.name} | Lazy plan")
+            info = (f"Lazy plan with {len(ds.plan.steps)} step(s): showing the first {len(frame)} rows    "
+                    f"Total Columns: {len(frame.columns)}")
+        else:
+            frame = ds.df
+            top.title(f"Preview: {ds.name} | Shape: {ds.df.shape}")
+            info = f"Total Rows: {len(ds.df)}    Total Columns: {len(ds.df.columns)}    (click a header to sort)"
         
-        # Show info and first 100 rows
-        info = f"Total Rows: {len(ds.df)}\nTotal Columns: {len(ds.df.columns)}\n\n"
-        text.insert(tk.END, info + ds.df.head(100).to_string())
+        # Show info and a virtualized grid over all rows
+        ttk.Label(top, text=info).pack(anchor=tk.W, padx=5, pady=5)
+        DataGrid(top, frame).pack(expand=True, fill=tk.BOTH)
 
     # ---------------- Export ----------------
     def export_dataset(self):
+        from utils.exporter import export_chunks, export_data, infer_format
         ds = self.manager.get_active_dataset()
         if not ds:
             messagebox.showwarning("No Dataset", "No active dataset")
             return
 
-        # Ask user where to save
-        filetypes = [("CSV", "*.csv"), ("Excel", "*.xlsx"), ("JSON", "*.json")]
+        # Ask user where to save; compression and format follow the extension
+        filetypes = [("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz"), ("JSON Lines", "*.jsonl"),
+                     ("JSON Lines (gzip)", "*.jsonl.gz"), ("JSON Lines (zstd)", "*.jsonl.zst"),
+                     ("Parquet", "*.parquet"), ("Excel", "*.xlsx"), ("JSON", "*.json")]
         save_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=filetypes)
 
         if not save_path:
             return
 
         try:
-            if save_path.endswith(".csv"):
-                ds.df.to_csv(save_path, index=False)
-            elif save_path.endswith(".xlsx"):
-                ds.df.to_excel(save_path, index=False)
-            elif save_path.endswith(".json"):
-                ds.df.to_json(save_path, orient="records")
-            else:
-                messagebox.showerror("Error", "Unsupported file format")
-                return
-            messagebox.showinfo("Exported", f"Dataset saved as {save_path}")
-        except Exception as e:
+            file_type, compression = infer_format(save_path)
+        except ValueError as e:
             messagebox.showerror("Error", str(e))
+            return
+
+        def write(job, ds):
+            def export(df):
+                if df is None:
+                    # Lazy plans are streamed chunk by chunk instead of being materialized
+                    return export_chunks(ds.iter_chunks(), save_path, file_type, compression, progress=job.report)
+                # Whole frames go through export_data, which fixes the Parquet schema from all rows
+                return export_data(df, save_path, file_type, compression, progress=job.report)
+
+            try:
+                _, record = self.manager.profiler.call(
+                    "export", export, None if ds.is_lazy else ds.df,
+                    params={"path": save_path, "format": file_type, "compression": compression})
+            except BaseException:
+                if os.path.exists(save_path):
+                    os.remove(save_path)  # don't leave a partial output behind when cancelled or failed
+                raise
+            return record
+
+        def done(record):
+            ds.log(record)
+            messagebox.showinfo("Exported", f"Dataset saved as {save_path}")
+
+        self.run_job(f"Exporting {ds.name}", write, ds, keys=(ds.name,), on_done=done)
 
     def update_undo_buttons(self):
         ds = self.manager.get_active_dataset()
         if ds:
-            self.undo_btn.config(state=tk.NORMAL if len(ds.history) > 1 else tk.DISABLED)
+            self.undo_btn.config(state=tk.NORMAL if ds.can_undo else tk.DISABLED)
             self.reset_btn.config(state=tk.NORMAL)
         else:
             self.undo_btn.config(state=tk.DISABLED)
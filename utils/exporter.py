@@ -1,7 +1,177 @@
-def export_data(df, file_path, file_type):
+import gzip
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; needed for Parquet and zstd output
+    pa = pq = None
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# File extensions recognised by infer_format, most specific first
+EXTENSIONS = [
+    (".jsonl", "jsonl"), (".ndjson", "jsonl"), (".json", "json"),
+    (".csv", "csv"), (".parquet", "parquet"), (".xlsx", "excel"),
+]
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
+def infer_format(file_path):
+    """(file_type, compression) from a path such as `out.csv.gz` or `out.parquet`"""
+    path = file_path.lower()
+    compression = None
+    for ext, codec in COMPRESSIONS.items():
+        if path.endswith(ext):
+            compression = codec
+            path = path[:-len(ext)]
+    for ext, file_type in EXTENSIONS:
+        if path.endswith(ext):
+            return file_type, compression
+    raise ValueError("Unsupported file format")
+
+
+def _open_output(file_path, compression):
+    """Binary output stream, compressed on the fly"""
+    if compression is None:
+        return open(file_path, "wb")
+    if compression == "gzip":
+        return gzip.open(file_path, "wb", compresslevel=6)
+    if compression == "zstd":
+        if pa is None:
+            raise ValueError("zstd compression requires pyarrow")
+        return pa.CompressedOutputStream(file_path, "zstd")
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def _write_text(chunks, file_path, compression, render, prefix="", separator="", suffix=""):
+    rows = 0
+    first = True
+    with _open_output(file_path, compression) as out:
+        out.write(prefix.encode("utf-8"))
+        for chunk in chunks:
+            if len(chunk) == 0 and not first:
+                continue
+            if rows and separator and len(chunk):
+                out.write(separator.encode("utf-8"))
+            out.write(render(chunk, first).encode("utf-8"))
+            first = False
+            rows += len(chunk)
+            yield rows
+        out.write(suffix.encode("utf-8"))
+
+
+def _write_parquet(chunks, file_path, compression, schema=None):
+    if pq is None:
+        raise ValueError("Parquet export requires pyarrow")
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(file_path, schema or table.schema, compression=compression or "snappy")
+            if not table.schema.equals(writer.schema, check_metadata=False):
+                try:
+                    table = table.cast(writer.schema)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    # e.g. a column that was all null or integers so far; widen what was written
+                    writer = _promote_parquet(writer, file_path, table.schema, compression)
+                    table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+            yield rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _promote_schema(written, incoming):
+    """Schema both can be cast to: arrow's permissive promotion per field, text where there is none"""
+    fields = []
+    for field in written:
+        other = incoming.field(field.name) if field.name in incoming.names else field
+        try:
+            fields.append(pa.unify_schemas([pa.schema([field]), pa.schema([other])], promote_options="permissive")[0])
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            fields.append(pa.field(field.name, pa.string()))
+    return pa.schema(fields, metadata=incoming.metadata)
+
+
+def _promote_parquet(writer, file_path, incoming, compression):
+    """Close `writer` and rewrite its file under a schema that also fits `incoming`, one row group at a time"""
+    writer.close()
+    schema = _promote_schema(writer.schema, incoming)
+    written = file_path + ".tmp"
+    os.replace(file_path, written)
+    try:
+        promoted = pq.ParquetWriter(file_path, schema, compression=compression or "snappy")
+        for batch in pq.ParquetFile(written).iter_batches():
+            promoted.write_table(pa.Table.from_batches([batch]).cast(schema))
+    finally:
+        os.remove(written)
+    return promoted
+
+
+def _write_excel(chunks, file_path):
+    # xlsx cannot be appended to, so the chunks are assembled first
+    df = pd.concat(list(chunks), ignore_index=True)
+    df.to_excel(file_path, index=False)
+    yield len(df)
+
+
+def export_chunks(chunks, file_path, file_type=None, compression=None, total_rows=None, progress=None, schema=None):
+    """Stream DataFrame chunks to one file, holding a single chunk in memory at a time.
+
+    `file_type` is csv, jsonl, json, parquet or excel, and `compression` is
+    None, gzip or zstd; both default to what the file name implies. JSON is
+    written as a records array. Excel output is assembled in memory. Parquet
+    uses the Arrow `schema` if given, else the first chunk's, widening
+    columns a later chunk doesn't fit. Calls progress(rows_written,
+    total_rows) after each chunk and returns the row count.
+    """
+    if file_type is None:
+        file_type, inferred = infer_format(file_path)
+        compression = compression or inferred
     if file_type == "csv":
-        df.to_csv(file_path, index=False)
-    elif file_type == "excel":
-        df.to_excel(file_path, index=False)
+        writer = _write_text(chunks, file_path, compression,
+                             lambda chunk, first: chunk.to_csv(index=False, header=first, lineterminator="\n"))
+    elif file_type == "jsonl":
+        writer = _write_text(chunks, file_path, compression,
+                             lambda chunk, first: chunk.to_json(orient="records", lines=True) if len(chunk) else "")
     elif file_type == "json":
-        df.to_json(file_path, orient="records", indent=2)
+        writer = _write_text(chunks, file_path, compression,
+                             lambda chunk, first: chunk.to_json(orient="records")[1:-1],
+                             prefix="[", separator=",", suffix="]")
+    elif file_type == "parquet":
+        writer = _write_parquet(chunks, file_path, compression, schema)
+    elif file_type == "excel":
+        if compression:
+            raise ValueError("Excel files cannot be compressed")
+        writer = _write_excel(chunks, file_path)
+    else:
+        raise ValueError("Unsupported file format")
+    rows = 0
+    for rows in writer:
+        if progress:
+            progress(rows, total_rows)
+    return rows
+
+
+def iter_frame_chunks(df, chunksize=DEFAULT_CHUNKSIZE):
+    """Row slices of a DataFrame; an empty frame yields itself so headers are still written"""
+    if len(df) == 0:
+        yield df
+        return
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def export_data(df, file_path, file_type=None, compression=None, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """Export a DataFrame through export_chunks in slices of `chunksize` rows"""
+    schema = None
+    if pa is not None and (file_type or infer_format(file_path)[0]) == "parquet":
+        schema = pa.Schema.from_pandas(df, preserve_index=False)  # of the whole frame, not just the first slice
+    return export_chunks(iter_frame_chunks(df, chunksize), file_path, file_type, compression,
+                         total_rows=len(df), progress=progress, schema=schema)